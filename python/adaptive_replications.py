@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Réplicas adaptativas hasta alcanzar una precisión objetivo
+
+En lugar de un número fijo de réplicas por configuración, las réplicas se
+envían al pool de parallel_runner por oleadas. Después de cada oleada se
+calcula el intervalo de confianza de cada indicador elegido; una
+configuración se detiene cuando todos sus semianchos están por debajo de la
+meta. Para las demás se estima cuántas réplicas faltan (el semiancho se
+reduce con 1/sqrt(n)), de modo que el cómputo se concentra en las
+configuraciones con más varianza.
+
+Los indicadores se indican con rutas separadas por puntos dentro del
+diccionario de resultados, por ejemplo 'average_time_in_system' o
+'wait_time_by_stage.doctor.1.p90' (p90 de la espera por el doctor para
+severidad 1).
+"""
+
+import math
+
+from output_analysis import DEFAULT_CONFIDENCE, confidence_interval
+from parallel_runner import make_task, run_tasks
+
+
+def metric_value(results, path):
+    """Valor de un indicador (ruta separada por puntos) o None si no existe"""
+    value = results
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+def metric_intervals(replicas, metrics, confidence=DEFAULT_CONFIDENCE):
+    """Intervalo de confianza de cada indicador sobre las réplicas con datos"""
+    intervals = {}
+    for metric in metrics:
+        values = [metric_value(r, metric) for r in replicas if r]
+        intervals[metric] = confidence_interval([v for v in values if v is not None], confidence)
+    return intervals
+
+
+def _precision_met(interval, target, relative):
+    half_width = interval['half_width']
+    if half_width is None:
+        return False
+    if relative:
+        return interval['mean'] not in (None, 0) and half_width / abs(interval['mean']) <= target
+    return half_width <= target
+
+
+def _replications_needed(interval, target, relative, current):
+    """Réplicas estimadas para que el semiancho llegue a la meta"""
+    half_width = interval['half_width']
+    if half_width is None or not math.isfinite(half_width) or interval['count'] < 2:
+        return current + 1
+    goal = target * abs(interval['mean']) if relative else target
+    if goal <= 0:
+        return current + 1
+    return math.ceil(interval['count'] * (half_width / goal) ** 2)
+
+
+def adaptive_replications(configurations, targets, relative=False, confidence=DEFAULT_CONFIDENCE,
+                          initial_replications=5, max_replications=100, max_wave=None, sim_time=None,
+                          max_workers=None, engine='simpy'):
+    """Ejecuta réplicas por oleadas hasta que cada configuración alcanza la precisión
+
+    `targets` es {indicador: semiancho máximo}; con relative=True la meta es
+    el semiancho relativo a la media (por ejemplo 0.05 = ±5%). `max_wave`
+    limita las réplicas nuevas por configuración en una oleada. Devuelve
+    {nombre: {'replications', 'intervals', 'converged', 'waves'}}.
+    """
+    if initial_replications < 2:
+        raise ValueError("Se requieren al menos dos réplicas iniciales para estimar la varianza")
+
+    replicas = {name: [] for name in configurations}
+    pending = {name: initial_replications for name in configurations}
+    state = {name: {'converged': False, 'waves': 0} for name in configurations}
+
+    while pending:
+        tasks = []
+        for name, count in pending.items():
+            start = len(replicas[name])
+            tasks.extend(make_task(name, configurations[name], r, sim_time, engine)
+                         for r in range(start, start + count))
+            replicas[name].extend([None] * count)
+            state[name]['waves'] += 1
+
+        for name, replication, result in run_tasks(tasks, max_workers):
+            replicas[name][replication] = result
+
+        pending = {}
+        for name in list(state):
+            if state[name]['converged'] or state[name].get('stopped'):
+                continue
+            intervals = metric_intervals(replicas[name], targets, confidence)
+            state[name]['intervals'] = intervals
+            if all(_precision_met(intervals[m], targets[m], relative) for m in targets):
+                state[name]['converged'] = True
+                continue
+
+            current = len(replicas[name])
+            # Sin datos en ninguna réplica (por ejemplo, ningún paciente terminó) más réplicas no ayudan
+            if current >= max_replications or any(intervals[m]['count'] == 0 for m in targets):
+                state[name]['stopped'] = True
+                continue
+            needed = max(_replications_needed(intervals[m], targets[m], relative, current) for m in targets)
+            additional = min(max(1, needed - current), max_replications - current)
+            if max_wave is not None:
+                additional = min(additional, max_wave)
+            pending[name] = additional
+
+    return {
+        name: {
+            'replications': replicas[name],
+            'intervals': state[name]['intervals'],
+            'converged': state[name]['converged'],
+            'waves': state[name]['waves']
+        }
+        for name in configurations
+    }
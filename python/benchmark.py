@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks de rendimiento de la simulación
+
+Ejecuta la simulación con cada motor para varias tasas de llegada
+('arrival_interval') y horizontes (de un día a un año) y mide eventos por
+segundo, pacientes por segundo, memoria máxima (RSS), tiempo de generación
+del informe y tiempo de importación de los módulos. Cada caso corre en un
+proceso nuevo para que la memoria máxima sea la de ese caso.
+
+Los resultados se guardan en JSON y se pueden comparar con una línea base
+guardada: un caso es una regresión si empeora más que la tolerancia de la
+métrica (por ejemplo, 10% menos eventos por segundo).
+
+Ejemplos:
+    python benchmark.py --quick --save-baseline
+    python benchmark.py --quick --baseline
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENGINES = ('simpy', 'fast')
+ARRIVAL_INTERVALS = (60, 20, 10)
+HORIZONS = (24, 168, 720, 8760)  # Un día, una semana, un mes y un año (horas)
+QUICK_HORIZONS = (24, 168)
+
+# Módulos cuyo tiempo de importación se mide (en un intérprete nuevo)
+IMPORT_MODULES = ('emergency_simulation', 'fast_engine', 'emergency_report')
+
+# Métrica -> (mejor si es 'higher' o 'lower', tolerancia relativa)
+THRESHOLDS = {
+    'events_per_sec': ('higher', 0.10),
+    'patients_per_sec': ('higher', 0.10),
+    'peak_rss_mb': ('lower', 0.20),
+    'report_seconds': ('lower', 0.25),
+    'import_seconds': ('lower', 0.25)
+}
+
+DEFAULT_BASELINE = os.path.join("resources", "benchmark_baseline.json")
+
+
+def peak_rss_mb():
+    """Memoria residente máxima del proceso actual en MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure_import_time(module, repeats=3):
+    """Mejor tiempo de importación de un módulo en un intérprete nuevo"""
+    code = ("import time; start = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - start)")
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', code], cwd=here, capture_output=True,
+                                text=True, check=True).stdout
+        elapsed = float(output.strip().splitlines()[-1])
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_case(case):
+    """Ejecuta un caso y mide su rendimiento (se llama en un proceso nuevo)"""
+    engine, arrival_interval, sim_time, base_config, with_report = case
+    import simpy
+    from emergency_simulation import EmergencyRoom
+    from fast_engine import FastEmergencyRoom
+
+    config = {**base_config, 'arrival_interval': arrival_interval, 'trace_level': 'off'}
+    rss_before = peak_rss_mb()
+
+    start = time.perf_counter()
+    if engine == 'fast':
+        er = FastEmergencyRoom(config)
+        er.run(sim_time)
+        events = er.events_processed
+    else:
+        env = simpy.Environment()
+        er = EmergencyRoom(env, config)
+        env.process(er.generate_arrivals())
+        # Mismo recorrido que env.run(until=sim_time), contando los eventos
+        events = 0
+        while env.peek() < sim_time:
+            env.step()
+            events += 1
+    er.finalize()
+    elapsed = time.perf_counter() - start
+
+    config['sim_time'] = sim_time
+    report_seconds = None
+    if with_report:
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            er.stats.generate_report(config, file_prefix=os.path.join(directory, "benchmark"), max_workers=1)
+            report_seconds = time.perf_counter() - start
+
+    return {
+        'engine': engine,
+        'arrival_interval': arrival_interval,
+        'sim_time': sim_time,
+        'events': events,
+        'patients_arrived': er.patient_counter,
+        'patients_finished': er.stats.patient_count(),
+        'simulation_seconds': elapsed,
+        'events_per_sec': events / elapsed if elapsed > 0 else None,
+        'patients_per_sec': er.patient_counter / elapsed if elapsed > 0 else None,
+        'rss_before_mb': rss_before,
+        'peak_rss_mb': peak_rss_mb(),
+        'report_seconds': report_seconds
+    }
+
+
+def run_benchmarks(engines=ENGINES, arrival_intervals=ARRIVAL_INTERVALS, horizons=HORIZONS,
+                   base_config=None, with_report=True):
+    """Ejecuta todos los casos, uno por proceso, y mide los tiempos de importación"""
+    from sensitivity_sweep import BASE_CONFIG
+    from emergency_simulation import MODEL_VERSION
+
+    base_config = dict(base_config or BASE_CONFIG)
+    cases = [(engine, interval, horizon, base_config, with_report)
+             for engine, interval, horizon in itertools.product(engines, arrival_intervals, horizons)]
+
+    results = []
+    # Un proceso por caso (maxtasksperchild=1), uno a la vez para no competir por la CPU
+    with multiprocessing.Pool(processes=1, maxtasksperchild=1) as pool:
+        for result in pool.imap(run_case, cases):
+            print(f"{result['engine']:>6} intervalo={result['arrival_interval']:>4g} "
+                  f"horizonte={result['sim_time']:>6g}h: {result['events_per_sec']:,.0f} eventos/s, "
+                  f"{result['peak_rss_mb']:.1f} MB")
+            results.append(result)
+
+    return {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'model_version': MODEL_VERSION
+        },
+        'import_seconds': {module: measure_import_time(module) for module in IMPORT_MODULES},
+        'cases': results
+    }
+
+
+def case_key(case):
+    return f"{case['engine']}/{case['arrival_interval']:g}/{case['sim_time']:g}"
+
+
+def _regression(metric, current, reference, tolerance):
+    """Cambio relativo si la métrica empeoró más que la tolerancia, si no None"""
+    if current is None or not reference:
+        return None
+    direction, default_tolerance = THRESHOLDS[metric]
+    tolerance = default_tolerance if tolerance is None else tolerance
+    change = (current - reference) / reference
+    worse = -change if direction == 'higher' else change
+    return change if worse > tolerance else None
+
+
+def compare_with_baseline(current, baseline, tolerance=None):
+    """Lista de regresiones (caso, métrica, línea base, actual, cambio relativo)
+
+    `tolerance` reemplaza la tolerancia de todas las métricas si se indica.
+    Los casos que no están en la línea base se ignoran.
+    """
+    regressions = []
+    for module, seconds in current.get('import_seconds', {}).items():
+        reference = baseline.get('import_seconds', {}).get(module)
+        change = _regression('import_seconds', seconds, reference, tolerance)
+        if change is not None:
+            regressions.append((f"import {module}", 'import_seconds', reference, seconds, change))
+
+    reference_cases = {case_key(case): case for case in baseline.get('cases', [])}
+    for case in current.get('cases', []):
+        reference = reference_cases.get(case_key(case))
+        if reference is None:
+            continue
+        for metric in ('events_per_sec', 'patients_per_sec', 'peak_rss_mb', 'report_seconds'):
+            change = _regression(metric, case.get(metric), reference.get(metric), tolerance)
+            if change is not None:
+                regressions.append((case_key(case), metric, reference[metric], case[metric], change))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de rendimiento de la simulación")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--intervals', nargs='+', type=float, default=list(ARRIVAL_INTERVALS),
+                        help="Valores de 'arrival_interval' (menor es más llegadas)")
+    parser.add_argument('--horizons', nargs='+', type=float, default=None,
+                        help="Horizontes en horas (por defecto de un día a un año)")
+    parser.add_argument('--quick', action='store_true', help="Solo horizontes de un día y una semana")
+    parser.add_argument('--no-report', action='store_true', help="No medir la generación del informe")
+    parser.add_argument('--output', default=os.path.join("resultados", "benchmark.json"))
+    parser.add_argument('--baseline', nargs='?', const=DEFAULT_BASELINE, default=None,
+                        help=f"Línea base con la que comparar (sin valor, {DEFAULT_BASELINE})")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f"Guarda los resultados como línea base en {DEFAULT_BASELINE}")
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="Tolerancia relativa para todas las métricas (por ejemplo 0.1)")
+    args = parser.parse_args()
+
+    # Sin línea base no hay comparación posible: se avisa antes de correr los casos
+    if args.baseline and not os.path.exists(args.baseline):
+        print(f"ERROR: no existe la línea base {args.baseline}; "
+              "genérela con 'python benchmark.py --save-baseline' en esta máquina")
+        sys.exit(2)
+
+    horizons = args.horizons or (QUICK_HORIZONS if args.quick else HORIZONS)
+    results = run_benchmarks(args.engines, args.intervals, horizons, with_report=not args.no_report)
+
+    for module, seconds in results['import_seconds'].items():
+        print(f"Importación de {module}: {seconds * 1000:.0f} ms")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Resultados guardados en: {args.output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Línea base guardada en: {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESIONES DE RENDIMIENTO:")
+            for key, metric, reference, current, change in regressions:
+                print(f"- {key} {metric}: {reference:.4g} -> {current:.4g} ({change:+.1%})")
+            sys.exit(1)
+        print("\nSin regresiones respecto a la línea base")
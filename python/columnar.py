@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Almacenamiento columnar para las estadísticas de la simulación
+
+Cada campo se guarda en un arreglo tipado (array.array) preasignado que crece
+al doble cuando se llena. Los nombres de etapas y recursos se convierten a
+códigos enteros pequeños con CodeBook. Las columnas se pueden leer como
+memoryview o como arreglos de NumPy sin copiar los datos.
+"""
+
+from array import array
+
+INITIAL_CAPACITY = 1024
+
+# Clase de tipo de NumPy de cada código de array.array; el ancho sale de itemsize,
+# porque el de 'l' depende de la plataforma (4 bytes en Windows)
+_NUMPY_KINDS = {'b': 'i', 'B': 'u', 'h': 'i', 'H': 'u', 'i': 'i', 'I': 'u', 'l': 'i', 'L': 'u',
+                'q': 'i', 'Q': 'u', 'f': 'f', 'd': 'f'}
+
+
+class CodeBook:
+    """Asigna un código entero pequeño a cada nombre (etapa, recurso)"""
+
+    def __init__(self):
+        self.names = []
+        self._codes = {}
+
+    def code(self, name):
+        """Devuelve el código del nombre, registrándolo si es nuevo"""
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self._codes[name] = code
+            self.names.append(name)
+        return code
+
+    def name(self, code):
+        return self.names[code]
+
+    def __contains__(self, name):
+        return name in self._codes
+
+    def __len__(self):
+        return len(self.names)
+
+
+class ColumnTable:
+    """Tabla de columnas tipadas con filas agregadas al final
+
+    Las vistas devueltas por values() y column() comparten memoria con la
+    tabla, por lo que deben liberarse antes de seguir agregando filas (un
+    arreglo con vistas activas no puede crecer).
+    """
+
+    def __init__(self, columns, capacity=INITIAL_CAPACITY):
+        self.typecodes = dict(columns)
+        self.capacity = capacity
+        self.size = 0
+        self._columns = {name: array(tc, bytes(array(tc).itemsize * capacity))
+                         for name, tc in self.typecodes.items()}
+        self._order = [self._columns[name] for name in self.typecodes]
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self):
+        """Duplica la capacidad de todas las columnas"""
+        for name, col in self._columns.items():
+            col.extend(array(col.typecode, bytes(col.itemsize * self.capacity)))
+        self.capacity *= 2
+
+    def append(self, *row):
+        """Agrega una fila con los valores en el orden de las columnas"""
+        if self.size == self.capacity:
+            self._grow()
+        i = self.size
+        for col, value in zip(self._order, row):
+            col[i] = value
+        self.size = i + 1
+
+    def values(self, name):
+        """Vista (memoryview) de los valores válidos de una columna"""
+        return memoryview(self._columns[name])[:self.size]
+
+    def column(self, name):
+        """Vista de NumPy, sin copia, de los valores válidos de una columna"""
+        import numpy as np
+
+        col = self._columns[name]
+        return np.frombuffer(col, dtype='=%s%d' % (_NUMPY_KINDS[col.typecode], col.itemsize), count=self.size)
+
+    def to_frame(self, categories=None):
+        """Construye un DataFrame con todas las columnas
+
+        `categories` asocia columnas de códigos con su CodeBook para que
+        aparezcan como categorías con su nombre.
+        """
+        import pandas as pd
+
+        data = {}
+        for name in self.typecodes:
+            values = self.column(name)
+            if categories and name in categories:
+                values = pd.Categorical.from_codes(values, categories=categories[name].names)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
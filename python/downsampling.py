@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Reducción de series de tiempo para gráficas de horizontes largos
+
+Las series de utilización son escalonadas: cada registro (tiempo, valor)
+vale hasta el siguiente registro. Para dibujarlas en tiempo constante,
+cualquiera que sea el horizonte, se reducen a:
+
+- cubetas de tiempo de igual ancho con mínimo, media ponderada por tiempo y
+  máximo de la serie dentro de cada cubeta
+- una muestra que conserva la forma de la serie (Largest-Triangle-Three-
+  Buckets, LTTB) con una cantidad fija de puntos
+
+Ambas reducciones son O(n) con NumPy.
+"""
+
+import numpy as np
+
+
+def bucket_step_series(times, values, start, end, buckets):
+    """Mínimo, media ponderada por tiempo y máximo por cubeta de una serie escalonada
+
+    Devuelve un diccionario de arreglos con el inicio de cada cubeta
+    ('time') y 'min', 'mean' y 'max'. Antes del primer registro la serie
+    toma el valor del primer registro.
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if buckets < 1:
+        raise ValueError("Se requiere al menos una cubeta")
+    if end <= start:
+        raise ValueError("El final de la serie debe ser posterior a su inicio")
+    if not len(times):
+        empty = np.empty(0)
+        return {'time': empty, 'min': empty, 'mean': empty, 'max': empty}
+
+    edges = np.linspace(start, end, buckets + 1)
+
+    # Integral acumulada de la serie en cada borde de cubeta
+    widths = np.diff(times, append=max(end, times[-1]))
+    area = np.concatenate(([0.0], np.cumsum(values * widths)))
+    at_edge = np.clip(np.searchsorted(times, edges, side='right') - 1, 0, None)
+    integral = area[at_edge] + values[at_edge] * (edges - times[at_edge])
+    integral[edges < times[0]] = values[0] * (edges[edges < times[0]] - times[0])
+    mean = np.diff(integral) / np.diff(edges)
+
+    # Registros activos en cada cubeta: el vigente al inicio y los que cambian dentro
+    first = at_edge[:-1]
+    last = np.clip(np.searchsorted(times, edges[1:], side='left') - 1, 0, None)
+    last = np.maximum(last, first)
+    bounds = np.empty(2 * buckets, dtype=np.intp)
+    bounds[0::2] = first
+    bounds[1::2] = last + 1
+    padded_min = np.append(values, np.inf)
+    padded_max = np.append(values, -np.inf)
+
+    return {
+        'time': edges[:-1],
+        'min': np.minimum.reduceat(padded_min, bounds)[0::2],
+        'mean': mean,
+        'max': np.maximum.reduceat(padded_max, bounds)[0::2]
+    }
+
+
+def lttb(x, y, points):
+    """Muestra de `points` puntos que conserva la forma de la serie (LTTB)
+
+    Siempre conserva el primer y el último punto; de cada cubeta intermedia
+    elige el punto que forma el triángulo de mayor área con el punto elegido
+    antes y el promedio de la cubeta siguiente.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if points >= n or points < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, points - 1).astype(np.intp)
+    selected = np.empty(points, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_lo, next_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        if next_hi <= next_lo:
+            next_hi = next_lo + 1
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[previous] - avg_x) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (avg_y - y[previous]))
+        previous = lo + int(np.argmax(area))
+        selected[i + 1] = previous
+    return x[selected], y[selected]
+
+
+def reduce_step_series(times, values, end, buckets=500, points=1000, start=0.0):
+    """Reducciones de una serie escalonada para graficar y exportar"""
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(times):
+        end = max(end, times[-1])
+    if end <= start:
+        end, buckets = start + 1.0, 1
+    sample_x, sample_y = lttb(times, values, points)
+    return {
+        'buckets': bucket_step_series(times, values, start, end, buckets),
+        'lttb': {'time': sample_x, 'value': sample_y},
+        'original_points': len(times)
+    }
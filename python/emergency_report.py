@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Informes de la simulación de la sala de emergencias
+
+Gráficas (matplotlib y seaborn), tablas (pandas) y archivos JSON de
+resultados y análisis económico. Este módulo solo se importa cuando se pide
+un informe, de modo que el núcleo de la simulación (emergency_simulation)
+no carga estas bibliotecas en corridas sin informe ni en los procesos del
+pool.
+
+El informe es una lista de tareas independientes (una por gráfica o archivo
+JSON). Los agregados se calculan una sola vez y cada tarea recibe solo la
+parte que necesita; las tareas se dibujan en el mismo proceso con el backend
+Agg, o en un pool de procesos si se pide con max_workers. Cada informe
+guarda un manifiesto con el hash de los datos de cada archivo y las tareas
+cuyos datos no cambiaron desde el último informe se omiten.
+"""
+
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')  # Los informes solo se guardan en archivos
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+from downsampling import reduce_step_series
+from emergency_simulation import DAY_NAMES, economic_summary, monthly_costs
+
+# Configuración de estilo para las gráficas
+plt.style.use('ggplot')
+sns.set_theme(style="whitegrid")
+
+# Versión de las funciones de dibujo (forma parte del hash de cada archivo:
+# incrementarla cuando cambie el aspecto de las gráficas)
+RENDER_VERSION = "2"
+
+# Tamaño de las series de utilización reducidas (ver downsampling)
+REPORT_BUCKETS = 500
+REPORT_POINTS = 1000
+
+
+def ensure_output_dir(file_prefix):
+    """Crea el directorio de resultados del prefijo si no existe"""
+    directory = os.path.dirname(file_prefix)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+
+# Agregados compartidos por todas las tareas del informe
+
+def full_aggregates(stats, simulation_params):
+    """Agregados del informe a partir de los registros por paciente de EmergencyStats"""
+    df_times = stats.patients_frame()
+    severity_stats = (df_times.groupby('severity')['total_time']
+                      .agg(['mean', 'median', 'std', 'count']).reset_index())
+    severity_stats.columns = ['Severidad', 'Tiempo Promedio (min)', 'Tiempo Mediano (min)',
+                              'Desviación Estándar', 'Cantidad Pacientes']
+
+    # Series de utilización por recurso (escalonadas, un punto por evento), reducidas
+    # a una cantidad fija de cubetas y puntos para que las gráficas no dependan del horizonte
+    utilization = {}
+    if len(stats.resource_usage):
+        resources = stats.resource_usage.column('resource')
+        times = stats.resource_usage.column('time')
+        values = stats.resource_usage.column('utilization')
+        end = simulation_params.get('sim_time', float(times.max()))
+        buckets = simulation_params.get('report_buckets', REPORT_BUCKETS)
+        points = simulation_params.get('report_points', REPORT_POINTS)
+        for code, resource in enumerate(stats.resource_codes.names):
+            mask = resources == code
+            utilization[resource] = reduce_step_series(times[mask], values[mask], end, buckets, points)
+
+    stage_waits = []
+    if len(stats.patient_wait_times):
+        df_waits = stats.wait_times_frame()
+        means = df_waits.groupby(['stage', 'severity'], observed=True)['wait_time'].mean().reset_index()
+        stage_waits = means.to_dict('records')
+
+    return _common_aggregates(stats, simulation_params, severity_stats.to_dict('records'),
+                              utilization, stage_waits)
+
+
+def streaming_aggregates(stats, simulation_params):
+    """Agregados del informe a partir de los acumuladores de StreamingEmergencyStats"""
+    severity_stats = [
+        {'Severidad': severity, 'Tiempo Promedio (min)': running.mean,
+         'Tiempo Mediano (min)': sketch.quantile(0.5), 'Desviación Estándar': running.std,
+         'Cantidad Pacientes': running.count}
+        for severity, (running, sketch) in sorted(stats.severity_times.items())
+    ]
+    stage_waits = [
+        {'stage': stage, 'severity': severity, 'wait_time': running.mean}
+        for (stage, severity), (running, _) in sorted(stats.stage_waits.items())
+    ]
+    return _common_aggregates(stats, simulation_params, severity_stats, {}, stage_waits)
+
+
+def aggregates_to_json(aggregates):
+    """Agregados en tipos de JSON (listas en lugar de arreglos), por ejemplo para la caché de resultados"""
+    if isinstance(aggregates, dict):
+        return {key: aggregates_to_json(value) for key, value in aggregates.items()}
+    if isinstance(aggregates, (list, tuple)):
+        return [aggregates_to_json(value) for value in aggregates]
+    if isinstance(aggregates, np.ndarray):
+        return aggregates.tolist()
+    if isinstance(aggregates, np.generic):
+        return aggregates.item()
+    return aggregates
+
+
+def aggregates_from_json(data):
+    """Inversa de aggregates_to_json: las series de utilización vuelven a ser arreglos de NumPy"""
+    aggregates = dict(data)
+    aggregates['utilization'] = {
+        resource: {
+            'buckets': {name: np.asarray(values, dtype=float) for name, values in series['buckets'].items()},
+            'lttb': {name: np.asarray(values, dtype=float) for name, values in series['lttb'].items()},
+            'original_points': series['original_points']
+        }
+        for resource, series in data['utilization'].items()
+    }
+    return aggregates
+
+
+def _common_aggregates(stats, simulation_params, severity_stats, utilization, stage_waits):
+    costs = monthly_costs(simulation_params)
+    economics = economic_summary(simulation_params, stats.patient_count())
+    avg_utilization = stats.average_utilization()
+    total_monthly_cost = economics['total_monthly_cost']
+
+    return {
+        'results': stats.summarize(simulation_params),
+        'severity_stats': severity_stats,
+        'daily': [{'Día': DAY_NAMES[day], 'Pacientes': count} for day, count in stats.daily_patients.items()],
+        'hourly': sorted(({'Hora': hour, 'Pacientes': count} for hour, count in stats.hourly_patients.items()),
+                         key=lambda row: row['Hora']),
+        'utilization': utilization,
+        'stage_waits': stage_waits,
+        'costs': [{'Recurso': resource, 'Costo Mensual ($)': cost} for resource, cost in costs.items()],
+        'utilization_vs_cost': [
+            {'Recurso': resource, 'Utilización Promedio': avg_utilization.get(resource, 0),
+             'Costo Relativo': costs.get(resource, 0) / total_monthly_cost if total_monthly_cost > 0 else 0}
+            for resource in sorted(set(costs) | set(avg_utilization))
+        ] if avg_utilization else [],
+        'economics': {
+            "costs": costs,
+            "total_monthly_cost": total_monthly_cost,
+            "estimated_monthly_patients": economics['estimated_monthly_patients'],
+            "cost_per_patient": economics['cost_per_patient'],
+            "average_resource_utilization": avg_utilization
+        }
+    }
+
+
+def report_tasks(aggregates, file_prefix):
+    """Tareas del informe: (archivo, función, datos, descripción para los errores)"""
+    tasks = [
+        (f"{file_prefix}_tiempo_por_severidad.png", render_severity_times, aggregates['severity_stats'],
+         "gráfica de tiempo por severidad"),
+        (f"{file_prefix}_pacientes_por_dia.png", render_daily_distribution, aggregates['daily'],
+         "gráfica de pacientes por día"),
+        (f"{file_prefix}_pacientes_por_hora.png", render_hourly_distribution, aggregates['hourly'],
+         "gráfica de pacientes por hora"),
+    ]
+    for resource, series in aggregates['utilization'].items():
+        series = {'resource': resource, **series}
+        tasks.append((f"{file_prefix}_{resource}_utilizacion.png", render_utilization,
+                      series, f"gráfica de utilización de {resource}"))
+        tasks.append((f"{file_prefix}_{resource}_utilizacion.json", write_series_json,
+                      series, f"serie de utilización de {resource}"))
+        tasks.append((f"{file_prefix}_{resource}_utilizacion.csv", write_series_csv,
+                      series, f"serie de utilización de {resource}"))
+    if aggregates['stage_waits']:
+        tasks.append((f"{file_prefix}_tiempos_espera_por_etapa.png", render_stage_waits,
+                      aggregates['stage_waits'], "gráfica de tiempos de espera por etapa"))
+    else:
+        print("No hay datos suficientes para la gráfica de tiempos de espera por etapa")
+
+    tasks.append((f"{file_prefix}_results.json", write_json, aggregates['results'],
+                  "archivo JSON de resultados"))
+    tasks.append((f"{file_prefix}_distribucion_costos.png", render_cost_distribution, aggregates['costs'],
+                  "análisis económico"))
+    if aggregates['utilization_vs_cost']:
+        tasks.append((f"{file_prefix}_utilizacion_vs_costo.png", render_utilization_vs_cost,
+                      aggregates['utilization_vs_cost'], "análisis económico"))
+    tasks.append((f"{file_prefix}_economic_analysis.json", write_json, aggregates['economics'],
+                  "análisis económico"))
+    return tasks
+
+
+# Hash de los datos de cada tarea y manifiesto de archivos generados
+
+def data_hash(renderer, data):
+    """Hash SHA-256 de los datos de una tarea, su función de dibujo y RENDER_VERSION"""
+    digest = hashlib.sha256(f"{RENDER_VERSION}:{renderer.__name__}".encode('utf-8'))
+
+    def feed(value):
+        if isinstance(value, dict):
+            digest.update(b'{')
+            for key in sorted(value, key=str):
+                feed(str(key))
+                feed(value[key])
+            digest.update(b'}')
+        elif isinstance(value, (list, tuple)):
+            digest.update(b'[')
+            for item in value:
+                feed(item)
+            digest.update(b']')
+        elif isinstance(value, np.ndarray):
+            digest.update(f"{value.dtype.str}{value.shape}".encode('utf-8'))
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(repr(value).encode('utf-8'))
+            digest.update(b';')
+
+    feed(data)
+    return digest.hexdigest()
+
+
+def _manifest_path(file_prefix):
+    return f"{file_prefix}_manifest.json"
+
+
+def _load_manifest(file_prefix):
+    try:
+        with open(_manifest_path(file_prefix), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _prune_manifest(manifest, file_prefix, tasks):
+    """Quita del manifiesto (y del disco) los archivos que las tareas ya no producen"""
+    current = {os.path.basename(path) for path, _, _, _ in tasks}
+    directory = os.path.dirname(file_prefix)
+    stale = [key for key in manifest if key not in current]
+    for key in stale:
+        del manifest[key]
+        try:
+            os.remove(os.path.join(directory, key))
+        except FileNotFoundError:
+            pass
+    return len(stale)
+
+
+# Ejecución de las tareas
+
+def _run_task(task):
+    """Ejecuta una tarea; devuelve (archivo, mensaje de error o None)"""
+    path, renderer, data, description = task
+    try:
+        renderer(path, data)
+        return path, None
+    except Exception as e:
+        return path, f"Error al generar {description}: {e}"
+
+
+def render_reports(jobs, max_workers=None, force=False):
+    """Genera los informes de varias corridas
+
+    `jobs` es una lista de (agregados, prefijo de archivos). Las tareas cuyos
+    datos tienen el mismo hash que en el manifiesto del prefijo (y cuyo
+    archivo existe) se omiten salvo con force=True. Los archivos del
+    manifiesto que el informe actual ya no produce (por ejemplo, las gráficas
+    del modo completo en un informe de streaming) se borran. Sin max_workers
+    las tareas se dibujan en este proceso; con max_workers > 1 se usa un
+    solo pool para todos los informes. Devuelve la cantidad de archivos
+    generados, omitidos y borrados.
+    """
+    pending = []
+    manifests = {}
+    skipped = 0
+    removed = 0
+    for aggregates, file_prefix in jobs:
+        ensure_output_dir(file_prefix)
+        manifest = manifests[file_prefix] = _load_manifest(file_prefix)
+        tasks = report_tasks(aggregates, file_prefix)
+        removed += _prune_manifest(manifest, file_prefix, tasks)
+        for task in tasks:
+            path, renderer, data, _ = task
+            key = os.path.basename(path)
+            digest = data_hash(renderer, data)
+            if not force and manifest.get(key) == digest and os.path.exists(path):
+                skipped += 1
+                continue
+            manifest[key] = digest
+            pending.append((file_prefix, task))
+
+    # El arranque de un pool cuesta más que dibujar unas pocas gráficas
+    workers = max(1, min(max_workers or 1, len(pending)))
+
+    tasks = [task for _, task in pending]
+    if workers == 1:
+        outcomes = [_run_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_run_task, tasks))
+
+    for (file_prefix, _), (path, error) in zip(pending, outcomes):
+        if error is not None:
+            print(error)
+            # Sin hash en el manifiesto el archivo se vuelve a intentar la próxima vez
+            manifests[file_prefix].pop(os.path.basename(path), None)
+
+    for file_prefix, manifest in manifests.items():
+        with open(_manifest_path(file_prefix), 'w') as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+
+    return {'rendered': len(pending), 'skipped': skipped, 'removed': removed}
+
+
+def full_report(stats, simulation_params, file_prefix, max_workers=None):
+    """Informe completo a partir de los registros por paciente de EmergencyStats"""
+    # Verificar si hay datos suficientes
+    if not stats.patient_count():
+        print("ADVERTENCIA: No hay suficientes datos para generar un informe completo.")
+        return {
+            "error": "No hay suficientes datos para un análisis estadístico",
+            "simulation_parameters": simulation_params,
+            "total_patients": 0
+        }
+
+    return render_aggregates(full_aggregates(stats, simulation_params), file_prefix, max_workers)
+
+
+def streaming_report(stats, simulation_params, file_prefix, max_workers=None):
+    """Informe de StreamingEmergencyStats, sin las gráficas que requieren registros individuales"""
+    if not stats.patient_count():
+        print("ADVERTENCIA: No hay suficientes datos para generar un informe completo.")
+        return stats.summarize(simulation_params)
+
+    return render_aggregates(streaming_aggregates(stats, simulation_params), file_prefix, max_workers)
+
+
+def render_aggregates(aggregates, file_prefix, max_workers=None):
+    """Informe de una corrida a partir de sus agregados (calculados o leídos de la caché)"""
+    render_reports([(aggregates, file_prefix)], max_workers)
+    return aggregates['results']
+
+
+# Funciones de dibujo: cada una recibe el archivo de salida y sus datos
+
+def render_severity_times(path, rows):
+    """Gráfica de tiempo promedio por severidad"""
+    plt.figure(figsize=(10, 6))
+    sns.barplot(x='Severidad', y='Tiempo Promedio (min)', data=pd.DataFrame(rows))
+    plt.title('Tiempo Promedio de Atención por Nivel de Severidad')
+    plt.xlabel('Nivel de Severidad (1: más urgente, 5: menos urgente)')
+    plt.ylabel('Tiempo Promedio (minutos)')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_daily_distribution(path, rows):
+    """Gráfica de distribución de pacientes por día de la semana"""
+    plt.figure(figsize=(10, 6))
+    sns.barplot(x='Día', y='Pacientes', data=pd.DataFrame(rows))
+    plt.title('Distribución de Pacientes por Día de la Semana')
+    plt.xlabel('Día')
+    plt.ylabel('Número de Pacientes')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_hourly_distribution(path, rows):
+    """Gráfica de distribución de pacientes por hora del día"""
+    plt.figure(figsize=(12, 6))
+    sns.barplot(x='Hora', y='Pacientes', data=pd.DataFrame(rows))
+    plt.title('Distribución de Pacientes por Hora del Día')
+    plt.xlabel('Hora (24h)')
+    plt.ylabel('Número de Pacientes')
+    plt.xticks(range(0, 24, 2))
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_utilization(path, series):
+    """Gráfica de utilización de un recurso a lo largo del tiempo (serie reducida)"""
+    buckets = series['buckets']
+    sample = series['lttb']
+    plt.figure(figsize=(14, 6))
+    plt.fill_between(buckets['time'], buckets['min'], buckets['max'], step='post', alpha=0.3,
+                     label='Mínimo y máximo por intervalo')
+    plt.step(sample['time'], sample['value'], where='post', linewidth=0.8, label='Utilización')
+    plt.title(f"Utilización de {series['resource']} a lo largo del tiempo")
+    plt.legend(loc='upper right')
+    plt.xlabel('Tiempo de Simulación (horas)')
+    plt.ylabel('Tasa de Utilización')
+    plt.ylim(0, 1.05)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_stage_waits(path, rows):
+    """Gráfica de tiempo promedio de espera por etapa y severidad"""
+    plt.figure(figsize=(12, 8))
+    sns.barplot(x='severity', y='wait_time', hue='stage', data=pd.DataFrame(rows))
+    plt.title('Tiempo Promedio de Espera por Etapa y Severidad')
+    plt.xlabel('Severidad')
+    plt.ylabel('Tiempo de Espera Promedio (minutos)')
+    plt.legend(title='Etapa')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_cost_distribution(path, rows):
+    """Gráfica de costos mensuales por tipo de recurso"""
+    cost_df = pd.DataFrame(rows)
+    plt.figure(figsize=(10, 6))
+    ax = sns.barplot(x='Recurso', y='Costo Mensual ($)', data=cost_df)
+    plt.title('Distribución de Costos Mensuales por Tipo de Recurso')
+    plt.xlabel('Tipo de Recurso')
+    plt.ylabel('Costo Mensual ($)')
+    plt.xticks(rotation=45)
+    for i, v in enumerate(cost_df['Costo Mensual ($)']):
+        ax.text(i, v + 100, f"${v:,.0f}", ha='center')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def render_utilization_vs_cost(path, rows):
+    """Gráfica comparativa de utilización vs costo por recurso"""
+    util_cost_df = pd.DataFrame(rows)
+    plt.figure(figsize=(10, 6))
+    ax1 = plt.gca()
+    ax2 = ax1.twinx()
+
+    sns.barplot(x='Recurso', y='Utilización Promedio', data=util_cost_df, ax=ax1, alpha=0.7, color='blue')
+    sns.barplot(x='Recurso', y='Costo Relativo', data=util_cost_df, ax=ax2, alpha=0.4, color='red')
+
+    ax1.set_ylabel('Utilización Promedio', color='blue')
+    ax2.set_ylabel('Proporción del Costo Total', color='red')
+
+    plt.title('Comparativa de Utilización vs Costo por Recurso')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def write_json(path, data):
+    """Guarda un archivo JSON del informe"""
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+
+
+def write_series_json(path, series):
+    """Exporta una serie de utilización reducida (cubetas y muestra LTTB) a JSON"""
+    data = {
+        'resource': series['resource'],
+        'original_points': series['original_points'],
+        'buckets': {name: values.tolist() for name, values in series['buckets'].items()},
+        'lttb': {name: values.tolist() for name, values in series['lttb'].items()}
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+def write_series_csv(path, series):
+    """Exporta las cubetas (inicio, mínimo, media y máximo) de una serie de utilización a CSV"""
+    buckets = series['buckets']
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['time', 'min', 'mean', 'max'])
+        writer.writerows(zip(*(buckets[name].tolist() for name in ('time', 'min', 'mean', 'max'))))
@@ -11,55 +11,125 @@ colas de prioridad y recursos con tiempo limitado.
 """
 
 import simpy
-import random
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import defaultdict
+import argparse
 import json
+import math
 import os
+from columnar import CodeBook, ColumnTable
+from online_stats import QuantileSketch, RunningStats, percentile
+from output_analysis import steady_state_summary
+from arrivals import arrival_process_from_config
+from event_trace import TRACE_LEVELS, EventTracer
+from monitored_resource import MonitoredPriorityResource
+from pathways import pathway_from_config
+from variates import VariateSupply
+
+# Versión del modelo (forma parte de la clave de la caché de resultados:
+# incrementarla cuando un cambio del modelo altere los resultados)
+MODEL_VERSION = "4"
+
+# Prefijo de los archivos del informe
+REPORT_PREFIX = os.path.join("resultados", "emergency_simulation")
+
+# Nombres de los días de la semana (0: lunes)
+DAY_NAMES = {0: 'Lunes', 1: 'Martes', 2: 'Miércoles', 3: 'Jueves',
+             4: 'Viernes', 5: 'Sábado', 6: 'Domingo'}
+
+def monthly_costs(params):
+    """Costos mensuales por tipo de recurso (valores ejemplo, ajustar según investigación)"""
+    return {
+        'nurses': params.get('nurse_salary_monthly', 1500) * params.get('num_nurses', 5),
+        'doctors': params.get('doctor_salary_monthly', 4500) * params.get('num_doctors', 3),
+        'triage_nurses': params.get('nurse_salary_monthly', 1500) * params.get('num_triage_nurses', 2),
+        'xray_machines': (params.get('xray_machine_cost', 120000) / (5*12)) * params.get('num_xray', 2),  # Depreciar en 5 años
+        'lab_equipment': (params.get('lab_equipment_cost', 75000) / (3*12)) * params.get('num_labs', 2)  # Depreciar en 3 años
+    }
+
+
+def economic_summary(params, total_patients):
+    """Costo mensual total, pacientes mensuales estimados y costo por paciente"""
+    # Calcular costo total mensual
+    total_monthly_cost = sum(monthly_costs(params).values())
+
+    # Estimar pacientes mensuales basado en la simulación
+    total_sim_hours = params.get('sim_time', 168)
+    patients_per_hour = total_patients / total_sim_hours if total_sim_hours > 0 else 0
+    estimated_monthly_patients = patients_per_hour * 24 * 30  # Pacientes estimados por mes
+
+    # Calcular costo por paciente
+    cost_per_patient = total_monthly_cost / estimated_monthly_patients if estimated_monthly_patients > 0 else 0
+
+    return {
+        "total_monthly_cost": total_monthly_cost,
+        "estimated_monthly_patients": estimated_monthly_patients,
+        "cost_per_patient": cost_per_patient
+    }
+
+
+def exact_summary(values):
+    """Conteo, media, desviación estándar y cuantiles exactos de una lista de valores"""
+    ordered = sorted(values)
+    n = len(ordered)
+    mean = math.fsum(ordered) / n
+    return {
+        'count': n,
+        'mean': mean,
+        'std': math.sqrt(math.fsum((value - mean) ** 2 for value in ordered) / (n - 1)) if n > 1 else 0.0,
+        'median': percentile(ordered, 0.5),
+        'p90': percentile(ordered, 0.9),
+        'p99': percentile(ordered, 0.99)
+    }
+
 
-# Configuración de estilo para las gráficas
-plt.style.use('ggplot')
-sns.set_theme(style="whitegrid")
+def streaming_summary(running, sketch):
+    """Mismo formato que exact_summary a partir de acumuladores en línea"""
+    return {
+        'count': running.count,
+        'mean': running.mean,
+        'std': running.std,
+        'median': sketch.quantile(0.5),
+        'p90': sketch.quantile(0.9),
+        'p99': sketch.quantile(0.99)
+    }
 
-# Asegúrate de que exista el directorio para los resultados
-output_dir = "resultados"
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
 
 # Clase para reunir estadísticas
 class EmergencyStats:
     def __init__(self):
-        self.patient_times = []  # Tiempo total de cada paciente
-        self.patient_wait_times = defaultdict(list)  # Tiempos de espera en cada etapa
-        self.patient_severity = []  # Distribución de severidad
+        # Códigos enteros para los nombres de etapas y recursos
+        self.stage_codes = CodeBook()
+        self.resource_codes = CodeBook()
+
+        # Tiempo total de cada paciente
+        self.patient_times = ColumnTable({
+            'patient_id': 'q', 'severity': 'b', 'entry_time': 'd', 'exit_time': 'd', 'total_time': 'd'
+        })
+        # Tiempos de espera en cada etapa
+        self.patient_wait_times = ColumnTable({
+            'patient_id': 'q', 'severity': 'b', 'stage': 'b', 'wait_time': 'd'
+        })
+        # Uso de recursos (un registro por cada cambio de estado)
+        self.resource_usage = ColumnTable({
+            'resource': 'b', 'time': 'd', 'capacity': 'q', 'in_use': 'q', 'utilization': 'd', 'queue_length': 'q'
+        })
+        # Indicadores ponderados por tiempo de cada recurso al final de la corrida
+        self.resource_summary = {}
+        # Entradas realizadas y sus valores esperados (variables de control)
+        self.input_statistics = {}
+
         self.daily_patients = defaultdict(int)  # Pacientes por día de la semana
         self.hourly_patients = defaultdict(int)  # Pacientes por hora del día
-        self.resource_usage = defaultdict(list)  # Uso de recursos
 
     def add_patient_time(self, patient_id, severity, entry_time, exit_time, wait_times):
         """Registra el tiempo total de un paciente en el sistema"""
-        total_time = exit_time - entry_time
-        self.patient_times.append({
-            'patient_id': patient_id,
-            'severity': severity,
-            'entry_time': entry_time,
-            'exit_time': exit_time,
-            'total_time': total_time
-        })
+        self.patient_times.append(patient_id, severity, entry_time, exit_time, exit_time - entry_time)
 
         # Registrar tiempos de espera en cada etapa
+        stage_code = self.stage_codes.code
+        append_wait = self.patient_wait_times.append
         for stage, time in wait_times.items():
-            self.patient_wait_times[stage].append({
-                'patient_id': patient_id,
-                'severity': severity,
-                'wait_time': time
-            })
-
-        # Registrar severidad
-        self.patient_severity.append(severity)
+            append_wait(patient_id, severity, stage_code(stage), time)
 
         # Registrar día y hora (simulados)
         day = int((entry_time // 24) % 7)  # 0-6 (lun-dom)
@@ -67,506 +137,515 @@ class EmergencyStats:
         self.daily_patients[day] += 1
         self.hourly_patients[hour] += 1
 
-    def log_resource_usage(self, resource_name, capacity, in_use, time):
+    def log_resource_usage(self, resource_name, capacity, in_use, time, queue_length=0):
         """Registra el uso de recursos a lo largo del tiempo"""
-        self.resource_usage[resource_name].append({
-            'time': time,
-            'capacity': capacity,
-            'in_use': in_use,
-            'utilization': in_use / capacity if capacity > 0 else 0
-        })
-
-    def generate_report(self, simulation_params, file_prefix=os.path.join("resultados", "emergency_simulation")):
-        """Genera un informe con gráficas y estadísticas"""
-        # Verificar si hay datos suficientes
-        if not self.patient_times:
-            print("ADVERTENCIA: No hay suficientes datos para generar un informe completo.")
+        self.resource_usage.append(self.resource_codes.code(resource_name), time, capacity, in_use,
+                                   in_use / capacity if capacity > 0 else 0, queue_length)
+
+    def log_resource_series(self, resource_name, rows):
+        """Registra en bloque los cambios de estado (hora, capacidad, en uso, cola) de un recurso"""
+        code = self.resource_codes.code(resource_name)
+        append = self.resource_usage.append
+        for time, capacity, in_use, queue_length in rows:
+            append(code, time, capacity, in_use, in_use / capacity if capacity > 0 else 0, queue_length)
+
+    def record_resource_summary(self, resource_name, summary):
+        """Guarda los indicadores ponderados por tiempo de un recurso"""
+        self.resource_summary[resource_name] = summary
+
+    def record_input_statistics(self, statistics):
+        """Guarda las entradas realizadas de la corrida (llegadas y mezcla de severidades)"""
+        self.input_statistics = statistics
+
+    def patients_frame(self):
+        """DataFrame de pacientes construido sobre las columnas"""
+        return self.patient_times.to_frame()
+
+    def wait_times_frame(self):
+        """DataFrame de tiempos de espera con la etapa como categoría"""
+        return self.patient_wait_times.to_frame({'stage': self.stage_codes})
+
+    def resource_usage_frame(self):
+        """DataFrame de uso de recursos con el recurso como categoría"""
+        return self.resource_usage.to_frame({'resource': self.resource_codes})
+
+    def average_utilization(self):
+        """Utilización promedio de cada recurso (ponderada por tiempo si está disponible)"""
+        if self.resource_summary:
+            return {resource: summary['utilization'] for resource, summary in self.resource_summary.items()}
+        if not len(self.resource_usage):
+            return {}
+        df_usage = self.resource_usage_frame()
+        means = df_usage.groupby('resource', observed=True)['utilization'].mean()
+        return {str(resource): float(value) for resource, value in means.items()}
+
+    def patient_count(self):
+        """Cantidad de pacientes que salieron del sistema"""
+        return len(self.patient_times)
+
+    def summarize(self, simulation_params):
+        """Calcula el diccionario de resultados sin generar gráficas ni archivos"""
+        if not self.patient_count():
             return {
                 "error": "No hay suficientes datos para un análisis estadístico",
                 "simulation_parameters": simulation_params,
                 "total_patients": 0
             }
 
-        # Convertir a DataFrames para facilitar el análisis
-        df_times = pd.DataFrame(self.patient_times)
-
-        # Calcular estadísticas por severidad
-        severity_stats = None
-        try:
-            severity_stats = df_times.groupby('severity')['total_time'].agg(['mean', 'median', 'std', 'count']).reset_index()
-            severity_stats.columns = ['Severidad', 'Tiempo Promedio (min)', 'Tiempo Mediano (min)', 'Desviación Estándar', 'Cantidad Pacientes']
-        except KeyError:
-            print("ADVERTENCIA: No se pueden calcular estadísticas por severidad. Verificando columnas disponibles:")
-            print(df_times.columns.tolist())
-            severity_stats = pd.DataFrame({
-                'Severidad': list(set(self.patient_severity)),
-                'Tiempo Promedio (min)': [df_times['total_time'].mean()] * len(set(self.patient_severity)),
-                'Tiempo Mediano (min)': [df_times['total_time'].median()] * len(set(self.patient_severity)),
-                'Desviación Estándar': [df_times['total_time'].std()] * len(set(self.patient_severity)),
-                'Cantidad Pacientes': [len(df_times)] * len(set(self.patient_severity))
-            })
-
-        # Gráfica 1: Tiempo promedio por severidad
-        try:
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x='Severidad', y='Tiempo Promedio (min)', data=severity_stats)
-            plt.title('Tiempo Promedio de Atención por Nivel de Severidad')
-            plt.xlabel('Nivel de Severidad (1: más urgente, 5: menos urgente)')
-            plt.ylabel('Tiempo Promedio (minutos)')
-            plt.tight_layout()
-            plt.savefig(f"{file_prefix}_tiempo_por_severidad.png")
-            plt.close()
-        except Exception as e:
-            print(f"Error al generar gráfica de tiempo por severidad: {e}")
-
-        # Gráfica 2: Distribución de pacientes por día de la semana
-        try:
-            days = {0: 'Lunes', 1: 'Martes', 2: 'Miércoles', 3: 'Jueves',
-                    4: 'Viernes', 5: 'Sábado', 6: 'Domingo'}
-            daily_df = pd.DataFrame([
-                {'Día': days[day], 'Pacientes': count}
-                for day, count in self.daily_patients.items()
-            ])
-
-            plt.figure(figsize=(10, 6))
-            sns.barplot(x='Día', y='Pacientes', data=daily_df)
-            plt.title('Distribución de Pacientes por Día de la Semana')
-            plt.xlabel('Día')
-            plt.ylabel('Número de Pacientes')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.savefig(f"{file_prefix}_pacientes_por_dia.png")
-            plt.close()
-        except Exception as e:
-            print(f"Error al generar gráfica de pacientes por día: {e}")
-
-        # Gráfica 3: Distribución de pacientes por hora
-        try:
-            hourly_df = pd.DataFrame([
-                {'Hora': hour, 'Pacientes': count}
-                for hour, count in self.hourly_patients.items()
-            ]).sort_values('Hora')
-
-            plt.figure(figsize=(12, 6))
-            sns.barplot(x='Hora', y='Pacientes', data=hourly_df)
-            plt.title('Distribución de Pacientes por Hora del Día')
-            plt.xlabel('Hora (24h)')
-            plt.ylabel('Número de Pacientes')
-            plt.xticks(range(0, 24, 2))
-            plt.tight_layout()
-            plt.savefig(f"{file_prefix}_pacientes_por_hora.png")
-            plt.close()
-        except Exception as e:
-            print(f"Error al generar gráfica de pacientes por hora: {e}")
-
-        # Gráfica 4: Utilización de recursos a lo largo del tiempo
-        for resource, usage_data in self.resource_usage.items():
-            if not usage_data:
-                continue
-
-            try:
-                resource_df = pd.DataFrame(usage_data)
-
-                plt.figure(figsize=(14, 6))
-                sns.lineplot(x='time', y='utilization', data=resource_df)
-                plt.title(f'Utilización de {resource} a lo largo del tiempo')
-                plt.xlabel('Tiempo de Simulación (horas)')
-                plt.ylabel('Tasa de Utilización')
-                plt.ylim(0, 1.05)
-                plt.tight_layout()
-                plt.savefig(f"{file_prefix}_{resource}_utilizacion.png")
-                plt.close()
-            except Exception as e:
-                print(f"Error al generar gráfica de utilización de {resource}: {e}")
-
-        # Gráfica 5: Comparativa de tiempos de espera por etapa
-        try:
-            wait_times_by_stage = {}
-            for stage, times in self.patient_wait_times.items():
-                if not times:
-                    continue
-                df = pd.DataFrame(times)
-                try:
-                    wait_times_by_stage[stage] = df.groupby('severity')['wait_time'].mean().reset_index()
-                    wait_times_by_stage[stage]['stage'] = stage
-                except KeyError:
-                    # Si hay error, usar un enfoque más simple
-                    wait_times_by_stage[stage] = pd.DataFrame({
-                        'severity': [1],  # Valor predeterminado
-                        'wait_time': [df['wait_time'].mean()],
-                        'stage': [stage]
-                    })
-
-            if wait_times_by_stage:
-                wait_times_df = pd.concat(wait_times_by_stage.values())
-
-                plt.figure(figsize=(12, 8))
-                sns.barplot(x='severity', y='wait_time', hue='stage', data=wait_times_df)
-                plt.title('Tiempo Promedio de Espera por Etapa y Severidad')
-                plt.xlabel('Severidad')
-                plt.ylabel('Tiempo de Espera Promedio (minutos)')
-                plt.legend(title='Etapa')
-                plt.tight_layout()
-                plt.savefig(f"{file_prefix}_tiempos_espera_por_etapa.png")
-                plt.close()
-            else:
-                print("No hay datos suficientes para la gráfica de tiempos de espera por etapa")
-        except Exception as e:
-            print(f"Error al generar gráfica de tiempos de espera por etapa: {e}")
-
-        # Guardar datos de simulación y resultados
+        total_times = self.patient_times.values('total_time')
+        overall = exact_summary(total_times)
+
+        # Agrupar tiempos por severidad y esperas por etapa y severidad
+        times_by_severity = defaultdict(list)
+        for severity, total_time in zip(self.patient_times.values('severity'), total_times):
+            times_by_severity[severity].append(total_time)
+
+        waits_by_stage = defaultdict(lambda: defaultdict(list))
+        waits = self.patient_wait_times
+        for stage, severity, wait in zip(waits.values('stage'), waits.values('severity'), waits.values('wait_time')):
+            waits_by_stage[stage][severity].append(wait)
+
         results = {
             "simulation_parameters": simulation_params,
-            "average_time_in_system": df_times['total_time'].mean(),
-            "median_time_in_system": df_times['total_time'].median(),
-            "total_patients": len(df_times),
-            "daily_distribution": {days[day]: count for day, count in self.daily_patients.items()},
+            "average_time_in_system": overall['mean'],
+            "median_time_in_system": overall['median'],
+            "p90_time_in_system": overall['p90'],
+            "p99_time_in_system": overall['p99'],
+            "total_patients": overall['count'],
+            "severity_statistics": {str(severity): exact_summary(values)
+                                    for severity, values in sorted(times_by_severity.items())},
+            "wait_time_by_stage": {self.stage_codes.name(stage): {str(severity): exact_summary(values)
+                                                                  for severity, values in sorted(by_severity.items())}
+                                   for stage, by_severity in waits_by_stage.items()},
+            "resource_utilization": self.resource_summary,
+            "input_statistics": self.input_statistics,
+            "daily_distribution": {DAY_NAMES[day]: count for day, count in self.daily_patients.items()},
             "hourly_distribution": {str(hour): count for hour, count in self.hourly_patients.items()}
         }
 
-        try:
-            with open(f"{file_prefix}_results.json", 'w') as f:
-                json.dump(results, f, indent=4)
-        except Exception as e:
-            print(f"Error al guardar archivo JSON de resultados: {e}")
+        # Régimen estacionario (opcional, 'warmup_method': 'mser5' o 'none'): calentamiento
+        # e intervalos por medias de lotes
+        warmup = simulation_params.get('warmup_method')
+        if warmup:
+            results["steady_state_time_in_system"] = steady_state_summary(
+                self.patient_times.values('entry_time').tolist(), total_times.tolist(),
+                groups=self.patient_times.values('severity').tolist(),
+                batches=simulation_params.get('batch_count', 20),
+                confidence=simulation_params.get('confidence_level', 0.95),
+                warmup=warmup)
+        return results
 
-        # Generar análisis económico
-        try:
-            self._generate_economic_analysis(simulation_params, file_prefix)
-        except Exception as e:
-            print(f"Error al generar análisis económico: {e}")
+    def generate_report(self, simulation_params, file_prefix=REPORT_PREFIX,
+                        max_workers=None):
+        """Genera un informe con gráficas y estadísticas (emergency_report)"""
+        from emergency_report import full_report
+        return full_report(self, simulation_params, file_prefix, max_workers)
 
-        return results
+    def report_aggregates(self, simulation_params):
+        """Agregados del informe completo (emergency_report.full_aggregates)"""
+        from emergency_report import full_aggregates
+        return full_aggregates(self, simulation_params)
 
-    def _generate_economic_analysis(self, params, file_prefix):
-        """Genera un análisis económico basado en los recursos utilizados"""
-        # Costos mensuales por tipo de recurso (valores ejemplo, ajustar según investigación)
-        costs = {
-            'nurses': params.get('nurse_salary_monthly', 1500) * params.get('num_nurses', 5),
-            'doctors': params.get('doctor_salary_monthly', 4500) * params.get('num_doctors', 3),
-            'triage_nurses': params.get('nurse_salary_monthly', 1500) * params.get('num_triage_nurses', 2),
-            'xray_machines': (params.get('xray_machine_cost', 120000) / (5*12)) * params.get('num_xray', 2),  # Depreciar en 5 años
-            'lab_equipment': (params.get('lab_equipment_cost', 75000) / (3*12)) * params.get('num_labs', 2)  # Depreciar en 3 años
-        }
 
-        # Calcular costo total mensual
-        total_monthly_cost = sum(costs.values())
-
-        # Estimar pacientes mensuales basado en la simulación
-        total_sim_hours = params.get('sim_time', 168)
-        patients_per_hour = len(self.patient_times) / total_sim_hours if total_sim_hours > 0 else 0
-        estimated_monthly_patients = patients_per_hour * 24 * 30  # Pacientes estimados por mes
-
-        # Calcular costo por paciente
-        cost_per_patient = total_monthly_cost / estimated_monthly_patients if estimated_monthly_patients > 0 else 0
-
-        # Calcular utilización promedio de recursos
-        avg_utilization = {}
-        for resource, usage_data in self.resource_usage.items():
-            if usage_data:
-                df = pd.DataFrame(usage_data)
-                avg_utilization[resource] = df['utilization'].mean()
-
-        # Crear gráfico de costos
-        cost_df = pd.DataFrame([
-            {'Recurso': resource, 'Costo Mensual ($)': cost}
-            for resource, cost in costs.items()
-        ])
-
-        plt.figure(figsize=(10, 6))
-        ax = sns.barplot(x='Recurso', y='Costo Mensual ($)', data=cost_df)
-        plt.title('Distribución de Costos Mensuales por Tipo de Recurso')
-        plt.xlabel('Tipo de Recurso')
-        plt.ylabel('Costo Mensual ($)')
-        plt.xticks(rotation=45)
-        for i, v in enumerate(cost_df['Costo Mensual ($)']):
-            ax.text(i, v + 100, f"${v:,.0f}", ha='center')
-        plt.tight_layout()
-        plt.savefig(f"{file_prefix}_distribucion_costos.png")
-        plt.close()
-
-        # Crear gráfico comparativo de utilización vs costo
-        if avg_utilization:
-            util_cost_df = pd.DataFrame([
-                {'Recurso': resource, 'Utilización Promedio': avg_utilization.get(resource, 0),
-                 'Costo Relativo': costs.get(resource, 0) / total_monthly_cost if total_monthly_cost > 0 else 0}
-                for resource in set(list(costs.keys()) + list(avg_utilization.keys()))
-            ])
-
-            plt.figure(figsize=(10, 6))
-            ax1 = plt.gca()
-            ax2 = ax1.twinx()
-
-            sns.barplot(x='Recurso', y='Utilización Promedio', data=util_cost_df, ax=ax1, alpha=0.7, color='blue')
-            sns.barplot(x='Recurso', y='Costo Relativo', data=util_cost_df, ax=ax2, alpha=0.4, color='red')
-
-            ax1.set_ylabel('Utilización Promedio', color='blue')
-            ax2.set_ylabel('Proporción del Costo Total', color='red')
-
-            plt.title('Comparativa de Utilización vs Costo por Recurso')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.savefig(f"{file_prefix}_utilizacion_vs_costo.png")
-            plt.close()
-
-        # Guardar informe económico
-        economic_results = {
-            "costs": costs,
-            "total_monthly_cost": total_monthly_cost,
-            "estimated_monthly_patients": estimated_monthly_patients,
-            "cost_per_patient": cost_per_patient,
-            "average_resource_utilization": avg_utilization
+class StreamingEmergencyStats(EmergencyStats):
+    """Estadísticas en línea con memoria acotada para horizontes largos
+
+    No guarda registros por paciente: mantiene media y varianza (Welford) y
+    un sketch de cuantiles por severidad y por etapa, además del promedio de
+    utilización por recurso. El informe no incluye series de tiempo.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.resource_summary = {}
+        self.input_statistics = {}
+        self.total_time = RunningStats()
+        self.total_time_sketch = QuantileSketch(relative_accuracy)
+        self.severity_times = {}  # severidad -> (RunningStats, QuantileSketch)
+        self.stage_waits = {}  # (etapa, severidad) -> (RunningStats, QuantileSketch)
+        self.utilization = {}  # recurso -> RunningStats
+        self.daily_patients = defaultdict(int)  # Pacientes por día de la semana
+        self.hourly_patients = defaultdict(int)  # Pacientes por hora del día
+
+    def _accumulators(self, table, key):
+        acc = table.get(key)
+        if acc is None:
+            acc = table[key] = (RunningStats(), QuantileSketch(self.relative_accuracy))
+        return acc
+
+    def add_patient_time(self, patient_id, severity, entry_time, exit_time, wait_times):
+        """Acumula el tiempo total y las esperas de un paciente"""
+        total_time = exit_time - entry_time
+        self.total_time.add(total_time)
+        self.total_time_sketch.add(total_time)
+
+        running, sketch = self._accumulators(self.severity_times, severity)
+        running.add(total_time)
+        sketch.add(total_time)
+
+        for stage, time in wait_times.items():
+            running, sketch = self._accumulators(self.stage_waits, (stage, severity))
+            running.add(time)
+            sketch.add(time)
+
+        # Registrar día y hora (simulados)
+        day = int((entry_time // 24) % 7)  # 0-6 (lun-dom)
+        hour = int(entry_time % 24)  # 0-23
+        self.daily_patients[day] += 1
+        self.hourly_patients[hour] += 1
+
+    def log_resource_usage(self, resource_name, capacity, in_use, time, queue_length=0):
+        """Acumula la utilización observada de un recurso"""
+        running = self.utilization.get(resource_name)
+        if running is None:
+            running = self.utilization[resource_name] = RunningStats()
+        running.add(in_use / capacity if capacity > 0 else 0)
+
+    def log_resource_series(self, resource_name, rows):
+        """Acumula en bloque los cambios de estado (hora, capacidad, en uso, cola) de un recurso"""
+        for _, capacity, in_use, queue_length in rows:
+            self.log_resource_usage(resource_name, capacity, in_use, None, queue_length)
+
+    def patient_count(self):
+        return self.total_time.count
+
+    def average_utilization(self):
+        if self.resource_summary:
+            return {resource: summary['utilization'] for resource, summary in self.resource_summary.items()}
+        return {resource: running.mean for resource, running in self.utilization.items()}
+
+    def summarize(self, simulation_params):
+        """Calcula el diccionario de resultados a partir de los acumuladores"""
+        if not self.patient_count():
+            return {
+                "error": "No hay suficientes datos para un análisis estadístico",
+                "simulation_parameters": simulation_params,
+                "total_patients": 0
+            }
+
+        waits_by_stage = defaultdict(dict)
+        for (stage, severity), (running, sketch) in sorted(self.stage_waits.items()):
+            waits_by_stage[stage][str(severity)] = streaming_summary(running, sketch)
+
+        return {
+            "simulation_parameters": simulation_params,
+            "average_time_in_system": self.total_time.mean,
+            "median_time_in_system": self.total_time_sketch.quantile(0.5),
+            "p90_time_in_system": self.total_time_sketch.quantile(0.9),
+            "p99_time_in_system": self.total_time_sketch.quantile(0.99),
+            "total_patients": self.total_time.count,
+            "severity_statistics": {str(severity): streaming_summary(running, sketch)
+                                    for severity, (running, sketch) in sorted(self.severity_times.items())},
+            "wait_time_by_stage": dict(waits_by_stage),
+            "resource_utilization": self.resource_summary,
+            "input_statistics": self.input_statistics,
+            "daily_distribution": {DAY_NAMES[day]: count for day, count in self.daily_patients.items()},
+            "hourly_distribution": {str(hour): count for hour, count in self.hourly_patients.items()}
         }
 
-        with open(f"{file_prefix}_economic_analysis.json", 'w') as f:
-            json.dump(economic_results, f, indent=4)
+    def generate_report(self, simulation_params, file_prefix=REPORT_PREFIX,
+                        max_workers=None):
+        """Genera el informe con las gráficas que no requieren registros individuales"""
+        from emergency_report import streaming_report
+        return streaming_report(self, simulation_params, file_prefix, max_workers)
+
+    def report_aggregates(self, simulation_params):
+        """Agregados del informe de streaming (emergency_report.streaming_aggregates)"""
+        from emergency_report import streaming_aggregates
+        return streaming_aggregates(self, simulation_params)
+
+
+def input_statistics(variates, arrival_process, arrivals, now):
+    """Llegadas y mezcla de severidades realizadas junto a sus valores esperados
+
+    Son entradas del modelo con media conocida: Λ(now) para la cantidad de
+    llegadas y los pesos de severidad para la mezcla.
+    """
+    counts = variates.severity_counts
+    return {
+        'arrivals': arrivals,
+        'expected_arrivals': arrival_process.cumulative(now),
+        'severity_counts': {str(severity): counts[severity] for severity in range(1, len(counts))},
+        'expected_severity_share': {str(severity): share
+                                    for severity, share in enumerate(variates.severity_probabilities, start=1)}
+    }
+
+
+def create_stats(config):
+    """Crea el recolector de estadísticas indicado por 'stats_mode'"""
+    # 'stats_mode': 'streaming' mantiene la memoria acotada en corridas largas
+    if config.get('stats_mode', 'full') == 'streaming':
+        return StreamingEmergencyStats()
+    return EmergencyStats()
 
 
 # Modelo de la sala de emergencias
 class EmergencyRoom:
-    def __init__(self, env, config):
+    def __init__(self, env, config, tracer=None, arrival_process=None):
         self.env = env
         self.config = config
-        self.stats = EmergencyStats()
-
-        # Crear recursos con prioridad
-        self.triage_nurses = simpy.PriorityResource(env, capacity=config.get('num_triage_nurses', 2))
-        self.doctors = simpy.PriorityResource(env, capacity=config.get('num_doctors', 3))
-        self.nurses = simpy.PriorityResource(env, capacity=config.get('num_nurses', 5))
-        self.xray = simpy.PriorityResource(env, capacity=config.get('num_xray', 2))
-        self.lab = simpy.PriorityResource(env, capacity=config.get('num_labs', 2))
+        self.stats = create_stats(config)
+        self.trace = tracer or EventTracer.from_config(config)
+        # Recorrido de los pacientes compilado en tablas ('pathway' en la configuración)
+        self.pathway = pathway_from_config(config)
+        # Flujos de números aleatorios independientes por elemento estocástico
+        self.variates = VariateSupply.from_config(config, self.pathway)
+        # Tasa de llegadas λ(t) precalculada (factores de día y hora o perfil CSV)
+        self.arrival_process = arrival_process or arrival_process_from_config(config)
+
+        # Crear recursos con prioridad (registran su uso en cada solicitud y liberación)
+        self.resources = {name: self._create_resource(name, config.get(parameter, default))
+                          for name, (parameter, default) in self.pathway.capacities.items()}
+        self.stage_resources = [self.resources[name] for name in self.pathway.resources]
 
         # Contadores
         self.patient_counter = 0
 
-        # Iniciar el registro periódico de uso de recursos
-        env.process(self.monitor_resources())
-
-    def monitor_resources(self):
-        """Monitorea el uso de recursos a lo largo del tiempo"""
-        while True:
-            # Registrar el uso de cada recurso
-            self.stats.log_resource_usage('triage_nurses',
-                                           self.triage_nurses.capacity,
-                                           len(self.triage_nurses.users),
-                                           self.env.now)
-
-            self.stats.log_resource_usage('doctors',
-                                           self.doctors.capacity,
-                                           len(self.doctors.users),
-                                           self.env.now)
-
-            self.stats.log_resource_usage('nurses',
-                                           self.nurses.capacity,
-                                           len(self.nurses.users),
-                                           self.env.now)
-
-            self.stats.log_resource_usage('xray',
-                                           self.xray.capacity,
-                                           len(self.xray.users),
-                                           self.env.now)
-
-            self.stats.log_resource_usage('lab',
-                                           self.lab.capacity,
-                                           len(self.lab.users),
-                                           self.env.now)
-
-            # Esperar antes de la próxima lectura
-            yield self.env.timeout(1)  # Monitoreo cada hora simulada
-
-    def get_severity(self):
-        """Determina la severidad de un paciente (1-5, donde 1 es lo más grave)"""
-        # Distribuir severidad con más probabilidad en valores intermedios
-        weights = self.config.get('severity_weights', [0.1, 0.25, 0.35, 0.2, 0.1])
-        return random.choices([1, 2, 3, 4, 5], weights=weights)[0]
-
-    def needs_xray(self, severity):
-        """Determina si un paciente necesita rayos X basado en severidad"""
-        # Pacientes más graves tienen mayor probabilidad de necesitar rayos X
-        probabilities = {
-            1: 0.8,  # 80% probabilidad para severidad 1
-            2: 0.7,
-            3: 0.5,
-            4: 0.3,
-            5: 0.2   # 20% probabilidad para severidad 5
-        }
-        return random.random() < probabilities.get(severity, 0.5)
-
-    def needs_lab(self, severity):
-        """Determina si un paciente necesita pruebas de laboratorio basado en severidad"""
-        # Pacientes más graves tienen mayor probabilidad de necesitar laboratorio
-        probabilities = {
-            1: 0.9,  # 90% probabilidad para severidad 1
-            2: 0.8,
-            3: 0.6,
-            4: 0.4,
-            5: 0.3   # 30% probabilidad para severidad 5
-        }
-        return random.random() < probabilities.get(severity, 0.5)
-
-    def patient_process(self, patient_id, arrival_time, day_of_week):
-        """Proceso que simula el recorrido de un paciente por la sala de emergencias"""
+    def _create_resource(self, name, capacity):
+        """Crea un recurso instrumentado y registra su estado inicial"""
+        # 'priority_aging': niveles de severidad que gana por hora una solicitud en espera
+        resource = MonitoredPriorityResource(self.env, capacity=capacity, name=name,
+                                             on_change=self._on_resource_change,
+                                             aging_rate=self.config.get('priority_aging', 0.0))
+        self.stats.log_resource_usage(name, capacity, 0, self.env.now, 0)
+        return resource
+
+    def _on_resource_change(self, name, capacity, in_use, queue_length, time):
+        """Registra cada cambio de uso o de cola de un recurso"""
+        self.stats.log_resource_usage(name, capacity, in_use, time, queue_length)
+
+    def finalize(self):
+        """Registra los indicadores ponderados por tiempo de cada recurso"""
+        for name, resource in self.resources.items():
+            self.stats.record_resource_summary(name, resource.summary(self.env.now))
+        self.stats.record_input_statistics(
+            input_statistics(self.variates, self.arrival_process, self.patient_counter, self.env.now))
+
+    def patient_process(self, patient_id, arrival_time, day_of_week, draws=None):
+        """Proceso que simula el recorrido de un paciente por la sala de emergencias
+
+        `draws` contiene los valores aleatorios del paciente (VariateSupply.patient);
+        si no se indica se sortean al iniciar el proceso.
+        """
         # Registrar tiempos de inicio
         entry_time = self.env.now
         wait_times = defaultdict(float)
 
-        # Asignar severidad (en triage)
-        severity = self.get_severity()
+        # Asignar severidad (en triage, 1-5 donde 1 es lo más grave)
+        if draws is None:
+            draws = self.variates.patient()
+        severity = draws.severity
+        pathway = self.pathway
 
         # Ajustar tiempos según día de la semana
-        weekend_factor = 1.2 if day_of_week >= 5 else 1.0  # Fines de semana más lentos
+        weekend_factor = pathway.weekend_factor if day_of_week >= 5 else 1.0  # Fines de semana más lentos
 
-        print(f"Paciente {patient_id} llega a las {arrival_time:.2f}h con severidad {severity}")
+        trace = self.trace
+        if trace.patients:
+            trace.emit("Paciente %d llega a las %.2fh con severidad %d", patient_id, arrival_time, severity)
 
         # 1. Registro y espera inicial
-        initial_wait = max(0, random.expovariate(1.0 / (5 * weekend_factor * (severity / 3))))
+        initial_wait = max(0, draws.registration * pathway.registration_mean[severity] * weekend_factor)
         yield self.env.timeout(initial_wait)
         wait_times['registro'] = initial_wait
 
-        # 2. Triage (evaluación inicial por enfermera)
-        triage_start = self.env.now
-        with self.triage_nurses.request(priority=severity) as req:
-            yield req
-            triage_wait = self.env.now - triage_start
-            wait_times['triage'] = triage_wait
-
-            # El proceso de triage toma tiempo
-            triage_time = random.uniform(5, 15) * weekend_factor
-            yield self.env.timeout(triage_time)
-
-            print(f"Paciente {patient_id} (Severidad {severity}) completa triage a las {self.env.now:.2f}h")
-
-        # 3. Espera para ver al doctor
-        doctor_wait_start = self.env.now
-        with self.doctors.request(priority=severity) as req:
-            yield req
-            doctor_wait = self.env.now - doctor_wait_start
-            wait_times['doctor'] = doctor_wait
-
-            # La consulta con el doctor toma tiempo
-            # Pacientes más graves requieren más tiempo
-            doctor_time = random.uniform(10, 30) * (1 + (6-severity)/10) * weekend_factor
-            yield self.env.timeout(doctor_time)
-
-            print(f"Paciente {patient_id} (Severidad {severity}) visto por doctor a las {self.env.now:.2f}h")
-
-        # 4. Pruebas diagnósticas (si son necesarias)
-        if self.needs_xray(severity):
-            xray_wait_start = self.env.now
-            with self.xray.request(priority=severity) as req:
-                yield req
-                xray_wait = self.env.now - xray_wait_start
-                wait_times['rayos_x'] = xray_wait
-
-                # El proceso de rayos X toma tiempo
-                xray_time = random.uniform(15, 45) * weekend_factor
-                yield self.env.timeout(xray_time)
-
-                print(f"Paciente {patient_id} (Severidad {severity}) completa rayos X a las {self.env.now:.2f}h")
-
-        if self.needs_lab(severity):
-            lab_wait_start = self.env.now
-            with self.lab.request(priority=severity) as req:
-                yield req
-                lab_wait = self.env.now - lab_wait_start
-                wait_times['laboratorio'] = lab_wait
-
-                # El proceso de laboratorio toma tiempo
-                lab_time = random.uniform(20, 60) * weekend_factor
-                yield self.env.timeout(lab_time)
-
-                print(f"Paciente {patient_id} (Severidad {severity}) completa pruebas de laboratorio a las {self.env.now:.2f}h")
-
-        # 5. Segunda consulta con el doctor (si fue a pruebas)
-        if self.needs_xray(severity) or self.needs_lab(severity):
-            follow_up_wait_start = self.env.now
-            with self.doctors.request(priority=severity) as req:
+        # 2. Etapas del recorrido (resuelto con las tablas compiladas y las uniformes de ruta del paciente)
+        for stage in pathway.path(severity, draws.route):
+            request_start = self.env.now
+            with self.stage_resources[stage].request(priority=severity) as req:
                 yield req
-                follow_up_wait = self.env.now - follow_up_wait_start
-                wait_times['segunda_consulta'] = follow_up_wait
+                wait_times[pathway.names[stage]] = self.env.now - request_start
 
-                # La segunda consulta toma menos tiempo
-                follow_up_time = random.uniform(5, 15) * weekend_factor
-                yield self.env.timeout(follow_up_time)
+                yield self.env.timeout(pathway.service_time(stage, severity, draws.service[stage], weekend_factor))
 
-                print(f"Paciente {patient_id} (Severidad {severity}) completa segunda consulta a las {self.env.now:.2f}h")
+                if trace.events:
+                    trace.emit(pathway.messages[stage], patient_id, severity, self.env.now)
 
-        # 6. Tratamiento por enfermera
-        treatment_wait_start = self.env.now
-        with self.nurses.request(priority=severity) as req:
-            yield req
-            treatment_wait = self.env.now - treatment_wait_start
-            wait_times['enfermera'] = treatment_wait
-
-            # El tratamiento toma tiempo según la severidad
-            treatment_time = random.uniform(10, 40) * (1 + (6-severity)/10) * weekend_factor
-            yield self.env.timeout(treatment_time)
-
-            print(f"Paciente {patient_id} (Severidad {severity}) completa tratamiento a las {self.env.now:.2f}h")
-
-        # 7. Paciente dado de alta
+        # 3. Paciente dado de alta
         exit_time = self.env.now
         total_time = exit_time - entry_time
 
-        print(f"Paciente {patient_id} (Severidad {severity}) sale a las {exit_time:.2f}h, tiempo total: {total_time:.2f} minutos")
+        if trace.patients:
+            trace.emit("Paciente %d (Severidad %d) sale a las %.2fh, tiempo total: %.2f minutos",
+                       patient_id, severity, exit_time, total_time)
 
         # Registrar estadísticas del paciente
         self.stats.add_patient_time(patient_id, severity, entry_time, exit_time, wait_times)
 
     def generate_arrivals(self):
-        """Genera la llegada de pacientes a la sala de emergencias"""
-        # Modificar para generar más pacientes en menos tiempo
+        """Genera la llegada de pacientes a la sala de emergencias
+
+        Las llegadas siguen un proceso de Poisson no homogéneo con la tasa
+        λ(t) precalculada en self.arrival_process; cada llegada se obtiene
+        invirtiendo la integral de la tasa acumulada.
+        """
+        env = self.env
+        inverse = self.arrival_process.inverse
+        hazard = self.arrival_process.cumulative(env.now)
         while True:
-            # El día de la semana afecta la tasa de llegada
-            day_of_week = int((self.env.now // 24) % 7)  # 0-6 (lun-dom)
-            hour_of_day = int(self.env.now % 24)  # 0-23
-
-            # Factores para ajustar la tasa de llegada
-            day_factors = self.config.get('day_factors', [0.8, 0.8, 0.9, 0.9, 1.0, 1.5, 1.2])
-            hour_factors = self.config.get('hour_factors', [0.5, 0.3, 0.7, 1.3, 1.5, 1.0])
-
-            day_factor = day_factors[day_of_week % len(day_factors)]
-            hour_factor = hour_factors[(hour_of_day // 4) % len(hour_factors)]
-
-            # Calcular intervalo entre llegadas - REDUCIR PARA GENERAR MÁS PACIENTES
-            base_interval = self.config.get('arrival_interval', 30)
-            # Reducir drásticamente el intervalo para la simulación
-            adjusted_interval = base_interval / (day_factor * hour_factor) / 10  # Dividir por 10 para más pacientes
-
-            # Generar tiempo hasta la próxima llegada
-            t = random.expovariate(1.0 / adjusted_interval)
-            yield self.env.timeout(t)
-
-            # Crear nuevo paciente
+            # Avanzar en la escala de Λ(t) con una exponencial estándar
+            hazard += self.variates.interarrival()
+            next_arrival = inverse(hazard)
+            if next_arrival == math.inf:
+                return
+            yield env.timeout(max(0.0, next_arrival - env.now))
+
+            # Crear nuevo paciente (sus valores aleatorios se sortean en orden de llegada)
             self.patient_counter += 1
-            self.env.process(self.patient_process(self.patient_counter, self.env.now, day_of_week))
+            day_of_week = int((env.now // 24) % 7)  # 0-6 (lun-dom)
+            env.process(self.patient_process(self.patient_counter, env.now, day_of_week,
+                                             self.variates.patient()))
+
 
+# Secciones del formato anidado de resources/config.json: sección -> {clave: clave plana}
+CONFIG_SECTIONS = {
+    'arrival_patterns': {'base_interval': 'arrival_interval'},
+    'severity_distribution': {'weights': 'severity_weights'},
+}
 
-def run_simulation(config, sim_time=24):  # Reducir a 24 horas para pruebas rápidas
-    """Ejecuta la simulación de la sala de emergencias"""
-    # Establecer semilla para reproducibilidad
-    random.seed(config.get('random_seed', 42))
+# Claves cuyo valor es un diccionario que se conserva tal cual (no es una sección)
+CONFIG_VALUES = ('pathway',)
 
-    # Crear entorno de simulación
-    env = simpy.Environment()
 
-    # Crear sala de emergencias
-    er = EmergencyRoom(env, config)
+def load_config(path):
+    """Lee una configuración JSON en formato plano o anidado (resources/config.json)
 
-    # Iniciar proceso de generación de pacientes
-    env.process(er.generate_arrivals())
+    En el formato anidado las claves de cada sección ('resources', 'costs',
+    'simulation', ...) se copian al nivel superior, renombrando las que
+    tienen otro nombre en el formato plano (por ejemplo 'base_interval').
+    El recorrido ('pathway') se conserva como diccionario.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    config = {}
+    for key, value in raw.items():
+        if isinstance(value, dict) and key not in CONFIG_VALUES:
+            renames = CONFIG_SECTIONS.get(key, {})
+            for name, item in value.items():
+                config[renames.get(name, name)] = item
+        else:
+            config[key] = value
+    return config
+
+
+def run_simulation(config, sim_time=24, write_report=True, tracer=None, engine='simpy', cache=None,
+                   instrumentation=None, profile=False):  # Reducir a 24 horas para pruebas rápidas
+    """Ejecuta la simulación de la sala de emergencias
+
+    Con write_report=False no se generan gráficas ni archivos y los resultados
+    se devuelven solo en memoria (útil para ejecutar réplicas en paralelo).
+    Las trazas se controlan con 'trace_level' ('off', 'summary', 'patient',
+    'event') y 'trace_file' en la configuración, o pasando un EventTracer.
+    Los números aleatorios salen de flujos independientes derivados de
+    'random_seed' ('variates_backend': 'numpy' o 'python').
+    engine='fast' usa el motor de eventos especializado (fast_engine), que
+    produce las mismas estadísticas sin procesos de SimPy.
+    Si se pasa una ResultCache (o 'cache_dir' en la configuración), las
+    corridas se buscan primero en la caché de resultados; con informe, la
+    caché guarda los agregados y el informe se dibuja a partir de ellos.
+    En un acierto, 'simulation_parameters' es la configuración actual.
+    Con un objeto Instrumentation (instrumentation.py) se miden eventos,
+    etapas, recursos y llamadas; profile=True además ejecuta la corrida bajo
+    cProfile y tracemalloc y escribe el perfil y la instrumentación junto al
+    JSON de resultados ('profile_prefix' cambia el prefijo de los archivos).
+    """
+    if profile:
+        from instrumentation import Instrumentation, profile_call
+        file_prefix = config.get('profile_prefix', REPORT_PREFIX)
+        instrumentation = instrumentation or Instrumentation()
+        results = profile_call(run_simulation, file_prefix, config, sim_time, write_report, tracer, engine,
+                               cache, instrumentation)
+        instrumentation.write(f"{file_prefix}_instrumentation.json")
+        return results
 
-    # Ejecutar simulación
-    env.run(until=sim_time)
+    if cache is None and config.get('cache_dir'):
+        from result_cache import ResultCache
+        cache = ResultCache(config['cache_dir'])
+    if instrumentation is not None:
+        cache = None  # Una corrida instrumentada siempre se simula
+    if cache is not None:
+        cached = cache.lookup(config, sim_time, engine, report=write_report)
+        if cached is not None:
+            # Las claves que no cambian los resultados (trazas, caché...) pueden diferir de la entrada
+            config['sim_time'] = sim_time
+            if not write_report:
+                cached['simulation_parameters'] = config
+                return cached
+            from emergency_report import aggregates_from_json, render_aggregates
+            aggregates = aggregates_from_json(cached)
+            aggregates['results']['simulation_parameters'] = config
+            return render_aggregates(aggregates, REPORT_PREFIX, config.get('report_workers'))
+
+    if engine == 'fast':
+        from fast_engine import FastEmergencyRoom
+
+        # El registro de uso por evento solo alimenta las gráficas del informe
+        er = FastEmergencyRoom(config, tracer, resource_log=write_report)
+        if instrumentation is not None:
+            instrumentation.attach_fast(er)
+            instrumentation.run_fast(er, sim_time)
+        else:
+            er.run(sim_time)
+        now = er.now
+    elif engine == 'simpy':
+        # Crear entorno de simulación
+        env = simpy.Environment()
+
+        # Crear sala de emergencias
+        er = EmergencyRoom(env, config, tracer)
+
+        # Iniciar proceso de generación de pacientes
+        if instrumentation is not None:
+            instrumentation.attach(er)
+        env.process(er.generate_arrivals())
+
+        # Ejecutar simulación
+        if instrumentation is not None:
+            instrumentation.run_simpy(env, sim_time)
+        else:
+            env.run(until=sim_time)
+        now = env.now
+    else:
+        raise ValueError(f"Motor de simulación desconocido: {engine}")
+    er.finalize()
+
+    if er.trace.summary:
+        er.trace.emit("Simulación finalizada a las %.2fh: %d pacientes llegaron, %d salieron",
+                      now, er.patient_counter, er.stats.patient_count())
+    er.trace.close()
 
     # Generar informe
     config['sim_time'] = sim_time
-    results = er.stats.generate_report(config)
-
-    return results
+    if not write_report:
+        results = er.stats.summarize(config)
+        if cache is not None:
+            cache.store(config, sim_time, engine, results)
+        return results
+    # Con 'report_workers' > 1 las gráficas del informe se dibujan en un pool de procesos
+    if cache is None or not er.stats.patient_count():
+        return er.stats.generate_report(config, max_workers=config.get('report_workers'))
+    from emergency_report import aggregates_to_json, render_aggregates
+    aggregates = er.stats.report_aggregates(config)
+    cache.store(config, sim_time, engine, aggregates['results'])
+    cache.store(config, sim_time, engine, aggregates_to_json(aggregates), report=True)
+    return render_aggregates(aggregates, REPORT_PREFIX, config.get('report_workers'))
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulación de la sala de emergencias")
+    parser.add_argument('config', nargs='?', help="Archivo JSON de configuración (por ejemplo resources/config.json)")
+    parser.add_argument('--sim-time', type=float, default=None,
+                        help="Horas de simulación (por defecto 'sim_time' de la configuración o 24)")
+    parser.add_argument('--engine', choices=['simpy', 'fast'], default='simpy')
+    parser.add_argument('--no-report', action='store_true',
+                        help="Solo imprime los resultados, sin gráficas ni archivos")
+    parser.add_argument('--trace', choices=sorted(TRACE_LEVELS), default=None,
+                        help="Nivel de trazas (por defecto 'trace_level' de la configuración o 'summary')")
+    parser.add_argument('--steady-state', action='store_true',
+                        help="Agrega el análisis de régimen estacionario (calentamiento MSER-5 y medias por lotes)")
+    args = parser.parse_args()
+
     # Configuración de la simulación
     config = {
         # Parámetros de recursos
@@ -598,50 +677,31 @@ if __name__ == "__main__":
         'random_seed': 42
     }
 
+    if args.config:
+        config.update(load_config(args.config))
+    if args.trace:
+        config['trace_level'] = args.trace
+    if args.steady_state:
+        config['warmup_method'] = 'mser5'
+    sim_time = args.sim_time if args.sim_time is not None else config.get('sim_time', 24)
+
     print("=== INICIANDO SIMULACIÓN DE EMERGENCIA HOSPITALARIA ===")
-    print("Ejecutando con configuración base...")
+    print(f"Ejecutando con configuración {args.config or 'base'}...")
 
-    # Ejecutar simulación corta para pruebas
-    results = run_simulation(config, sim_time=24)
+    # Ejecutar simulación (24 horas por defecto para pruebas rápidas)
+    results = run_simulation(config, sim_time=sim_time, write_report=not args.no_report, engine=args.engine)
 
     print("\n=== RESULTADOS DE LA SIMULACIÓN ===")
-    print(f"Tiempo de simulación: 24 horas")
+    print(f"Tiempo de simulación: {sim_time:g} horas")
     print(f"Pacientes atendidos: {results.get('total_patients', 0)}")
 
     if 'average_time_in_system' in results:
         print(f"Tiempo promedio en el sistema: {results['average_time_in_system']:.2f} minutos")
 
-    print("\nSe han generado gráficos y análisis en la carpeta 'resultados'")
+    if not args.no_report:
+        print("\nSe han generado gráficos y análisis en la carpeta 'resultados'")
     print("=== SIMULACIÓN COMPLETADA ===")
 
-    # Si deseas ejecutar un análisis de sensibilidad, descomenta estas líneas:
-    """
-    print("\n=== ANÁLISIS DE SENSIBILIDAD ===")
-
-    # Variando el número de doctores
-    doctor_configs = []
-    for num_doctors in range(2, 5):
-        print(f"Probando con {num_doctors} doctores...")
-        config_variant = config.copy()
-        config_variant['num_doctors'] = num_doctors
-        result = run_simulation(
-            config_variant,
-            sim_time=24
-        )
-        doctor_configs.append({
-            'num_doctors': num_doctors,
-            'avg_time': result.get('average_time_in_system', 0),
-            'total_cost': num_doctors * config['doctor_salary_monthly'] +
-                        config['num_nurses'] * config['nurse_salary_monthly'] +
-                        config['num_triage_nurses'] * config['nurse_salary_monthly']
-        })
-        if 'average_time_in_system' in result:
-            print(f"Con {num_doctors} doctores: {result['average_time_in_system']:.2f} minutos de espera promedio")
-
-    # Encontrar configuración óptima
-    if doctor_configs:
-        best_config = min(doctor_configs, key=lambda x: x['avg_time'])
-        print(f"\nConfiguración óptima recomendada: {best_config['num_doctors']} doctores")
-        print(f"Tiempo promedio de espera: {best_config['avg_time']:.2f} minutos")
-        print(f"Costo mensual total estimado: ${best_config['total_cost']:,.2f}")
-    """
\ No newline at end of file
+    # Para un análisis de sensibilidad (varios recursos, llegadas y severidad, en paralelo)
+    # usar sensitivity_sweep.py, por ejemplo:
+    #   python sensitivity_sweep.py --design lhs --samples 200 --replications 3
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Subsistema de trazas de eventos de la simulación
+
+Los mensajes se guardan como (formato, argumentos) y solo se formatean cuando
+un destino realmente los escribe o los consulta. Con el nivel 'off' el modelo
+solo evalúa un atributo booleano por etapa y no construye ningún texto.
+"""
+
+import sys
+from collections import deque
+
+# Niveles de traza
+TRACE_OFF = 0  # Sin trazas
+TRACE_SUMMARY = 1  # Solo el resumen al final de la corrida
+TRACE_PATIENT = 2  # Llegada y salida de cada paciente
+TRACE_EVENT = 3  # Cada cambio de etapa de cada paciente
+
+TRACE_LEVELS = {
+    'off': TRACE_OFF,
+    'summary': TRACE_SUMMARY,
+    'patient': TRACE_PATIENT,
+    'event': TRACE_EVENT
+}
+
+# Nivel sin 'trace_level': solo el resumen; los mensajes por paciente o por etapa se piden explícitamente
+DEFAULT_TRACE_LEVEL = 'summary'
+
+
+class NullSink:
+    """Destino que descarta todos los mensajes"""
+
+    def write(self, fmt, args):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StdoutSink:
+    """Escribe los mensajes en la salida estándar en bloques"""
+
+    def __init__(self, buffer_size=256, stream=None):
+        self.buffer_size = buffer_size
+        self.stream = stream or sys.stdout
+        self._buffer = []
+
+    def write(self, fmt, args):
+        self._buffer.append((fmt, args))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.stream.write(''.join(fmt % args + '\n' for fmt, args in self._buffer))
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+
+
+class RingSink:
+    """Conserva en memoria solo los últimos `maxlen` mensajes sin formatear"""
+
+    def __init__(self, maxlen=10000):
+        self.records = deque(maxlen=maxlen)
+
+    def write(self, fmt, args):
+        self.records.append((fmt, args))
+
+    def lines(self):
+        """Devuelve los mensajes guardados ya formateados"""
+        return [fmt % args for fmt, args in self.records]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Escribe los mensajes en un archivo, formateándolos por bloques"""
+
+    def __init__(self, path, buffer_size=4096):
+        self.path = path
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, fmt, args):
+        self._buffer.append((fmt, args))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(''.join(fmt % args + '\n' for fmt, args in self._buffer))
+            self._buffer = []
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class EventTracer:
+    """Punto de entrada de las trazas usado por el modelo
+
+    Los atributos `summary`, `patients` y `events` indican qué niveles están
+    activos; el modelo los consulta antes de llamar a emit para no pagar nada
+    cuando la traza está apagada.
+    """
+
+    def __init__(self, level='off', sink=None):
+        if isinstance(level, str):
+            if level not in TRACE_LEVELS:
+                raise ValueError(f"Nivel de traza desconocido: {level}")
+            level = TRACE_LEVELS[level]
+        self.level = level
+        self.summary = level >= TRACE_SUMMARY
+        self.patients = level >= TRACE_PATIENT
+        self.events = level >= TRACE_EVENT
+
+        if sink is None:
+            sink = StdoutSink() if level > TRACE_OFF else NullSink()
+        self.sink = sink
+
+    @classmethod
+    def from_config(cls, config):
+        """Crea el trazador a partir de 'trace_level' y 'trace_file' de la configuración"""
+        level = config.get('trace_level', DEFAULT_TRACE_LEVEL)
+        trace_file = config.get('trace_file')
+        sink = FileSink(trace_file) if trace_file and level != 'off' else None
+        return cls(level, sink)
+
+    def emit(self, fmt, *args):
+        """Registra un mensaje; el formateo se hace en el destino"""
+        self.sink.write(fmt, args)
+
+    def close(self):
+        self.sink.close()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Motor de eventos discretos especializado para el flujo de pacientes
+
+El recorrido de cada paciente es una secuencia de etapas que se conoce al
+llegar (el recorrido compilado de pathways y sus uniformes de ruta), así
+que no hace falta un proceso generador por paciente. Este motor usa un solo calendario de eventos (heapq) con tuplas
+(tiempo, secuencia, tipo, paciente), registros de paciente con __slots__ y una
+cola de prioridad (heap) por recurso. El registro de uso de cada recurso
+(una fila por cambio de estado, solo para las gráficas del informe) se
+acumula en una lista por estación y pasa a EmergencyStats en bloque al
+final; sin informe (resource_log=False) no se guarda.
+
+Con la misma configuración y semilla produce las mismas estadísticas que el
+modelo de SimPy de EmergencyRoom: usa los mismos flujos de VariateSupply, la
+misma tasa de llegadas, el mismo orden de prioridad (severidad y luego hora
+de la solicitud) y la misma aritmética para los tiempos.
+"""
+
+import heapq
+import math
+
+from arrivals import arrival_process_from_config
+from event_trace import DEFAULT_TRACE_LEVEL, EventTracer
+from monitored_resource import UtilizationAccumulator
+from pathways import pathway_from_config
+from variates import VariateSupply
+
+# Tipos de evento
+ARRIVAL = 0  # Llega un paciente
+REGISTERED = 1  # El paciente termina el registro y pide triage
+SERVICE_DONE = 2  # El paciente termina el servicio de su etapa actual
+
+
+class _Patient:
+    """Estado de un paciente dentro del motor rápido"""
+
+    __slots__ = ('patient_id', 'severity', 'entry_time', 'weekend_factor', 'service',
+                 'path', 'step', 'request_time', 'wait_times')
+
+    def __init__(self, patient_id, entry_time, weekend_factor, draws, path):
+        self.patient_id = patient_id
+        self.severity = draws.severity
+        self.entry_time = entry_time
+        self.weekend_factor = weekend_factor
+        self.service = draws.service  # Uniformes de servicio por etapa
+        self.path = path
+        self.step = 0
+        self.request_time = 0.0
+        self.wait_times = {}
+
+
+class _Station:
+    """Recurso con capacidad fija y cola de prioridad por severidad"""
+
+    __slots__ = ('name', 'capacity', 'in_use', 'queue', 'usage', 'log')
+
+    def __init__(self, name, capacity, log=True):
+        self.name = name
+        self.capacity = capacity
+        self.in_use = 0
+        self.queue = []  # heap de (prioridad, hora de solicitud, secuencia, paciente)
+        self.usage = UtilizationAccumulator(0.0)
+        # (hora, capacidad, en uso, cola) de cada cambio de estado, o None sin registro
+        self.log = [(0.0, capacity, 0, 0)] if log else None
+
+
+class FastEmergencyRoom:
+    """Versión sin SimPy de EmergencyRoom para recorridos conocidos al llegar"""
+
+    def __init__(self, config, tracer=None, arrival_process=None, resource_log=True):
+        """`resource_log=False` omite el registro de uso por evento (solo lo usan las gráficas)"""
+        from emergency_simulation import create_stats
+
+        self.config = config
+        self.stats = create_stats(config)
+        self.trace = tracer or EventTracer.from_config(config)
+        self.pathway = pathway_from_config(config)
+        self.variates = VariateSupply.from_config(config, self.pathway)
+        self.arrival_process = arrival_process or arrival_process_from_config(config)
+        # Envejecimiento de prioridades (mismo criterio que RequestHeap)
+        self.aging_rate = config.get('priority_aging', 0.0)
+
+        self.now = 0.0
+        self.patient_counter = 0
+        self.events_processed = 0
+        self._calendar = []
+        self._sequence = 0
+        self._hazard = 0.0
+
+        self.resources = {name: _Station(name, config.get(parameter, default), resource_log)
+                          for name, (parameter, default) in self.pathway.capacities.items()}
+        self._stage_stations = [self.resources[resource] for resource in self.pathway.resources]
+
+    def _schedule(self, time, kind, patient):
+        self._sequence += 1
+        heapq.heappush(self._calendar, (time, self._sequence, kind, patient))
+
+    def _schedule_next_arrival(self):
+        """Programa la siguiente llegada invirtiendo la tasa acumulada"""
+        self._hazard += self.variates.interarrival()
+        next_arrival = self.arrival_process.inverse(self._hazard)
+        if next_arrival != math.inf:
+            self._schedule(self.now + max(0.0, next_arrival - self.now), ARRIVAL, None)
+
+    def _record(self, station):
+        queue = len(station.queue)
+        if station.usage.update(station.in_use, queue, self.now) and station.log is not None:
+            station.log.append((self.now, station.capacity, station.in_use, queue))
+
+    def _service_time(self, stage, patient):
+        """Tiempo de servicio de una etapa (misma tabla que EmergencyRoom.patient_process)"""
+        return self.pathway.service_time(stage, patient.severity, patient.service[stage],
+                                         patient.weekend_factor)
+
+    def _request(self, patient):
+        """El paciente pide el recurso de su etapa actual"""
+        station = self._stage_stations[patient.path[patient.step]]
+        patient.request_time = self.now
+        self._sequence += 1
+        priority = patient.severity + self.aging_rate * self.now if self.aging_rate else patient.severity
+        heapq.heappush(station.queue, (priority, self.now, self._sequence, patient))
+        self._dispatch(station)
+
+    def _dispatch(self, station):
+        """Asigna los recursos libres a los pacientes de mayor prioridad en la cola"""
+        queue = station.queue
+        while station.in_use < station.capacity and queue:
+            patient = heapq.heappop(queue)[3]
+            station.in_use += 1
+            stage = patient.path[patient.step]
+            patient.wait_times[self.pathway.names[stage]] = self.now - patient.request_time
+            self._schedule(self.now + self._service_time(stage, patient), SERVICE_DONE, patient)
+        self._record(station)
+
+    def _arrival(self):
+        self.patient_counter += 1
+        day_of_week = int((self.now // 24) % 7)  # 0-6 (lun-dom)
+        pathway = self.pathway
+        weekend_factor = pathway.weekend_factor if day_of_week >= 5 else 1.0  # Fines de semana más lentos
+        draws = self.variates.patient()
+        patient = _Patient(self.patient_counter, self.now, weekend_factor, draws,
+                           pathway.path(draws.severity, draws.route))
+
+        if self.trace.patients:
+            self.trace.emit("Paciente %d llega a las %.2fh con severidad %d",
+                            patient.patient_id, self.now, patient.severity)
+
+        # Registro y espera inicial
+        initial_wait = max(0, draws.registration * pathway.registration_mean[patient.severity] * weekend_factor)
+        patient.wait_times['registro'] = initial_wait
+        self._schedule(self.now + initial_wait, REGISTERED, patient)
+        self._schedule_next_arrival()
+
+    def _service_done(self, patient):
+        stage = patient.path[patient.step]
+        station = self._stage_stations[stage]
+        station.in_use -= 1
+        self._record(station)
+
+        if self.trace.events:
+            self.trace.emit(self.pathway.messages[stage], patient.patient_id, patient.severity, self.now)
+
+        # El paciente sigue a su próxima etapa antes de reasignar el recurso liberado,
+        # igual que en SimPy (puede volver a pedir el mismo recurso)
+        patient.step += 1
+        if patient.step < len(patient.path):
+            self._request(patient)
+        else:
+            self._discharge(patient)
+        self._dispatch(station)
+
+    def _discharge(self, patient):
+        exit_time = self.now
+        if self.trace.patients:
+            self.trace.emit("Paciente %d (Severidad %d) sale a las %.2fh, tiempo total: %.2f minutos",
+                            patient.patient_id, patient.severity, exit_time, exit_time - patient.entry_time)
+        self.stats.add_patient_time(patient.patient_id, patient.severity, patient.entry_time,
+                                    exit_time, patient.wait_times)
+
+    def start(self):
+        """Programa la primera llegada si la corrida no ha comenzado"""
+        if not self._calendar and self.patient_counter == 0:
+            self._hazard = self.arrival_process.cumulative(self.now)
+            self._schedule_next_arrival()
+
+    def step(self):
+        """Procesa el siguiente evento del calendario"""
+        time, _, kind, patient = heapq.heappop(self._calendar)
+        self.now = time
+        self.events_processed += 1
+        if kind == SERVICE_DONE:
+            self._service_done(patient)
+        elif kind == REGISTERED:
+            self._request(patient)
+        else:
+            self._arrival()
+
+    def run(self, until):
+        """Procesa los eventos con tiempo menor que `until`"""
+        self.start()
+
+        # Mismo trabajo que step(), sin la llamada por evento
+        calendar = self._calendar
+        pop = heapq.heappop
+        while calendar and calendar[0][0] < until:
+            time, _, kind, patient = pop(calendar)
+            self.now = time
+            self.events_processed += 1
+            if kind == SERVICE_DONE:
+                self._service_done(patient)
+            elif kind == REGISTERED:
+                self._request(patient)
+            else:
+                self._arrival()
+        self.now = until
+
+    def set_capacity(self, name, capacity):
+        """Cambia la capacidad de un recurso en el instante actual
+
+        Los pacientes en servicio terminan aunque la nueva capacidad sea menor;
+        si es mayor, los pacientes en cola pasan a servicio de inmediato.
+        """
+        station = self.resources[name]
+        station.usage.change_capacity(station.capacity, self.now)
+        station.capacity = capacity
+        if station.log is not None:
+            station.log.append((self.now, capacity, station.in_use, len(station.queue)))
+        self._dispatch(station)
+
+    def __getstate__(self):
+        # El trazador puede tener archivos o la salida estándar abiertos: no se guarda
+        state = self.__dict__.copy()
+        del state['trace']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.trace = EventTracer(self.config.get('trace_level', DEFAULT_TRACE_LEVEL))
+
+    def finalize(self):
+        """Registra los indicadores ponderados por tiempo y el registro de uso de cada recurso"""
+        from emergency_simulation import input_statistics
+
+        for name, station in self.resources.items():
+            self.stats.record_resource_summary(name, station.usage.summary(station.capacity, self.now))
+            if station.log:
+                self.stats.log_resource_series(name, station.log)
+                station.log = []
+        self.stats.record_input_statistics(
+            input_statistics(self.variates, self.arrival_process, self.patient_counter, self.now))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Heap binario indexado con cambio de prioridad
+
+Como VectorHeap (src/main/java), el heap se guarda en una lista y el elemento
+de menor clave es el de mayor prioridad. Además, cada elemento guarda su
+posición en el heap, por lo que quitar un elemento cualquiera o cambiar su
+clave (decrease-key o increase-key) cuesta O(log n) en lugar de buscarlo y
+reordenar la lista.
+
+Los elementos deben ser hashables y no repetirse. A igual clave sale primero
+el que entró antes.
+"""
+
+
+class IndexedHeap:
+    """Cola de prioridad de elementos únicos con posiciones indexadas"""
+
+    def __init__(self):
+        # [clave, secuencia, elemento]; la secuencia es única, así que nunca se comparan elementos
+        self._heap = []
+        self._positions = {}  # elemento -> índice en el heap
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def push(self, item, key):
+        """Agrega un elemento con su clave"""
+        if item in self._positions:
+            raise ValueError("El elemento ya está en el heap")
+        self._sequence += 1
+        self._heap.append([key, self._sequence, item])
+        self._positions[item] = len(self._heap) - 1
+        self._percolate_up(len(self._heap) - 1)
+
+    def peek(self):
+        """Elemento de mayor prioridad sin quitarlo"""
+        if not self._heap:
+            raise IndexError("El heap está vacío")
+        return self._heap[0][2]
+
+    def pop(self):
+        """Quita y devuelve el elemento de mayor prioridad"""
+        if not self._heap:
+            raise IndexError("El heap está vacío")
+        return self._remove_at(0)
+
+    def remove(self, item):
+        """Quita un elemento cualquiera en O(log n)"""
+        index = self._positions.get(item)
+        if index is None:
+            raise ValueError("El elemento no está en el heap")
+        self._remove_at(index)
+
+    def key(self, item):
+        return self._heap[self._positions[item]][0]
+
+    def update(self, item, key):
+        """Cambia la clave de un elemento y lo reubica (sube o baja)"""
+        index = self._positions[item]
+        previous = self._heap[index][0]
+        self._heap[index][0] = key
+        if key < previous:
+            self._percolate_up(index)
+        else:
+            self._percolate_down(index)
+
+    def items(self):
+        """Elementos en orden de prioridad (O(n log n), para inspección)"""
+        return [entry[2] for entry in sorted(self._heap)]
+
+    def _remove_at(self, index):
+        heap = self._heap
+        entry = heap[index]
+        del self._positions[entry[2]]
+        last = heap.pop()
+        if index < len(heap):
+            heap[index] = last
+            self._positions[last[2]] = index
+            # El último elemento puede tener que subir o bajar desde la posición liberada
+            self._percolate_up(index)
+            self._percolate_down(self._positions[last[2]])
+        return entry[2]
+
+    def _percolate_up(self, index):
+        heap = self._heap
+        positions = self._positions
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if entry >= heap[parent]:
+                break
+            heap[index] = heap[parent]
+            positions[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        positions[entry[2]] = index
+
+    def _percolate_down(self, index):
+        heap = self._heap
+        positions = self._positions
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            right = child + 1
+            if right < size and heap[right] < heap[child]:
+                child = right
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            positions[heap[index][2]] = index
+            index = child
+        heap[index] = entry
+        positions[entry[2]] = index
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Instrumentación y perfilado de la simulación
+
+Instrumentation cuenta y mide (tiempo de reloj) lo que ocurre durante una
+corrida: cada tipo de evento procesado, cada etapa del proceso de un
+paciente, cada recurso y las llamadas de las partes que suelen dominar el
+costo (números aleatorios, registros de EmergencyStats, monitoreo de
+recursos y trazas). También muestrea el tamaño de la cola de eventos.
+
+No hay costo cuando está desactivada: en lugar de condiciones dentro del
+modelo, `attach` reemplaza métodos de la instancia por versiones medidas y
+`run_simpy`/`run_fast` sustituyen el ciclo de eventos solo en esa corrida.
+Los tiempos son inclusivos (el tiempo de un evento incluye el de las etapas
+y llamadas que ocurren dentro de él).
+
+profile_call ejecuta una función bajo cProfile y tracemalloc y escribe un
+resumen junto al JSON de resultados.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Llamadas medidas en cada corrida: (atributo del modelo, método, nombre en el resumen)
+TIMED_CALLS = (
+    ('variates', 'patient', 'variates.patient'),
+    ('variates', 'interarrival', 'variates.interarrival'),
+    ('stats', 'add_patient_time', 'stats.add_patient_time'),
+    ('stats', 'log_resource_usage', 'stats.log_resource_usage'),
+    ('trace', 'emit', 'trace.emit'),
+)
+
+# Nombres de los tipos de evento del motor rápido
+FAST_EVENT_NAMES = {0: 'arrival', 1: 'registered', 2: 'service_done'}
+
+
+class Instrumentation:
+    """Contadores y temporizadores de una corrida, agrupados por categoría"""
+
+    def __init__(self, heap_sample_every=1000):
+        self.heap_sample_every = heap_sample_every
+        self.wall_seconds = 0.0
+        self.heap_samples = []  # (tiempo simulado, eventos en la cola)
+        self._timers = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))  # categoría -> clave -> [n, s]
+
+    def record(self, category, key, seconds, count=1):
+        entry = self._timers[category][key]
+        entry[0] += count
+        entry[1] += seconds
+
+    def timed(self, category, key, function):
+        """Versión de `function` que cuenta sus llamadas y su tiempo"""
+        record = self.record
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(category, key, clock() - start)
+
+        return wrapper
+
+    def _attach_calls(self, model):
+        for attribute, method, key in TIMED_CALLS:
+            target = getattr(model, attribute, None)
+            if target is not None and hasattr(target, method):
+                setattr(target, method, self.timed('calls', key, getattr(target, method)))
+
+    def attach(self, er):
+        """Instrumenta una EmergencyRoom (SimPy) antes de ejecutarla"""
+        self._attach_calls(er)
+        for name, resource in er.resources.items():
+            resource.request = self.timed('resource_requests', name, resource.request)
+            resource._record = self.timed('resource_monitoring', name, resource._record)
+
+        patient_process = er.patient_process
+
+        def instrumented_process(*args, **kwargs):
+            return self._timed_process(patient_process(*args, **kwargs))
+
+        er.patient_process = instrumented_process
+
+    def attach_fast(self, er):
+        """Instrumenta un FastEmergencyRoom antes de ejecutarlo
+
+        Las etapas ('stages') se miden al terminar cada servicio, incluida la
+        solicitud de la etapa siguiente o el alta; las solicitudes y las
+        asignaciones se miden por recurso.
+        """
+        self._attach_calls(er)
+        record = self.record
+        clock = time.perf_counter
+        names = er.pathway.names
+        stations = er._stage_stations
+        request = er._request
+        dispatch = er._dispatch
+        service_done = er._service_done
+        original = er._record
+
+        def timed_request(patient):
+            name = stations[patient.path[patient.step]].name
+            start = clock()
+            request(patient)
+            record('resource_requests', name, clock() - start)
+
+        def timed_dispatch(station):
+            start = clock()
+            dispatch(station)
+            record('resource_dispatch', station.name, clock() - start)
+
+        def timed_service_done(patient):
+            stage = names[patient.path[patient.step]]
+            start = clock()
+            service_done(patient)
+            record('stages', stage, clock() - start)
+
+        def timed_record(station):
+            start = clock()
+            original(station)
+            record('resource_monitoring', station.name, clock() - start)
+
+        er._request = timed_request
+        er._dispatch = timed_dispatch
+        er._service_done = timed_service_done
+        er._record = timed_record
+        er._service_time = self.timed('calls', 'service_time', er._service_time)
+
+    def _timed_process(self, generator):
+        """Ejecuta el proceso de un paciente midiendo cada reanudación
+
+        Cada tramo de código entre dos `yield` se asigna a la etapa del evento
+        que entrega: el recurso solicitado (la etapa sigue hasta la próxima
+        solicitud, así que incluye el servicio) o 'registro' antes de la
+        primera solicitud; el último tramo es 'alta'.
+        """
+        record = self.record
+        clock = time.perf_counter
+        stage = 'registro'
+        value = None
+        error = None
+        while True:
+            start = clock()
+            try:
+                event = generator.throw(error) if error is not None else generator.send(value)
+            except StopIteration:
+                record('stages', 'alta', clock() - start)
+                return
+            resource = getattr(event, 'resource', None)
+            if resource is not None:
+                stage = getattr(resource, 'name', None) or stage
+            record('stages', stage, clock() - start)
+            error = None
+            try:
+                value = yield event
+            except BaseException as exc:  # Interrupciones de SimPy pasan al proceso
+                error = exc
+
+    def run_simpy(self, env, until):
+        """Equivalente a env.run(until) midiendo cada evento por tipo"""
+        record = self.record
+        clock = time.perf_counter
+        queue = env._queue  # Cola de eventos interna de SimPy (solo se lee su tamaño)
+        sample_every = self.heap_sample_every
+        steps = 0
+        started = clock()
+        while env.peek() < until:
+            event_type = type(queue[0][3]).__name__
+            start = clock()
+            env.step()
+            record('events', event_type, clock() - start)
+            steps += 1
+            if steps % sample_every == 0:
+                self.heap_samples.append((env.now, len(queue)))
+        self.wall_seconds += clock() - started
+        # Igual que env.run: el reloj termina en `until`
+        if env.now < until:
+            env.run(until=until)
+
+    def run_fast(self, er, until):
+        """Equivalente a FastEmergencyRoom.run(until) midiendo cada evento por tipo"""
+        record = self.record
+        clock = time.perf_counter
+        calendar = er._calendar
+        sample_every = self.heap_sample_every
+        steps = 0
+        started = clock()
+        er.start()
+        while calendar and calendar[0][0] < until:
+            kind = calendar[0][2]
+            start = clock()
+            er.step()
+            record('events', FAST_EVENT_NAMES.get(kind, str(kind)), clock() - start)
+            steps += 1
+            if steps % sample_every == 0:
+                self.heap_samples.append((er.now, len(calendar)))
+        er.now = until
+        self.wall_seconds += clock() - started
+
+    def summary(self):
+        """Resumen serializable en JSON"""
+        result = {'wall_seconds': self.wall_seconds}
+        for category, entries in self._timers.items():
+            result[category] = {
+                key: {'count': count, 'seconds': seconds,
+                      'microseconds_per_call': seconds / count * 1e6 if count else 0.0}
+                for key, (count, seconds) in sorted(entries.items(), key=lambda item: -item[1][1])
+            }
+        result['event_queue'] = {
+            'max_size': max((size for _, size in self.heap_samples), default=0),
+            'samples': self.heap_samples
+        }
+        return result
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=4)
+
+
+def profile_call(function, file_prefix, *args, top=40, **kwargs):
+    """Ejecuta `function` bajo cProfile y tracemalloc y escribe un resumen
+
+    Genera `{file_prefix}_profile.txt` con las funciones de mayor tiempo
+    acumulado y las líneas que más memoria reservaron. Devuelve el resultado
+    de la función.
+    """
+    directory = os.path.dirname(file_prefix)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = profiler.runcall(function, *args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    output = io.StringIO()
+    output.write(f"Tiempo total: {elapsed:.3f} s\n")
+    output.write(f"Memoria reservada al final: {current / 1e6:.1f} MB, máxima: {peak / 1e6:.1f} MB\n\n")
+    output.write("=== Funciones por tiempo acumulado ===\n")
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(top)
+    output.write("=== Líneas con más memoria reservada ===\n")
+    for stat in snapshot.statistics('lineno')[:top]:
+        output.write(f"{stat}\n")
+
+    with open(f"{file_prefix}_profile.txt", 'w') as f:
+        f.write(output.getvalue())
+    return result
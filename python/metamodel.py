@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Metamodelo de los resultados acumulados para consultas "qué pasa si"
+
+Ajusta un proceso gaussiano (kernel RBF con una escala por variable) por
+indicador sobre los resultados que run_simulation ya devuelve (los JSON de
+la caché de resultados, de informes o de un barrido). Cada corrida aporta
+un punto: las variables salen de 'simulation_parameters' (capacidades,
+tasa media de llegadas, fracción de llegadas en fin de semana, severidad
+media, horizonte y la utilización máxima que predice queueing_surrogate) y
+los indicadores de los campos de resultados. Las réplicas de una misma
+configuración se promedian y su varianza entra como ruido de ese punto.
+
+Una consulta cuesta unos milisegundos y devuelve media y desviación
+estándar de cada indicador. answer() solo simula cuando la incertidumbre
+supera la tolerancia pedida, y agrega esas corridas al metamodelo.
+"""
+
+import argparse
+import json
+import math
+import os
+
+import numpy as np
+
+from adaptive_replications import metric_value
+from arrivals import arrival_process_from_config
+from emergency_simulation import economic_summary
+from pathways import DEFAULT_RESOURCES
+from queueing_surrogate import predict as surrogate_predict, weekend_share
+
+FEATURES = ('num_triage_nurses', 'num_doctors', 'num_nurses', 'num_xray', 'num_labs',
+            'arrival_rate', 'weekend_share', 'mean_severity', 'sim_time', 'max_utilization')
+
+DEFAULT_TARGETS = ('average_time_in_system',) + tuple(f'severity_statistics.{k}.mean' for k in range(1, 6)) \
+    + ('cost_per_patient',)
+
+NORMAL_95 = 1.959964
+SEARCH_SWEEPS = 8
+
+
+def features(config, sim_time=168):
+    """Vector de variables del metamodelo para una configuración y un horizonte"""
+    process = arrival_process_from_config(config)
+    weights = config.get('severity_weights', [0.1, 0.25, 0.35, 0.2, 0.1])
+    vector = [config.get(key, default) for key, default in DEFAULT_RESOURCES.values()]
+    vector += [
+        process.cumulative(sim_time) / sim_time,
+        weekend_share(process, sim_time),
+        sum(k * w for k, w in enumerate(weights, start=1)) / sum(weights),
+        sim_time,
+        min(surrogate_predict(config, sim_time)['max_utilization'], 10.0)  # Más allá, todo está saturado
+    ]
+    return vector
+
+
+def target_value(results, target):
+    """Valor de un indicador en los resultados ('cost_per_patient' o una ruta de metric_value)"""
+    if target == 'cost_per_patient':
+        # Sin altas el costo por paciente no está definido (economic_summary daría 0)
+        if not results or 'error' in results or not results.get('total_patients'):
+            return None
+        return economic_summary(results.get('simulation_parameters', {}), results['total_patients'])[target]
+    return metric_value(results, target)
+
+
+def load_results(paths):
+    """Resultados de run_simulation guardados en archivos JSON o directorios (por ejemplo, la caché)"""
+    loaded = []
+    for path in paths:
+        files = ([os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.json')]
+                 if os.path.isdir(path) else [path])
+        for file in files:
+            try:
+                with open(file, 'r', encoding='utf-8') as f:
+                    results = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if isinstance(results, dict) and 'simulation_parameters' in results:
+                loaded.append(results)
+    return loaded
+
+
+class GaussianProcess:
+    """Regresión con proceso gaussiano sobre variables y respuesta estandarizadas
+
+    Los hiperparámetros (escalas de longitud, varianza de la señal y ruido
+    común) maximizan la verosimilitud marginal con una búsqueda por
+    coordenadas en escala logarítmica.
+    """
+
+    def __init__(self, log_params=None):
+        self.log_params = log_params
+
+    def fit(self, x, y, noise=None, optimize=True):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.x_mean = x.mean(axis=0)
+        self.x_scale = x.std(axis=0)
+        self.x_scale[self.x_scale == 0] = 1.0
+        self.y_mean = y.mean()
+        self.y_scale = y.std() or 1.0
+        self.x = (x - self.x_mean) / self.x_scale
+        y_std = (y - self.y_mean) / self.y_scale
+        # Varianza de la media de cada punto (réplicas), en unidades estandarizadas
+        self.noise = np.zeros(len(y)) if noise is None else np.asarray(noise, dtype=float) / self.y_scale ** 2
+        self.distances = (self.x[:, None, :] - self.x[None, :, :]) ** 2
+
+        if self.log_params is None or len(self.log_params) != x.shape[1] + 2:
+            # Escalas 1 (datos estandarizados), señal 1 y ruido 1% de la varianza
+            self.log_params = np.array([0.0] * x.shape[1] + [0.0, math.log(0.01)])
+        if optimize:
+            self._optimize(y_std)
+        self._factorize(y_std)
+        return self
+
+    def _covariance(self, log_params):
+        scales = np.exp(-2 * log_params[:-2])
+        signal = math.exp(log_params[-2])
+        return signal * np.exp(-0.5 * self.distances @ scales)
+
+    def _log_likelihood(self, log_params, y):
+        covariance = self._covariance(log_params)
+        covariance[np.diag_indices_from(covariance)] += self.noise + math.exp(log_params[-1]) + 1e-8
+        try:
+            cholesky = np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            return -math.inf
+        z = np.linalg.solve(cholesky, y)
+        return -0.5 * z @ z - np.log(np.diag(cholesky)).sum()
+
+    def _optimize(self, y):
+        params = np.array(self.log_params, dtype=float)
+        best = self._log_likelihood(params, y)
+        step = math.log(4)
+        for _ in range(SEARCH_SWEEPS):
+            improved = False
+            for i in range(len(params)):
+                for direction in (1, -1):
+                    candidate = params.copy()
+                    candidate[i] = np.clip(candidate[i] + direction * step, -8, 8)
+                    value = self._log_likelihood(candidate, y)
+                    if value > best:
+                        params, best, improved = candidate, value, True
+                        break
+            if not improved:
+                step /= 2
+        self.log_params = params
+
+    def _factorize(self, y):
+        covariance = self._covariance(self.log_params)
+        covariance[np.diag_indices_from(covariance)] += self.noise + math.exp(self.log_params[-1]) + 1e-8
+        cholesky = np.linalg.cholesky(covariance)
+        # Se guarda L^-1 para que cada predicción cueste O(n²) sin resolver sistemas
+        self.inverse_cholesky = np.linalg.inv(cholesky)
+        self.alpha = self.inverse_cholesky.T @ (self.inverse_cholesky @ y)
+
+    def predict(self, x):
+        """Media y desviación estándar de la respuesta en los puntos `x`"""
+        x = (np.atleast_2d(np.asarray(x, dtype=float)) - self.x_mean) / self.x_scale
+        scales = np.exp(-2 * self.log_params[:-2])
+        signal = math.exp(self.log_params[-2])
+        cross = signal * np.exp(-0.5 * ((x[:, None, :] - self.x[None, :, :]) ** 2) @ scales)
+        mean = cross @ self.alpha
+        projected = cross @ self.inverse_cholesky.T
+        variance = np.maximum(signal - (projected ** 2).sum(axis=1), 0.0)
+        return mean * self.y_scale + self.y_mean, np.sqrt(variance) * self.y_scale
+
+
+class Metamodel:
+    """Procesos gaussianos por indicador sobre resultados de run_simulation"""
+
+    def __init__(self, targets=DEFAULT_TARGETS):
+        self.targets = tuple(targets)
+        self.observations = {}  # clave de las variables -> (variables, {indicador: [valores]})
+        self.models = {}
+
+    def add(self, results):
+        """Agrega los resultados de una corrida; devuelve False si no tienen datos (corridas sin altas)"""
+        if (not results or 'simulation_parameters' not in results or 'error' in results
+                or not results.get('total_patients')):
+            return False
+        params = results['simulation_parameters']
+        vector = features(params, params.get('sim_time', 168))
+        _, values = self.observations.setdefault(tuple(vector), (vector, {}))
+        for target in self.targets:
+            value = target_value(results, target)
+            if value is not None and math.isfinite(value):
+                values.setdefault(target, []).append(value)
+        return True
+
+    def add_many(self, results_list):
+        return sum(self.add(results) for results in results_list)
+
+    def fit(self, optimize=True):
+        """Ajusta un proceso por indicador; optimize=False reutiliza los hiperparámetros anteriores"""
+        for target in self.targets:
+            points = [(vector, values[target]) for vector, values in self.observations.values()
+                      if values.get(target)]
+            if len(points) < 2:
+                self.models.pop(target, None)
+                continue
+            x = [vector for vector, _ in points]
+            y = [math.fsum(values) / len(values) for _, values in points]
+            noise = [_variance(values) / len(values) if len(values) > 1 else 0.0 for _, values in points]
+            previous = self.models.get(target)
+            model = GaussianProcess(previous.log_params if previous is not None else None)
+            self.models[target] = model.fit(x, y, noise, optimize=optimize or previous is None)
+        return self
+
+    def predict(self, config, sim_time=168):
+        """{indicador: {'mean', 'std'}} para una configuración (sin simular)"""
+        vector = features(config, sim_time)
+        prediction = {}
+        for target, model in self.models.items():
+            mean, std = model.predict([vector])
+            prediction[target] = {'mean': float(mean[0]), 'std': float(std[0])}
+        return prediction
+
+    def uncertain(self, prediction, tolerance, relative=True):
+        """Indicadores cuyo semiancho al 95% supera la tolerancia (o sin modelo)"""
+        flagged = [target for target in self.targets if target not in prediction]
+        for target, estimate in prediction.items():
+            limit = tolerance * abs(estimate['mean']) if relative else tolerance
+            if NORMAL_95 * estimate['std'] > limit:
+                flagged.append(target)
+        return flagged
+
+    def save(self, path):
+        """Guarda las observaciones y los hiperparámetros en JSON"""
+        data = {
+            'targets': list(self.targets),
+            'observations': [{'features': vector, 'values': values} for vector, values in self.observations.values()],
+            'log_params': {target: model.log_params.tolist() for target, model in self.models.items()}
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        """Reconstruye un metamodelo guardado (sin volver a buscar hiperparámetros)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        metamodel = cls(data['targets'])
+        for observation in data['observations']:
+            metamodel.observations[tuple(observation['features'])] = (observation['features'], observation['values'])
+        for target, log_params in data['log_params'].items():
+            metamodel.models[target] = GaussianProcess(np.array(log_params))
+        return metamodel.fit(optimize=False)
+
+
+def answer(metamodel, config, sim_time=168, tolerance=0.1, relative=True, replications=3, max_workers=None,
+           engine='fast'):
+    """Responde una consulta con el metamodelo o, si es incierto, simulando
+
+    Si algún indicador tiene un semiancho al 95% mayor que `tolerance`
+    (relativo a la media por defecto), se simulan `replications` réplicas de
+    la configuración, se agregan al metamodelo y se vuelve a predecir.
+    Devuelve {'prediction', 'source' ('metamodel' o 'simulation'),
+    'simulations_run'}.
+    """
+    from parallel_runner import run_replications
+
+    prediction = metamodel.predict(config, sim_time)
+    if not metamodel.uncertain(prediction, tolerance, relative):
+        return {'prediction': prediction, 'source': 'metamodel', 'simulations_run': 0}
+
+    replica_results = run_replications({'consulta': config}, replications=replications, sim_time=sim_time,
+                                       max_workers=max_workers, engine=engine)
+    for results in replica_results['consulta']:
+        metamodel.add(results)
+    metamodel.fit(optimize=False)
+    return {'prediction': metamodel.predict(config, sim_time), 'source': 'simulation',
+            'simulations_run': replications}
+
+
+def _variance(values):
+    mean = math.fsum(values) / len(values)
+    return math.fsum((v - mean) ** 2 for v in values) / (len(values) - 1)
+
+
+if __name__ == "__main__":
+    from sensitivity_sweep import BASE_CONFIG
+
+    parser = argparse.ArgumentParser(description="Consultas al metamodelo de resultados acumulados")
+    parser.add_argument('--results', nargs='+', default=[os.path.join("resultados", "cache")],
+                        help="Archivos JSON o directorios con resultados de run_simulation")
+    parser.add_argument('--set', nargs='*', default=[], metavar='PARAMETRO=VALOR',
+                        help="Cambios sobre la configuración base (por ejemplo num_doctors=4)")
+    parser.add_argument('--day-load', nargs='*', default=[], metavar='DIA=FACTOR',
+                        help="Multiplica la demanda de un día (0 = lunes, 5 = sábado), por ejemplo 5=1.3")
+    parser.add_argument('--sim-time', type=float, default=168)
+    parser.add_argument('--tolerance', type=float, default=0.1, help="Semiancho relativo máximo sin simular")
+    parser.add_argument('--replications', type=int, default=3)
+    parser.add_argument('--engine', choices=['simpy', 'fast'], default='fast')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    query = dict(BASE_CONFIG)
+    for assignment in args.set:
+        key, value = assignment.split('=', 1)
+        query[key] = json.loads(value)
+    day_factors = list(query['day_factors'])
+    for assignment in args.day_load:
+        day, factor = assignment.split('=', 1)
+        day_factors[int(day)] *= float(factor)
+    query['day_factors'] = day_factors
+
+    metamodel = Metamodel()
+    loaded = metamodel.add_many(load_results(args.results))
+    print(f"Resultados cargados: {loaded} corridas en {len(metamodel.observations)} configuraciones")
+    metamodel.fit()
+
+    outcome = answer(metamodel, query, sim_time=args.sim_time, tolerance=args.tolerance,
+                     replications=args.replications, max_workers=args.workers, engine=args.engine)
+    source = "metamodelo" if outcome['source'] == 'metamodel' else f"simulación ({outcome['simulations_run']} réplicas)"
+    print(f"Respuesta obtenida por {source}:")
+    for target, estimate in outcome['prediction'].items():
+        print(f"  {target}: {estimate['mean']:.2f} ± {NORMAL_95 * estimate['std']:.2f}")
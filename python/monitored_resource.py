@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recursos con prioridad instrumentados
+
+MonitoredPriorityResource registra el estado del recurso (en uso y en cola)
+cada vez que una solicitud se agrega, se atiende o se libera, y acumula las
+integrales en el tiempo necesarias para obtener la utilización exacta y la
+longitud promedio de la cola, sin un proceso de muestreo periódico.
+
+La cola de solicitudes es un heap indexado (RequestHeap) en lugar de la
+lista que simpy.PriorityResource reordena en cada solicitud: agregar,
+atender o cancelar una solicitud cuesta O(log n) y una solicitud en espera
+puede cambiar de prioridad sin sacarla de la cola.
+"""
+
+import simpy
+
+from indexed_heap import IndexedHeap
+
+
+class UtilizationAccumulator:
+    """Integrales en el tiempo de recursos en uso y longitud de cola
+
+    Lo comparten MonitoredPriorityResource y el motor rápido para que ambos
+    calculen los indicadores exactamente igual.
+    """
+
+    __slots__ = ('start_time', 'busy_time', 'queue_time', 'max_queue_length',
+                 'last_time', 'last_users', 'last_queue', 'capacity_time', 'capacity_since')
+
+    def __init__(self, start_time=0.0):
+        self.start_time = start_time
+        self.busy_time = 0.0  # Integral de recursos en uso
+        self.queue_time = 0.0  # Integral de la longitud de la cola
+        self.max_queue_length = 0
+        self.last_time = start_time
+        self.last_users = 0
+        self.last_queue = 0
+        self.capacity_time = 0.0  # Integral de la capacidad antes del último cambio
+        self.capacity_since = start_time
+
+    def change_capacity(self, previous_capacity, now):
+        """Acumula la capacidad anterior hasta `now` (la capacidad cambió en ese instante)"""
+        self.capacity_time += previous_capacity * (now - self.capacity_since)
+        self.capacity_since = now
+
+    def update(self, users, queue, now):
+        """Acumula el intervalo transcurrido; devuelve True si el estado cambió"""
+        if users == self.last_users and queue == self.last_queue:
+            return False
+        elapsed = now - self.last_time
+        self.busy_time += self.last_users * elapsed
+        self.queue_time += self.last_queue * elapsed
+        self.last_time = now
+        self.last_users = users
+        self.last_queue = queue
+        if queue > self.max_queue_length:
+            self.max_queue_length = queue
+        return True
+
+    def summary(self, capacity, until):
+        """Indicadores ponderados por tiempo hasta `until`"""
+        elapsed = until - self.last_time
+        busy_time = self.busy_time + self.last_users * elapsed
+        queue_time = self.queue_time + self.last_queue * elapsed
+        horizon = until - self.start_time
+        # Recursos-hora disponibles (la capacidad puede cambiar al bifurcar una corrida)
+        available = self.capacity_time + capacity * (until - self.capacity_since)
+
+        return {
+            'capacity': capacity,
+            'busy_time': busy_time,
+            'utilization': busy_time / available if horizon > 0 and available > 0 else 0.0,
+            'average_in_use': busy_time / horizon if horizon > 0 else 0.0,
+            'average_queue_length': queue_time / horizon if horizon > 0 else 0.0,
+            'max_queue_length': self.max_queue_length
+        }
+
+
+class RequestHeap(IndexedHeap):
+    """Cola de solicitudes de un recurso con la interfaz que usa SimPy
+
+    El orden es el de simpy.PriorityResource (prioridad, hora de la
+    solicitud y orden de llegada). Con `aging_rate` > 0 la prioridad efectiva
+    de una solicitud mejora `aging_rate` niveles por hora de espera; como
+    todas envejecen al mismo ritmo, equivale a la clave fija
+    prioridad + aging_rate * hora de la solicitud.
+    """
+
+    def __init__(self, aging_rate=0.0):
+        super().__init__()
+        self.aging_rate = aging_rate
+        self.on_remove = None  # Se llama al quitar una solicitud sin atenderla (cancelación)
+
+    def request_key(self, request):
+        if self.aging_rate:
+            return (request.priority + self.aging_rate * request.time, request.time, not request.preempt)
+        return request.key
+
+    def append(self, request):
+        self.push(request, self.request_key(request))
+
+    def __getitem__(self, index):
+        # SimPy solo revisa la primera solicitud de la cola
+        if index != 0:
+            raise IndexError("Solo se puede consultar la primera solicitud de la cola")
+        return self.peek()
+
+    def remove(self, request):
+        # Request.cancel (abandono o interrupción) quita la solicitud directamente de la cola
+        super().remove(request)
+        if self.on_remove is not None:
+            self.on_remove()
+
+    def pop(self, index=0):
+        if index != 0:
+            raise IndexError("Solo se puede atender la primera solicitud de la cola")
+        return super().pop()
+
+    def __iter__(self):
+        return iter(self.items())
+
+
+class MonitoredPriorityResource(simpy.PriorityResource):
+    """simpy.PriorityResource que acumula utilización y cola ponderadas por tiempo
+
+    `on_change(name, capacity, in_use, queue_length, time)` se llama cada vez
+    que cambia el número de usuarios o la longitud de la cola, también cuando
+    una solicitud en espera se cancela. `aging_rate`
+    (niveles de prioridad por hora de espera) hace que las solicitudes de
+    baja prioridad avancen mientras esperan.
+    """
+
+    PutQueue = RequestHeap
+
+    def __init__(self, env, capacity=1, name=None, on_change=None, aging_rate=0.0):
+        super().__init__(env, capacity)
+        self.put_queue.aging_rate = aging_rate
+        self.put_queue.on_remove = self._record
+        self.name = name
+        self.on_change = on_change
+        self.usage = UtilizationAccumulator(env.now)
+
+    def reprioritize(self, request, priority):
+        """Cambia la prioridad de una solicitud en espera en O(log n)"""
+        request.priority = priority
+        request.key = (priority, request.time, not request.preempt)
+        self.put_queue.update(request, self.put_queue.request_key(request))
+
+    def _record(self):
+        """Acumula el intervalo transcurrido y registra el nuevo estado"""
+        users = len(self.users)
+        queue = len(self.put_queue)
+        now = self._env.now
+        if self.usage.update(users, queue, now) and self.on_change is not None:
+            self.on_change(self.name, self.capacity, users, queue, now)
+
+    def _trigger_put(self, get_event):
+        super()._trigger_put(get_event)
+        self._record()
+
+    def _trigger_get(self, put_event):
+        super()._trigger_get(put_event)
+        self._record()
+
+    def summary(self, until=None):
+        """Indicadores ponderados por tiempo desde la creación hasta `until`"""
+        return self.usage.summary(self.capacity, self._env.now if until is None else until)
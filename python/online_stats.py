@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Estadísticas en línea con memoria acotada
+
+RunningStats mantiene conteo, media y varianza con el método de Welford.
+QuantileSketch aproxima cuantiles con cubetas logarítmicas (error relativo
+acotado), al estilo de DDSketch. Ambas se pueden combinar (merge), por lo que
+sirven para unir resultados de réplicas o de procesos distintos.
+"""
+
+import math
+
+
+class RunningStats:
+    """Conteo, media, varianza, mínimo y máximo acumulados (Welford)"""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Combina otro acumulador en este (Chan et al.)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Varianza muestral (n - 1)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """Cuantiles aproximados con error relativo `relative_accuracy`
+
+    Cada valor positivo cae en la cubeta ceil(log_gamma(x)); los valores
+    menores que `min_value` se cuentan aparte. Si hay más de `max_buckets`
+    cubetas se combinan las más bajas, de modo que la memoria queda acotada
+    y los cuantiles altos (p90, p99) conservan su precisión.
+    """
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value < self.min_value:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        buckets[key] = buckets.get(key, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self):
+        """Une las dos cubetas más bajas para respetar max_buckets"""
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    def merge(self, other):
+        """Combina otro sketch con la misma precisión en este"""
+        if other.gamma != self.gamma:
+            raise ValueError("Solo se pueden combinar sketches con la misma precisión")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        return self
+
+    def quantile(self, q):
+        """Valor aproximado del cuantil q (0 <= q <= 1)"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                # Punto medio (en escala relativa) de la cubeta
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+def percentile(sorted_values, q):
+    """Cuantil exacto con interpolación lineal sobre valores ya ordenados"""
+    n = len(sorted_values)
+    if n == 0:
+        return None
+    position = q * (n - 1)
+    low = int(position)
+    high = min(low + 1, n - 1)
+    fraction = position - low
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * fraction
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Análisis de salida: periodo de calentamiento e intervalos de confianza
+
+La sala empieza vacía en t=0, así que los primeros pacientes esperan menos
+que en el régimen estacionario. Este módulo:
+
+- detecta el periodo de calentamiento con MSER-5 (Marginal Standard Error
+  Rule sobre medias de lotes de 5 observaciones) y lo descarta
+- estima la media estacionaria con un intervalo de confianza a partir de una
+  sola corrida larga usando medias por lotes (batch means)
+
+Las observaciones se toman en orden de llegada de los pacientes.
+"""
+
+import math
+from statistics import NormalDist
+
+MSER_BATCH_SIZE = 5
+DEFAULT_BATCHES = 20
+DEFAULT_CONFIDENCE = 0.95
+
+
+def _beta_continued_fraction(a, b, x):
+    """Fracción continua de la beta incompleta regularizada (método de Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < 1e-15:
+            break
+    return result
+
+
+def regularized_beta(a, b, x):
+    """Beta incompleta regularizada I_x(a, b)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    # La fracción continua converge rápido para x < (a + 1) / (a + b + 2); si no, se usa la simetría
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(b, a, 1 - x) / b
+
+
+def t_cdf(t, df):
+    """Función de distribución de la t de Student con df grados de libertad"""
+    tail = 0.5 * regularized_beta(df / 2, 0.5, df / (df + t * t))
+    return 1 - tail if t > 0 else tail
+
+
+def t_quantile(p, df):
+    """Cuantil p de la distribución t de Student con df grados de libertad
+
+    Exacto para df 1 y 2. Para df mayores parte de la expansión de
+    Cornish-Fisher alrededor del cuantil normal y la corrige con el método
+    de Newton sobre t_cdf (beta incompleta regularizada), hasta la precisión
+    de punto flotante.
+    """
+    if df < 1:
+        raise ValueError("Se requiere al menos un grado de libertad")
+    if not 0 < p < 1:
+        raise ValueError("El nivel del cuantil debe estar entre 0 y 1")
+    if df == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if df == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    z2 = z * z
+    t = (z
+         + z * (z2 + 1) / (4 * df)
+         + z * ((5 * z2 + 16) * z2 + 3) / (96 * df ** 2)
+         + z * (((3 * z2 + 19) * z2 + 17) * z2 - 15) / (384 * df ** 3)
+         + z * ((((79 * z2 + 776) * z2 + 1482) * z2 - 1920) * z2 - 945) / (92160 * df ** 4))
+
+    # Densidad de la t: Γ((df+1)/2) / (sqrt(df π) Γ(df/2)) (1 + t²/df)^(-(df+1)/2)
+    log_norm = math.lgamma((df + 1) / 2) - math.lgamma(df / 2) - 0.5 * math.log(df * math.pi)
+    for _ in range(50):
+        density = math.exp(log_norm - (df + 1) / 2 * math.log1p(t * t / df))
+        step = (t_cdf(t, df) - p) / density
+        t -= step
+        if abs(step) <= 1e-14 * max(1.0, abs(t)):
+            break
+    return t
+
+
+def confidence_interval(values, confidence=DEFAULT_CONFIDENCE):
+    """Media y semiancho del intervalo t de observaciones independientes"""
+    n = len(values)
+    if n == 0:
+        return {'mean': None, 'half_width': None, 'count': 0}
+    mean = math.fsum(values) / n
+    if n < 2:
+        return {'mean': mean, 'half_width': math.inf, 'count': n}
+    variance = math.fsum((x - mean) ** 2 for x in values) / (n - 1)
+    half_width = t_quantile(0.5 + confidence / 2, n - 1) * math.sqrt(variance / n)
+    return {'mean': mean, 'half_width': half_width, 'count': n}
+
+
+def batch_averages(values, batch_size):
+    """Medias de lotes consecutivos de `batch_size` valores (se descarta el lote incompleto)"""
+    batches = len(values) // batch_size
+    return [math.fsum(values[i * batch_size:(i + 1) * batch_size]) / batch_size for i in range(batches)]
+
+
+def mser_truncation(values, batch_size=MSER_BATCH_SIZE):
+    """Cantidad de observaciones iniciales a descartar según MSER-m
+
+    Para cada d se calcula el error estándar marginal de las medias de lote
+    restantes, SSE(d) / (k - d)^2, y se elige el d mínimo; solo se consideran
+    truncamientos de hasta la mitad de los lotes. Devuelve d * batch_size.
+    """
+    means = batch_averages(values, batch_size)
+    k = len(means)
+    if k < 4:
+        return 0
+
+    # Sumas acumuladas desde el final para evaluar cada d en O(1)
+    suffix_sum = [0.0] * (k + 1)
+    suffix_squares = [0.0] * (k + 1)
+    for i in range(k - 1, -1, -1):
+        suffix_sum[i] = suffix_sum[i + 1] + means[i]
+        suffix_squares[i] = suffix_squares[i + 1] + means[i] * means[i]
+
+    best_d, best_value = 0, math.inf
+    for d in range(k // 2 + 1):
+        m = k - d
+        sse = max(0.0, suffix_squares[d] - suffix_sum[d] ** 2 / m)
+        value = sse / (m * m)
+        if value < best_value:
+            best_d, best_value = d, value
+    return best_d * batch_size
+
+
+def lag1_autocorrelation(values):
+    """Autocorrelación de orden 1 (diagnóstico de independencia de los lotes)"""
+    n = len(values)
+    if n < 3:
+        return None
+    mean = math.fsum(values) / n
+    denominator = math.fsum((x - mean) ** 2 for x in values)
+    if denominator == 0:
+        return 0.0
+    return math.fsum((values[i] - mean) * (values[i + 1] - mean) for i in range(n - 1)) / denominator
+
+
+def batch_means_interval(values, batches=DEFAULT_BATCHES, confidence=DEFAULT_CONFIDENCE):
+    """Media estacionaria e intervalo de confianza con medias por lotes
+
+    Las observaciones se dividen en `batches` lotes consecutivos de igual
+    tamaño (el sobrante inicial se descarta) y el intervalo t se calcula
+    sobre las medias de los lotes. Devuelve None si hay menos de dos
+    observaciones por lote.
+    """
+    batch_size = len(values) // batches
+    if batches < 2 or batch_size < 2:
+        return None
+    values = values[len(values) - batch_size * batches:]
+    means = batch_averages(values, batch_size)
+    interval = confidence_interval(means, confidence)
+    return {
+        'mean': interval['mean'],
+        'half_width': interval['half_width'],
+        'confidence': confidence,
+        'batches': batches,
+        'batch_size': batch_size,
+        'lag1_autocorrelation': lag1_autocorrelation(means)
+    }
+
+
+def steady_state_summary(entry_times, values, groups=None, batches=DEFAULT_BATCHES,
+                         confidence=DEFAULT_CONFIDENCE, warmup='mser5'):
+    """Calentamiento (MSER-5) y estimaciones por lotes de una serie de observaciones
+
+    `entry_times` ordena las observaciones por llegada; `groups` (por
+    ejemplo, la severidad de cada paciente) agrega una estimación por grupo
+    usando el mismo truncamiento.
+    """
+    order = sorted(range(len(values)), key=entry_times.__getitem__)
+    ordered = [values[i] for i in order]
+    truncated = mser_truncation(ordered) if warmup == 'mser5' else 0
+
+    summary = {
+        'warmup': {
+            'method': 'MSER-5' if warmup == 'mser5' else 'none',
+            'truncated_observations': truncated,
+            'truncation_time': entry_times[order[truncated]] if truncated < len(order) else None,
+            'kept_observations': len(ordered) - truncated
+        },
+        'estimate': batch_means_interval(ordered[truncated:], batches, confidence)
+    }
+    if groups is not None:
+        by_group = {}
+        for i in order[truncated:]:
+            by_group.setdefault(groups[i], []).append(values[i])
+        summary['by_group'] = {str(group): batch_means_interval(group_values, batches, confidence)
+                               for group, group_values in sorted(by_group.items())}
+    return summary
+
+
+def required_run_length(current_length, half_width, target_half_width):
+    """Horizonte estimado para alcanzar un semiancho objetivo (escala con 1/sqrt(n))"""
+    if not half_width or target_half_width <= 0:
+        return current_length
+    return current_length * (half_width / target_half_width) ** 2
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ejecución de réplicas de la simulación en paralelo
+
+Cada réplica llama directamente a run_simulation dentro de un proceso de un
+pool que se mantiene vivo (los módulos ya están importados), usa su propia
+semilla y devuelve los resultados en memoria, sin escribir archivos compartidos.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def replication_seed(base_seed, replication):
+    """Semilla de una réplica: la réplica 0 conserva la semilla base
+
+    Las demás salen del hijo `replication` de SeedSequence(base_seed), así
+    que semillas base vecinas no comparten réplicas (con base_seed +
+    replication, la réplica 1 de la semilla 11 era la réplica 0 de la 12).
+    """
+    if replication == 0:
+        return base_seed
+    child = np.random.SeedSequence(base_seed, spawn_key=(replication,))
+    return int(child.generate_state(1, np.uint64)[0])
+
+
+def _init_worker():
+    """Importa el modelo una sola vez por proceso del pool"""
+    import emergency_simulation  # noqa: F401
+
+
+def _run_replication(task):
+    """Ejecuta una réplica (función de nivel superior para poder serializarla)"""
+    from emergency_simulation import run_simulation
+
+    name, replication, config, sim_time, engine = task
+    return name, replication, run_simulation(config, sim_time=sim_time, write_report=False, engine=engine)
+
+
+def make_task(name, config, replication, sim_time=None, engine='simpy'):
+    """Tarea (nombre, réplica, configuración, horizonte, motor) de una réplica
+
+    Un `sim_time` explícito tiene prioridad; sin él se usa el 'sim_time' de
+    la configuración o 24 horas, como en la línea de comandos.
+    """
+    replica_config = dict(config)
+    replica_config['random_seed'] = replication_seed(config.get('random_seed', 42), replication)
+    # Las réplicas en lote no imprimen trazas salvo que se pidan
+    replica_config.setdefault('trace_level', 'off')
+    if sim_time is None:
+        sim_time = config.get('sim_time', 24)
+    return (name, replication, replica_config, sim_time, engine)
+
+
+def build_tasks(configurations, replications=1, sim_time=None, engine='simpy'):
+    """Genera las tareas de N réplicas de cada configuración"""
+    return [make_task(name, config, replication, sim_time, engine)
+            for name, config in configurations.items()
+            for replication in range(replications)]
+
+
+def run_tasks(tasks, max_workers=None):
+    """Ejecuta tareas en el pool y devuelve [(nombre, réplica, resultados)] en el mismo orden"""
+    if max_workers == 1:
+        # Ejecución en el mismo proceso (útil para depurar)
+        return [_run_replication(task) for task in tasks]
+
+    workers = max_workers or max(1, min(len(tasks), os.cpu_count() or 1))
+    # Agrupar tareas para reducir la comunicación entre procesos en barridos grandes
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_run_replication, tasks, chunksize=chunksize))
+
+
+def run_replications(configurations, replications=1, sim_time=None, max_workers=None, engine='simpy'):
+    """Ejecuta N réplicas de cada configuración en un pool de procesos
+
+    Devuelve un diccionario {nombre: [resultados de cada réplica]} ordenado
+    por número de réplica.
+    """
+    tasks = build_tasks(configurations, replications, sim_time, engine)
+    results = {name: [None] * replications for name in configurations}
+    for name, replication, result in run_tasks(tasks, max_workers):
+        results[name][replication] = result
+    return results
+
+
+def summarize_replications(replica_results):
+    """Combina las réplicas de una configuración en un solo diccionario
+
+    Los indicadores numéricos se promedian y se agrega su desviación estándar
+    y el semiancho del intervalo de confianza del 95% de la media, para
+    poder compararlos con los resultados de una sola corrida.
+    """
+    from output_analysis import confidence_interval
+
+    valid = [r for r in replica_results if r and 'average_time_in_system' in r]
+    if not valid:
+        return {}
+
+    summary = {
+        "simulation_parameters": valid[0].get('simulation_parameters', {}),
+        "replications": len(valid)
+    }
+    for key in ('average_time_in_system', 'median_time_in_system', 'total_patients'):
+        values = [r[key] for r in valid]
+        mean = sum(values) / len(values)
+        variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1) if len(values) > 1 else 0.0
+        summary[key] = mean
+        summary[f"{key}_std"] = math.sqrt(variance)
+        summary[f"{key}_half_width"] = confidence_interval(values)['half_width']
+
+    return summary
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recorridos de pacientes definidos como datos
+
+Un recorrido es un grafo acíclico de etapas. Cada etapa usa un recurso,
+tiene una distribución de tiempo de servicio con parámetros por severidad y
+una lista de etapas siguientes con probabilidades por severidad; la última
+puede omitir la probabilidad (se queda con el resto) y una etapa sin etapas
+siguientes da de alta al paciente. Los valores por severidad son un número
+(igual para todas) o una lista indexada por severidad - 1.
+
+Distribuciones del servicio (en la misma escala que el modelo original):
+- {'distribution': 'uniform', 'low': a, 'high': b}
+- {'distribution': 'exponential', 'mean': m}
+- {'distribution': 'constant', 'value': v}
+Todas admiten 'scale' (factor por severidad) y se multiplican por
+'weekend_factor' en sábado y domingo.
+
+Al iniciar una corrida el recorrido se compila en tablas planas indexadas
+por etapa y severidad (probabilidades acumuladas, destinos y parámetros del
+servicio), así que el recorrido de cada paciente se resuelve con búsquedas
+en listas, sin construir diccionarios ni consultar la configuración. Lo usan
+EmergencyRoom (SimPy), FastEmergencyRoom, BatchEmergencyRoom y
+queueing_surrogate. La configuración puede indicar 'pathway': un
+diccionario con este formato o la ruta de un archivo JSON.
+"""
+
+import json
+import math
+from bisect import bisect_right
+
+# Recurso -> (parámetro de capacidad, capacidad por defecto); un recorrido puede agregar recursos
+DEFAULT_RESOURCES = {
+    'triage_nurses': ('num_triage_nurses', 2),
+    'doctors': ('num_doctors', 3),
+    'nurses': ('num_nurses', 5),
+    'xray': ('num_xray', 2),
+    'lab': ('num_labs', 2)
+}
+
+# Factor de duración por severidad de las etapas más largas para pacientes graves: 1 + (6 - severidad) / 10
+SEVERITY_SCALE = [1.5, 1.4, 1.3, 1.2, 1.1]
+
+# Recorrido del modelo original. Rayos X (80% a 20% según severidad) y laboratorio (90% a 30%)
+# son independientes: desde el doctor, laboratorio sin rayos X tiene probabilidad (1 - p_rx) p_lab.
+# La segunda consulta solo la tienen los pacientes que fueron a alguna prueba.
+DEFAULT_PATHWAY = {
+    'start': 'triage',
+    'weekend_factor': 1.2,
+    'registration': {'mean': [5 / 3, 10 / 3, 5, 20 / 3, 25 / 3]},  # Exponencial: 5 * severidad / 3
+    'stages': {
+        'triage': {
+            'resource': 'triage_nurses', 'stream': 'triage',
+            'service': {'distribution': 'uniform', 'low': 5, 'high': 15},
+            'next': [['doctor']],
+            'message': "Paciente %d (Severidad %d) completa triage a las %.2fh"
+        },
+        'doctor': {
+            'resource': 'doctors', 'stream': 'doctor', 'route_stream': 'xray_route',
+            'service': {'distribution': 'uniform', 'low': 10, 'high': 30, 'scale': SEVERITY_SCALE},
+            'next': [['rayos_x', [0.8, 0.7, 0.5, 0.3, 0.2]],
+                     ['laboratorio', [0.18, 0.24, 0.3, 0.28, 0.24]],
+                     ['enfermera']],
+            'message': "Paciente %d (Severidad %d) visto por doctor a las %.2fh"
+        },
+        'rayos_x': {
+            'resource': 'xray', 'stream': 'xray', 'route_stream': 'lab_route',
+            'service': {'distribution': 'uniform', 'low': 15, 'high': 45},
+            'next': [['laboratorio', [0.9, 0.8, 0.6, 0.4, 0.3]], ['segunda_consulta']],
+            'message': "Paciente %d (Severidad %d) completa rayos X a las %.2fh"
+        },
+        'laboratorio': {
+            'resource': 'lab', 'stream': 'lab',
+            'service': {'distribution': 'uniform', 'low': 20, 'high': 60},
+            'next': [['segunda_consulta']],
+            'message': "Paciente %d (Severidad %d) completa pruebas de laboratorio a las %.2fh"
+        },
+        'segunda_consulta': {
+            'resource': 'doctors', 'stream': 'follow_up',
+            'service': {'distribution': 'uniform', 'low': 5, 'high': 15},
+            'next': [['enfermera']],
+            'message': "Paciente %d (Severidad %d) completa segunda consulta a las %.2fh"
+        },
+        'enfermera': {
+            'resource': 'nurses', 'stream': 'treatment',
+            'service': {'distribution': 'uniform', 'low': 10, 'high': 40, 'scale': SEVERITY_SCALE},
+            'next': [],
+            'message': "Paciente %d (Severidad %d) completa tratamiento a las %.2fh"
+        }
+    }
+}
+
+DISTRIBUTIONS = ('uniform', 'exponential', 'constant')
+
+_compiled_defaults = {}  # severidades -> recorrido por defecto compilado
+
+
+def _per_severity(value, severities, what):
+    """Lista indexada por severidad (posición 0 sin usar) de un número o una lista"""
+    if isinstance(value, (int, float)):
+        return [float(value)] * (severities + 1)
+    if len(value) < severities:
+        raise ValueError(f"{what}: se esperaban {severities} valores por severidad y hay {len(value)}")
+    return [float(value[0])] + [float(v) for v in value[:severities]]
+
+
+def _topological_order(stages, start):
+    """Etapas alcanzables desde `start` en orden topológico (error si hay ciclos)"""
+    order = []
+    state = {}  # 1: en la pila, 2: terminada
+
+    def visit(name):
+        if name not in stages:
+            raise ValueError(f"Etapa desconocida en el recorrido: {name}")
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"El recorrido tiene un ciclo en la etapa '{name}'")
+        state[name] = 1
+        for successor in stages[name].get('next', []):
+            visit(successor[0])
+        state[name] = 2
+        order.append(name)
+
+    visit(start)
+    order.reverse()
+    return order
+
+
+class CompiledPathway:
+    """Tablas planas de un recorrido, indexadas por etapa y severidad
+
+    Las etapas quedan en orden topológico con la inicial en la posición 0 y
+    `discharge` (= número de etapas) representa el alta.
+    """
+
+    def __init__(self, spec, severities=5):
+        stages = spec['stages']
+        self.severities = severities
+        self.names = _topological_order(stages, spec.get('start', next(iter(stages))))
+        index = {name: position for position, name in enumerate(self.names)}
+        self.discharge = len(self.names)
+        self.weekend_factor = float(spec.get('weekend_factor', 1.0))
+        self.registration_mean = _per_severity(spec.get('registration', {}).get('mean', 0.0), severities,
+                                               "registro")
+
+        self.capacities = dict(DEFAULT_RESOURCES)
+        for name, (parameter, default) in spec.get('resources', {}).items():
+            self.capacities[name] = (parameter, default)
+
+        self.resources, self.streams, self.messages = [], [], []
+        self.offset, self.width, self.exponential = [], [], []
+        self.successors, self.cumulative = [], []
+        self.route_slot, self.route_streams = [], []
+        for name in self.names:
+            stage = stages[name]
+            if stage['resource'] not in self.capacities:
+                raise ValueError(f"Recurso sin capacidad definida en la etapa '{name}': {stage['resource']}")
+            self.resources.append(stage['resource'])
+            self.streams.append(stage.get('stream', name))
+            self.messages.append(stage.get('message', f"Paciente %d (Severidad %d) completa {name} a las %.2fh"))
+            self._compile_service(name, stage['service'])
+            self._compile_routes(name, stage, index)
+
+    def _compile_service(self, name, service):
+        distribution = service.get('distribution', 'uniform')
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Distribución de servicio desconocida en '{name}': {distribution}")
+        scale = _per_severity(service.get('scale', 1.0), self.severities, f"escala de '{name}'")
+        if distribution == 'uniform':
+            low = _per_severity(service['low'], self.severities, f"mínimo de '{name}'")
+            high = _per_severity(service['high'], self.severities, f"máximo de '{name}'")
+            offset, width = low, [h - l for l, h in zip(low, high)]
+        elif distribution == 'exponential':
+            offset = [0.0] * (self.severities + 1)
+            width = _per_severity(service['mean'], self.severities, f"media de '{name}'")
+        else:
+            offset = _per_severity(service['value'], self.severities, f"valor de '{name}'")
+            width = [0.0] * (self.severities + 1)
+        self.offset.append([o * s for o, s in zip(offset, scale)])
+        self.width.append([w * s for w, s in zip(width, scale)])
+        self.exponential.append(distribution == 'exponential')
+
+    def _compile_routes(self, name, stage, index):
+        successors = stage.get('next', [])
+        targets = [index[successor[0]] for successor in successors] or [self.discharge]
+        self.successors.append(targets)
+        if len(targets) == 1:
+            self.cumulative.append(None)
+            self.route_slot.append(-1)
+            return
+
+        # Probabilidades acumuladas por severidad; la última etapa sin probabilidad se queda con el resto
+        cumulative = [[] for _ in range(self.severities + 1)]
+        for position, successor in enumerate(successors):
+            if len(successor) > 1:
+                probabilities = _per_severity(successor[1], self.severities, f"ruta {name} -> {successor[0]}")
+            elif position == len(successors) - 1:
+                probabilities = None
+            else:
+                raise ValueError(f"Solo la última etapa siguiente de '{name}' puede omitir la probabilidad")
+            for severity in range(self.severities + 1):
+                previous = cumulative[severity][-1] if cumulative[severity] else 0.0
+                cumulative[severity].append(1.0 if probabilities is None else previous + probabilities[severity])
+        for severity, values in enumerate(cumulative):
+            if severity and max(values) > 1.0 + 1e-9:  # La etapa que se queda con el resto ya vale 1
+                raise ValueError(f"Las probabilidades desde '{name}' suman más de 1 para la severidad {severity}")
+            values[-1] = 1.0  # u cercano a 1 (o 1 en la corrida 'mirror') cae en la última etapa
+        self.cumulative.append(cumulative)
+        self.route_slot.append(len(self.route_streams))
+        self.route_streams.append(stage.get('route_stream', f"{name}_route"))
+
+    def path(self, severity, routes):
+        """Etapas que recorre un paciente dadas las uniformes de ruta (una por etapa con ramas)"""
+        path = []
+        stage = 0
+        discharge = self.discharge
+        while stage != discharge:
+            path.append(stage)
+            slot = self.route_slot[stage]
+            if slot < 0:
+                stage = self.successors[stage][0]
+            else:
+                cumulative = self.cumulative[stage][severity]
+                stage = self.successors[stage][min(bisect_right(cumulative, routes[slot]), len(cumulative) - 1)]
+        return path
+
+    def service_time(self, stage, severity, u, weekend_factor):
+        """Tiempo de servicio de una etapa a partir de una uniforme (0, 1)"""
+        if self.exponential[stage]:
+            u = -math.log(max(1.0 - u, 5e-324))
+        return (self.offset[stage][severity] + self.width[stage][severity] * u) * weekend_factor
+
+    def transition_probabilities(self, stage, severity):
+        """Probabilidad de cada etapa siguiente (en el orden de `successors`)"""
+        cumulative = self.cumulative[stage]
+        if cumulative is None:
+            return [1.0]
+        values = cumulative[severity]
+        return [value - (values[i - 1] if i else 0.0) for i, value in enumerate(values)]
+
+    def visit_probabilities(self, severity):
+        """Probabilidad de que un paciente de la severidad pase por cada etapa"""
+        visits = [0.0] * (self.discharge + 1)
+        visits[0] = 1.0
+        for stage in range(self.discharge):
+            for target, probability in zip(self.successors[stage], self.transition_probabilities(stage, severity)):
+                visits[target] += visits[stage] * probability
+        return visits[:self.discharge]
+
+
+def load_pathway(spec):
+    """Especificación de un recorrido: diccionario, ruta de un archivo JSON o None (el del modelo)"""
+    if spec is None:
+        return DEFAULT_PATHWAY
+    if isinstance(spec, str):
+        with open(spec, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return spec
+
+
+def compile_pathway(spec=None, severities=5):
+    """Compila un recorrido (el del modelo se compila una sola vez por número de severidades)"""
+    if spec is None:
+        compiled = _compiled_defaults.get(severities)
+        if compiled is None:
+            compiled = _compiled_defaults[severities] = CompiledPathway(DEFAULT_PATHWAY, severities)
+        return compiled
+    return CompiledPathway(load_pathway(spec), severities)
+
+
+def pathway_from_config(config):
+    """Recorrido compilado de una configuración ('pathway' y número de 'severity_weights')"""
+    severities = len(config.get('severity_weights', [0.1, 0.25, 0.35, 0.2, 0.1]))
+    return compile_pathway(config.get('pathway'), severities)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Aproximación analítica de la sala como red de colas
+
+Estima sin simular la utilización de cada recurso y la espera por etapa y
+severidad. La red se descompone por estaciones: cada recurso es una cola
+M/G/c con prioridad no expropiativa por severidad, que recibe las llegadas
+de cada severidad (tasa media de λ(t) por la probabilidad de visitar cada
+etapa del recorrido compilado de pathways). Un recurso que atiende varias
+etapas (los doctores: primera consulta y segunda) suma sus cargas.
+
+Para cada estación con c servidores, carga a = λ E[S] y ρ = a / c:
+
+    W_k = C(c, a) E[S] (1 + cs²) / (2c) / ((1 - σ_{k-1}) (1 - σ_k))
+
+donde C es la probabilidad de espera de Erlang C, cs² el coeficiente de
+variación al cuadrado del servicio y σ_k la utilización acumulada de las
+severidades 1..k. Si σ_k >= 1 la severidad k no es estable en esa estación
+(su cola crece sin límite) y su espera es infinita. El p90 supone que la
+espera condicionada a esperar es exponencial.
+
+Las estaciones saturadas solo dejan pasar lo que atienden (primero a los
+más graves), de modo que las estaciones siguientes reciben ese flujo; las
+tasas se ajustan por punto fijo.
+
+Es una aproximación para descartar configuraciones rápidamente (del orden de un
+milisegundo por configuración); la simulación sigue siendo la referencia.
+"""
+
+import math
+
+from arrivals import WEEK_HOURS, arrival_process_from_config
+from pathways import pathway_from_config
+
+WEEKEND_START = 120  # Sábado 0:00 (horas desde el lunes)
+MAX_ITERATIONS = 50
+
+
+def erlang_c(servers, load):
+    """Probabilidad de esperar en una cola M/M/c (1 si la carga no es menor que c)"""
+    if servers <= 0 or load >= servers:
+        return 1.0
+    blocking = 1.0  # Erlang B por recurrencia
+    for n in range(1, servers + 1):
+        blocking = load * blocking / (n + load * blocking)
+    return blocking / (1 - load / servers * (1 - blocking))
+
+
+def weekend_share(process, horizon):
+    """Fracción de las llegadas esperadas en [0, horizon) que ocurren en fin de semana"""
+    total = process.cumulative(horizon)
+    if total <= 0:
+        return 0.0
+    weekend = 0.0
+    for week in range(int(horizon // WEEK_HOURS) + 1):
+        start = week * WEEK_HOURS
+        weekend += (process.cumulative(min(horizon, start + WEEK_HOURS))
+                    - process.cumulative(min(horizon, start + WEEKEND_START)))
+    return weekend / total
+
+
+def _service_moments(pathway, stage, severity, weekend_moments):
+    """Media y segundo momento del servicio de una etapa para una severidad"""
+    a = pathway.offset[stage][severity]
+    b = pathway.width[stage][severity]
+    first, second = weekend_moments
+    if pathway.exponential[stage]:  # a + b E con E exponencial estándar
+        return (a + b) * first, (a * a + 2 * a * b + 2 * b * b) * second
+    # a + b U con U uniforme (0, 1)
+    return (a + b / 2) * first, (a * a + a * b + b * b / 3) * second
+
+
+def _station_loads(pathway, class_rates, reach, moments):
+    """Tasa, carga y segundo momento del servicio por estación y severidad"""
+    stations = {name: {k: [0.0, 0.0, 0.0] for k in class_rates} for name in pathway.capacities}
+    for index, resource in enumerate(pathway.resources):
+        for k, class_rate in class_rates.items():
+            mean, square = moments[index, k]
+            rate = class_rate * reach[k][index]
+            entry = stations[resource][k]
+            entry[0] += rate
+            entry[1] += rate * mean
+            entry[2] += rate * square
+    return stations
+
+
+def _served_fractions(classes, servers):
+    """Fracción de cada severidad que la estación alcanza a atender (prioridad a la más grave)"""
+    fractions = {}
+    remaining = float(servers)
+    for k, (_, load, _) in sorted(classes.items()):
+        fractions[k] = 1.0 if load <= max(0.0, remaining) else max(0.0, remaining) / load
+        remaining -= load
+    return fractions
+
+
+def predict(config, sim_time=None):
+    """Utilización por recurso y esperas por etapa y severidad estimadas analíticamente
+
+    `sim_time` define el horizonte para la tasa media de llegadas (por
+    defecto una semana). Los resultados usan las claves de
+    EmergencyStats.summarize donde corresponde ('resource_utilization',
+    'wait_time_by_stage', 'severity_statistics', 'average_time_in_system').
+    """
+    pathway = pathway_from_config(config)
+    horizon = sim_time or WEEK_HOURS
+    process = arrival_process_from_config(config)
+    arrival_rate = process.cumulative(horizon) / horizon
+    share = weekend_share(process, horizon)
+    factor = pathway.weekend_factor
+    weekend_moments = (1 + (factor - 1) * share, 1 + (factor ** 2 - 1) * share)
+
+    weights = config.get('severity_weights', [0.1, 0.25, 0.35, 0.2, 0.1])
+    total_weight = sum(weights)
+    severities = range(1, len(weights) + 1)
+    class_rates = {k: arrival_rate * weights[k - 1] / total_weight for k in severities}
+
+    # Probabilidad de visitar cada etapa por severidad
+    visits = {k: pathway.visit_probabilities(k) for k in severities}
+    stages = range(pathway.discharge)
+    moments = {(index, k): _service_moments(pathway, index, k, weekend_moments)
+               for index in stages for k in severities}
+
+    # Fracción de las llegadas de cada severidad que alcanza cada etapa: una estación saturada
+    # solo deja pasar lo que atiende, así que las estaciones siguientes reciben menos pacientes
+    reach = visits
+    for _ in range(MAX_ITERATIONS):
+        stations = _station_loads(pathway, class_rates, reach, moments)
+        served = {name: _served_fractions(classes, config.get(*pathway.capacities[name]))
+                  for name, classes in stations.items()}
+        updated = {}
+        for k in severities:
+            # Flujo por el grafo en orden topológico con la salida de cada etapa limitada por su estación
+            fractions = [0.0] * (pathway.discharge + 1)
+            fractions[0] = 1.0
+            for index in stages:
+                passed = fractions[index] * served[pathway.resources[index]][k]
+                for target, probability in zip(pathway.successors[index],
+                                               pathway.transition_probabilities(index, k)):
+                    fractions[target] += passed * probability
+            updated[k] = fractions[:pathway.discharge]
+        converged = all(abs(a - b) < 1e-6 for k in severities for a, b in zip(reach[k], updated[k]))
+        reach = updated
+        if converged:
+            break
+
+    utilization = {}
+    station_waits = {}
+    unstable_severities = set()
+    for name, classes in stations.items():
+        key, default = pathway.capacities[name]
+        servers = config.get(key, default)
+        rate = sum(entry[0] for entry in classes.values())
+        load = sum(entry[1] for entry in classes.values())
+        mean = load / rate if rate > 0 else 0.0
+        square = sum(entry[2] for entry in classes.values()) / rate if rate > 0 else 0.0
+        scv = square / (mean * mean) - 1 if mean > 0 else 0.0
+        rho = load / servers if servers > 0 else math.inf
+        waiting = erlang_c(servers, load)
+        base_wait = waiting * mean * (1 + scv) / (2 * servers) if servers > 0 else math.inf
+
+        waits = {}
+        cumulative = 0.0
+        for k in severities:
+            previous = cumulative
+            cumulative += classes[k][1] / servers if servers > 0 else math.inf
+            if cumulative < 1:
+                waits[k] = base_wait / ((1 - previous) * (1 - cumulative))
+            else:
+                waits[k] = math.inf
+                if classes[k][0] > 0:
+                    unstable_severities.add(k)
+        station_waits[name] = (waits, waiting)
+        carried = sum(entry[1] * served[name][k] for k, entry in classes.items())
+        utilization[name] = {
+            'capacity': servers,
+            'offered_utilization': rho,
+            'utilization': carried / servers if servers > 0 else 0.0,
+            'probability_wait': waiting,
+            'stable': rho < 1,
+            # Pacientes por hora que se acumulan en la cola si la estación está saturada
+            'backlog_growth': max(0.0, rate - servers / mean) if mean > 0 else 0.0
+        }
+
+    wait_time_by_stage = {}
+    severity_statistics = {}
+    for k in severities:
+        # Registro: exponencial con la media del recorrido por el factor de fin de semana
+        registration = pathway.registration_mean[k] * weekend_moments[0]
+        wait_time_by_stage.setdefault('registro', {})[str(k)] = {'mean': registration,
+                                                                  'p90': registration * math.log(10)}
+        total = registration
+        for index in stages:
+            if visits[k][index] <= 0:
+                continue
+            waits, waiting = station_waits[pathway.resources[index]]
+            wait = waits[k]
+            if math.isinf(wait):
+                p90 = math.inf
+            elif waiting > 0.1:
+                p90 = wait / waiting * math.log(waiting / 0.1)
+            else:
+                p90 = 0.0
+            wait_time_by_stage.setdefault(pathway.names[index], {})[str(k)] = {'mean': wait, 'p90': p90}
+            total += visits[k][index] * (wait + moments[index, k][0])
+        severity_statistics[str(k)] = {'mean': total}
+
+    average = sum(class_rates[k] * severity_statistics[str(k)]['mean'] for k in severities) / arrival_rate \
+        if arrival_rate > 0 else 0.0
+    return {
+        'arrival_rate': arrival_rate,
+        'stable': all(summary['stable'] for summary in utilization.values()),
+        'unstable_severities': sorted(unstable_severities),
+        'max_utilization': max(summary['offered_utilization'] for summary in utilization.values()),
+        'average_time_in_system': average,
+        'severity_statistics': severity_statistics,
+        'wait_time_by_stage': wait_time_by_stage,
+        'resource_utilization': utilization
+    }
+
+
+def screen(configurations, sim_time=None):
+    """Predicción analítica de cada configuración {nombre: configuración}"""
+    return {name: predict(config, sim_time) for name, config in configurations.items()}
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caché en disco de resultados de run_simulation
+
+La clave es un hash SHA-256 de la configuración en forma canónica (JSON con
+claves ordenadas), el horizonte, la semilla, el motor y la versión del
+modelo. Si la configuración apunta a archivos (perfil de llegadas o
+recorrido en JSON), el hash de su contenido también forma parte de la clave.
+Las corridas con informe guardan además sus agregados (report=True), con
+los que el informe se vuelve a dibujar sin simular. Cada resultado se
+guarda en su propio archivo JSON escrito de forma atómica (archivo temporal
++ os.replace), así que varios procesos del pool pueden compartir el mismo
+directorio. Cuando el directorio supera
+`max_bytes` se eliminan los archivos usados hace más tiempo (LRU por fecha de
+modificación, que se actualiza en cada lectura). Para no recorrer el
+directorio en cada escritura, cada proceso lleva una estimación del tamaño
+por directorio y solo hace el recorrido completo al superar el límite o
+cada RESCAN_INTERVAL escrituras (otros procesos también escriben).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+# Claves de la configuración que no cambian los resultados de la simulación
+IGNORED_KEYS = ('trace_level', 'trace_file', 'cache_dir', 'sim_time', 'report_workers',
+                'report_buckets', 'report_points', 'profile_prefix')
+
+# Claves de la configuración cuyo valor puede ser la ruta de un archivo de entrada
+FILE_KEYS = ('arrival_profile', 'pathway')
+
+DEFAULT_CACHE_DIR = os.path.join("resultados", "cache")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+RESCAN_INTERVAL = 256
+EVICT_TARGET = 0.9  # fracción de max_bytes que queda tras una eliminación
+
+# Directorio -> [tamaño estimado en bytes, escrituras desde el último recorrido] (por proceso)
+_size_estimates = {}
+
+
+def file_digest(path):
+    """Hash SHA-256 del contenido de un archivo, o None si no existe"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def cache_key(config, sim_time, engine='simpy', model_version=None, report=False):
+    """Hash canónico de (configuración, horizonte, semilla, motor, versión del modelo)
+
+    Con report=True es la clave de los agregados del informe, que además
+    dependen de la resolución de las series de utilización.
+    """
+    if model_version is None:
+        from emergency_simulation import MODEL_VERSION
+        model_version = MODEL_VERSION
+
+    payload = {
+        'config': {key: value for key, value in config.items() if key not in IGNORED_KEYS},
+        'sim_time': sim_time,
+        'random_seed': config.get('random_seed', 42),
+        'engine': engine,
+        'model_version': model_version,
+        'files': {key: file_digest(config[key]) for key in FILE_KEYS if isinstance(config.get(key), str)}
+    }
+    if report:
+        payload['report'] = [config.get('report_buckets'), config.get('report_points')]
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Caché de resultados en un directorio con límite de tamaño"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _estimate(self):
+        """Estimación compartida (en este proceso) del tamaño del directorio"""
+        key = os.path.abspath(self.directory)
+        estimate = _size_estimates.get(key)
+        if estimate is None:
+            estimate = _size_estimates[key] = [self.size(), 0]
+        return estimate
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """Devuelve los resultados guardados o None si no existen"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                results = json.load(f)
+            os.utime(path)  # Marcar como usado recientemente
+            return results
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key, results):
+        """Guarda los resultados de forma atómica y aplica el límite de tamaño"""
+        estimate = self._estimate()
+        path = self._path(key)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(results, f)
+            written = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        estimate[0] += written - previous
+        estimate[1] += 1
+        if estimate[0] > self.max_bytes or estimate[1] >= RESCAN_INTERVAL:
+            self.evict()
+
+    def lookup(self, config, sim_time, engine='simpy', report=False):
+        return self.get(cache_key(config, sim_time, engine, report=report))
+
+    def store(self, config, sim_time, engine, results, report=False):
+        self.put(cache_key(config, sim_time, engine, report=report), results)
+
+    def invalidate(self, key):
+        """Elimina una entrada por su clave; devuelve True si existía"""
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        estimate = _size_estimates.get(os.path.abspath(self.directory))
+        if estimate is not None:
+            estimate[0] = max(0, estimate[0] - size)
+        return True
+
+    def invalidate_config(self, config, sim_time, engine='simpy'):
+        """Elimina la entrada de una configuración específica"""
+        return self.invalidate(cache_key(config, sim_time, engine))
+
+    def clear(self):
+        """Elimina todas las entradas"""
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        _size_estimates[os.path.abspath(self.directory)] = [0, 0]
+
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith('.json')]
+
+    def size(self):
+        """Tamaño total de las entradas en bytes"""
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def evict(self):
+        """Si se supera max_bytes, elimina las entradas menos usadas hasta EVICT_TARGET (recorre el directorio)"""
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= target:
+                    break
+        _size_estimates[os.path.abspath(self.directory)] = [total, 0]
@@ -8,35 +8,64 @@ con diferentes configuraciones y generar un informe comparativo.
 
 import os
 import json
-import subprocess
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from adaptive_replications import adaptive_replications
+from parallel_runner import run_replications, summarize_replications
+from variance_reduction import paired_difference
+
+def run_configurations(configurations, replications=1, max_workers=None, targets=None, relative=False):
+    """Ejecuta todas las configuraciones en paralelo y guarda sus resultados
+
+    Con `targets` ({indicador: semiancho máximo}) el número de réplicas de cada
+    configuración es adaptativo: se agregan réplicas por oleadas hasta
+    alcanzar la precisión pedida (ver adaptive_replications).
+    """
+    if targets:
+        print(f"Ejecutando {len(configurations)} configuraciones con réplicas adaptativas...")
+        adaptive = adaptive_replications(configurations, targets, relative=relative,
+                                         initial_replications=max(2, replications), max_workers=max_workers)
+        replica_results = {name: outcome['replications'] for name, outcome in adaptive.items()}
+    else:
+        print(f"Ejecutando {len(configurations)} configuraciones con {replications} réplicas cada una...")
+        replica_results = run_replications(configurations, replications=replications, max_workers=max_workers)
 
-def run_simulation_with_config(config_name, config):
-    """Ejecuta la simulación con una configuración específica"""
-    # Guardar configuración en un archivo temporal
-    with open(f"config_{config_name}.json", 'w') as f:
-        json.dump(config, f)
-
-    # Ejecutar la simulación con esta configuración
-    print(f"Ejecutando simulación con configuración: {config_name}")
-    subprocess.run(["python", "emergency_simulation.py", f"config_{config_name}.json"])
-
-    # Cargar resultados
-    try:
-        with open(f"resultados/emergency_simulation_results.json", 'r') as f:
-            results = json.load(f)
-
-        # Renombrar archivos para no sobreescribirlos
-        for file in os.listdir("resultados"):
-            if file.startswith("emergency_simulation"):
-                os.rename(f"resultados/{file}", f"resultados/{config_name}_{file}")
+    results = {}
+    for config_name, replicas in replica_results.items():
+        summary = summarize_replications(replicas)
+        if not summary:
+            # Ninguna réplica terminó con datos: se marca el error para que el informe la omita
+            results[config_name] = {'error': "Ninguna réplica tiene datos suficientes",
+                                    'replications': len(replicas)}
+            print(f"- {config_name}: ninguna réplica tiene datos suficientes")
+        else:
+            results[config_name] = summary
+        if targets and summary:
+            outcome = adaptive[config_name]
+            results[config_name]['precision'] = {'converged': outcome['converged'], 'intervals': outcome['intervals']}
+            status = "alcanzada" if outcome['converged'] else "NO alcanzada"
+            print(f"- {config_name}: {len(replicas)} réplicas, precisión {status}")
+
+        # Cada configuración escribe su propio archivo, sin renombrar resultados compartidos
+        try:
+            with open(f"resultados/{config_name}_emergency_simulation_results.json", 'w') as f:
+                json.dump({"summary": results[config_name], "replications": replicas}, f, indent=4)
+        except Exception as e:
+            print(f"Error al guardar resultados de {config_name}: {e}")
+
+    # Diferencias contra la primera configuración con números aleatorios comunes
+    # (la réplica i de cada configuración usa la misma semilla y ve los mismos pacientes)
+    reference = next(iter(replica_results), None)
+    for config_name, replicas in replica_results.items():
+        if config_name == reference or 'error' in results[config_name] or 'error' in results[reference]:
+            continue
+        difference = paired_difference(replica_results[reference], replicas, 'average_time_in_system')
+        results[config_name]['difference_vs_reference'] = {'reference': reference, **difference}
+        if difference['half_width'] is not None:
+            print(f"- {config_name} - {reference}: {difference['mean']:+.2f} ± {difference['half_width']:.2f} min")
 
-        return results
-    except Exception as e:
-        print(f"Error al cargar resultados: {e}")
-        return {}
+    return results
 
 def generate_comparison_report(results_dict):
     """Genera un informe comparativo de las diferentes configuraciones"""
@@ -44,12 +73,14 @@ def generate_comparison_report(results_dict):
     comparison_data = []
 
     for config_name, results in results_dict.items():
-        if not results:
+        if not results or 'error' in results:
             continue
 
         comparison_data.append({
             'Configuración': config_name,
             'Tiempo Promedio (min)': results.get('average_time_in_system', 0),
+            'IC 95% (±min)': results.get('average_time_in_system_half_width', 0),
+            'Réplicas': results.get('replications', 1),
             'Pacientes Atendidos': results.get('total_patients', 0),
             'Doctores': results.get('simulation_parameters', {}).get('num_doctors', 0),
             'Enfermeras': results.get('simulation_parameters', {}).get('num_nurses', 0),
@@ -69,7 +100,10 @@ def generate_comparison_report(results_dict):
 
     # Generar gráfica comparativa
     plt.figure(figsize=(12, 8))
-    sns.barplot(x='Configuración', y='Tiempo Promedio (min)', data=df)
+    ax = sns.barplot(x='Configuración', y='Tiempo Promedio (min)', data=df)
+    # Barras de error: intervalo de confianza del 95% de la media entre réplicas
+    ax.errorbar(range(len(df)), df['Tiempo Promedio (min)'], yerr=df['IC 95% (±min)'].replace(float('inf'), 0).fillna(0),
+                fmt='none', ecolor='black', capsize=5)
     plt.title('Comparación de Tiempo Promedio por Configuración')
     plt.xlabel('Configuración')
     plt.ylabel('Tiempo Promedio (minutos)')
@@ -84,7 +118,8 @@ def generate_comparison_report(results_dict):
 
         f.write("Resumen de tiempos de atención:\n")
         for _, row in df.iterrows():
-            f.write(f"- {row['Configuración']}: {row['Tiempo Promedio (min)']:.2f} minutos con {row['Pacientes Atendidos']} pacientes\n")
+            f.write(f"- {row['Configuración']}: {row['Tiempo Promedio (min)']:.2f} ± {row['IC 95% (±min)']:.2f} minutos "
+                    f"({row['Réplicas']} réplicas) con {row['Pacientes Atendidos']:.0f} pacientes\n")
 
         f.write("\nDetalle de recursos por configuración:\n")
         for _, row in df.iterrows():
@@ -133,12 +168,10 @@ if __name__ == "__main__":
         "mas_recursos_diagnóstico": {**base_config, "num_xray": 3, "num_labs": 3}
     }
 
-    # Ejecutar simulaciones
-    results = {}
-
-    for name, config in configurations.items():
-        result = run_simulation_with_config(name, config)
-        results[name] = result
+    # Ejecutar simulaciones (réplicas independientes en un pool de procesos, hasta que el
+    # tiempo promedio en el sistema tenga un intervalo de confianza de ±5%)
+    results = run_configurations(configurations, replications=5,
+                                 targets={'average_time_in_system': 0.05}, relative=True)
 
     # Generar informe comparativo
     generate_comparison_report(results)
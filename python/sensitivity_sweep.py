@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Barrido de sensibilidad sobre el espacio de parámetros
+
+Construye diseños factoriales completos o de hipercubo latino sobre los cinco
+recursos, 'arrival_interval' y 'severity_weights', ejecuta cada punto con
+varias réplicas en el pool de parallel_runner y guarda una sola tabla
+consolidada (Parquet si pyarrow está disponible, CSV en otro caso).
+
+Formato de los rangos de parámetros:
+- lista: valores candidatos (por ejemplo [2, 3, 4] o varias listas de pesos)
+- tupla (mínimo, máximo): rango continuo, solo para hipercubo latino; si
+  ambos extremos son enteros se redondea el valor muestreado
+
+Con un umbral de utilización, los puntos que la aproximación analítica
+(queueing_surrogate) predice saturados se descartan antes de simular.
+"""
+
+import argparse
+import itertools
+import os
+import random
+
+from emergency_simulation import economic_summary
+from parallel_runner import run_replications
+from queueing_surrogate import predict
+
+RESOURCE_PARAMETERS = ('num_triage_nurses', 'num_doctors', 'num_nurses', 'num_xray', 'num_labs')
+RESOURCE_NAMES = ('triage_nurses', 'doctors', 'nurses', 'xray', 'lab')
+
+BASE_CONFIG = {
+    'num_triage_nurses': 2,
+    'num_doctors': 3,
+    'num_nurses': 5,
+    'num_xray': 2,
+    'num_labs': 2,
+    'arrival_interval': 10,
+    'day_factors': [0.8, 0.8, 0.9, 0.9, 1.0, 1.5, 1.2],
+    'hour_factors': [0.5, 0.3, 0.7, 1.3, 1.5, 1.0],
+    'severity_weights': [0.1, 0.25, 0.35, 0.2, 0.1],
+    'nurse_salary_monthly': 1500,
+    'doctor_salary_monthly': 4500,
+    'xray_machine_cost': 120000,
+    'lab_equipment_cost': 75000,
+    'random_seed': 42
+}
+
+# Rangos por defecto del barrido
+DEFAULT_RANGES = {
+    'num_triage_nurses': [1, 2, 3],
+    'num_doctors': [2, 3, 4, 5],
+    'num_nurses': [3, 5, 7],
+    'num_xray': [1, 2, 3],
+    'num_labs': [1, 2, 3],
+    'arrival_interval': (8, 20),
+    'severity_weights': [
+        [0.1, 0.25, 0.35, 0.2, 0.1],
+        [0.2, 0.3, 0.3, 0.1, 0.1],
+        [0.05, 0.15, 0.3, 0.3, 0.2]
+    ]
+}
+
+
+def full_factorial(parameter_ranges):
+    """Todas las combinaciones de los valores candidatos de cada parámetro"""
+    names = list(parameter_ranges)
+    for name in names:
+        if isinstance(parameter_ranges[name], tuple):
+            raise ValueError(f"El diseño factorial requiere una lista de valores para '{name}'")
+    return [dict(zip(names, values)) for values in itertools.product(*(parameter_ranges[n] for n in names))]
+
+
+def latin_hypercube(parameter_ranges, samples, seed=None):
+    """Diseño de hipercubo latino con `samples` puntos
+
+    Cada parámetro se divide en `samples` estratos equiprobables y cada
+    estrato se usa exactamente una vez, en un orden aleatorio por parámetro.
+    """
+    rng = random.Random(seed)
+    design = [{} for _ in range(samples)]
+    for name, spec in parameter_ranges.items():
+        strata = list(range(samples))
+        rng.shuffle(strata)
+        for point, stratum in zip(design, strata):
+            u = (stratum + rng.random()) / samples
+            if isinstance(spec, tuple):
+                low, high = spec
+                value = low + (high - low) * u
+                if isinstance(low, int) and isinstance(high, int):
+                    value = min(high, int(round(value)))
+            else:
+                value = spec[min(int(u * len(spec)), len(spec) - 1)]
+            point[name] = value
+    return design
+
+
+def flatten_results(results):
+    """Indicadores de una réplica como una fila plana de la tabla"""
+    if not results or 'average_time_in_system' not in results:
+        return {'total_patients': results.get('total_patients', 0) if results else 0}
+
+    params = results.get('simulation_parameters', {})
+    row = {
+        'average_time_in_system': results['average_time_in_system'],
+        'median_time_in_system': results['median_time_in_system'],
+        'p90_time_in_system': results.get('p90_time_in_system'),
+        'total_patients': results['total_patients']
+    }
+    estimate = (results.get('steady_state_time_in_system') or {}).get('estimate')
+    if estimate:
+        row['steady_state_time_in_system'] = estimate['mean']
+        row['steady_state_half_width'] = estimate['half_width']
+    for severity, stats in results.get('severity_statistics', {}).items():
+        row[f'severity_{severity}_mean_time'] = stats['mean']
+        row[f'severity_{severity}_p90_time'] = stats['p90']
+    for resource in RESOURCE_NAMES:
+        summary = results.get('resource_utilization', {}).get(resource)
+        if summary:
+            row[f'{resource}_utilization'] = summary['utilization']
+            row[f'{resource}_avg_queue'] = summary['average_queue_length']
+    row.update(economic_summary(params, results['total_patients']))
+    return row
+
+
+def prune_design(design, base_config=None, sim_time=168, max_utilization=1.0):
+    """Puntos del diseño cuya utilización máxima predicha no supera `max_utilization`"""
+    base_config = dict(base_config or BASE_CONFIG)
+    return [point for point in design
+            if predict({**base_config, **point}, sim_time)['max_utilization'] <= max_utilization]
+
+
+def run_sweep(design, base_config=None, replications=1, sim_time=168, max_workers=None, engine='simpy',
+              cache_dir=None, max_utilization=None):
+    """Ejecuta todos los puntos del diseño y devuelve una fila por réplica
+
+    Con `cache_dir` cada réplica se busca primero en la caché de resultados
+    (result_cache), de modo que repetir un barrido no vuelve a simular.
+    engine='batch' evalúa todas las réplicas en lotes vectorizados
+    (batch_engine) para una exploración rápida, sin caché. Con
+    `max_utilization` solo se simulan los puntos que pasan prune_design.
+    """
+    base_config = dict(base_config or BASE_CONFIG)
+    if max_utilization is not None:
+        design = prune_design(design, base_config, sim_time, max_utilization)
+    if cache_dir:
+        base_config['cache_dir'] = cache_dir
+    configurations = {f"punto_{i:05d}": {**base_config, **point} for i, point in enumerate(design)}
+    if engine == 'batch':
+        from batch_engine import run_batch
+        replica_results = run_batch(configurations, replications, sim_time=sim_time)
+    else:
+        replica_results = run_replications(configurations, replications=replications, sim_time=sim_time,
+                                           max_workers=max_workers, engine=engine)
+
+    rows = []
+    for (name, replicas), point in zip(replica_results.items(), design):
+        for replication, results in enumerate(replicas):
+            row = {'configuration': name, 'replication': replication}
+            for key, value in point.items():
+                # Las listas (pesos de severidad) se guardan como texto
+                row[key] = value if not isinstance(value, list) else ','.join(str(v) for v in value)
+            row['random_seed'] = results.get('simulation_parameters', {}).get('random_seed') if results else None
+            row.update(flatten_results(results))
+            rows.append(row)
+    return rows
+
+
+def write_table(rows, path):
+    """Guarda la tabla consolidada en Parquet (si es posible) o CSV"""
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    if path.endswith('.parquet'):
+        try:
+            df.to_parquet(path, index=False)
+            return path
+        except ImportError:
+            path = path[:-len('.parquet')] + '.csv'
+            print(f"pyarrow no está disponible; se guarda en CSV: {path}")
+    df.to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido de sensibilidad de la sala de emergencias")
+    parser.add_argument('--design', choices=['factorial', 'lhs'], default='lhs')
+    parser.add_argument('--samples', type=int, default=100, help="Puntos del hipercubo latino")
+    parser.add_argument('--replications', type=int, default=3)
+    parser.add_argument('--sim-time', type=float, default=168)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--engine', choices=['simpy', 'fast', 'batch'], default='fast')
+    parser.add_argument('--seed', type=int, default=42, help="Semilla del diseño")
+    parser.add_argument('--output', default=os.path.join("resultados", "barrido_sensibilidad.parquet"))
+    parser.add_argument('--cache-dir', default=os.path.join("resultados", "cache"),
+                        help="Directorio de la caché de resultados ('' para desactivarla)")
+    parser.add_argument('--max-utilization', type=float, default=None,
+                        help="Descarta sin simular los puntos con utilización predicha mayor (por ejemplo 1)")
+    args = parser.parse_args()
+
+    if not os.path.exists("resultados"):
+        os.makedirs("resultados")
+
+    if args.design == 'factorial':
+        ranges = {name: (list(range(spec[0], spec[1] + 1, 2)) if isinstance(spec, tuple) else spec)
+                  for name, spec in DEFAULT_RANGES.items()}
+        design = full_factorial(ranges)
+    else:
+        design = latin_hypercube(DEFAULT_RANGES, args.samples, seed=args.seed)
+
+    if args.max_utilization is not None:
+        total = len(design)
+        design = prune_design(design, sim_time=args.sim_time, max_utilization=args.max_utilization)
+        print(f"Aproximación analítica: se descartan {total - len(design)} de {total} configuraciones")
+
+    print(f"Ejecutando {len(design)} configuraciones con {args.replications} réplicas cada una...")
+    rows = run_sweep(design, replications=args.replications, sim_time=args.sim_time,
+                     max_workers=args.workers, engine=args.engine, cache_dir=args.cache_dir)
+    output = write_table(rows, args.output)
+    print(f"Resultados del barrido guardados en: {output}")
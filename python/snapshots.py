@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Puntos de control y bifurcación de corridas en curso
+
+Una instantánea guarda el estado completo de un FastEmergencyRoom: reloj,
+calendario de eventos, pacientes en curso con su etapa, colas de cada
+recurso, estado de los flujos de números aleatorios y estadísticas
+acumuladas. Se serializa con pickle comprimido con zlib.
+
+Una corrida puede pausarse y reanudarse (el resultado es idéntico al de la
+corrida continua) o bifurcarse en variantes "qué pasa si" que cambian la
+capacidad de los recursos desde el instante de la instantánea; el prefijo
+común se simula una sola vez y las variantes corren en paralelo.
+
+Solo el motor rápido admite instantáneas: los procesos de SimPy son
+generadores de Python y no se pueden serializar.
+"""
+
+import os
+import pickle
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from event_trace import DEFAULT_TRACE_LEVEL, EventTracer
+
+SNAPSHOT_FORMAT = 1
+
+
+def dumps(er):
+    """Instantánea comprimida (bytes) de un FastEmergencyRoom"""
+    from emergency_simulation import MODEL_VERSION
+
+    payload = pickle.dumps((SNAPSHOT_FORMAT, MODEL_VERSION, er), protocol=pickle.HIGHEST_PROTOCOL)
+    return zlib.compress(payload)
+
+
+def loads(data, tracer=None):
+    """Reconstruye un FastEmergencyRoom desde una instantánea
+
+    Las trazas no forman parte de la instantánea: se usa `tracer` o uno nuevo
+    con el 'trace_level' de la configuración (las trazas a archivo no se reabren).
+    """
+    from emergency_simulation import MODEL_VERSION
+
+    snapshot_format, model_version, er = pickle.loads(zlib.decompress(data))
+    if snapshot_format != SNAPSHOT_FORMAT or model_version != MODEL_VERSION:
+        raise ValueError(f"Instantánea incompatible (formato {snapshot_format}, modelo {model_version})")
+    if tracer is not None:
+        er.trace = tracer
+    return er
+
+
+def save_snapshot(er, path):
+    """Guarda la instantánea en un archivo (escritura atómica)"""
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    temporary = f"{path}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(dumps(er))
+    os.replace(temporary, path)
+
+
+def load_snapshot(path, tracer=None):
+    with open(path, 'rb') as f:
+        return loads(f.read(), tracer)
+
+
+def run_until(config, until, tracer=None):
+    """Simula con el motor rápido hasta `until` y devuelve el modelo sin finalizar"""
+    from fast_engine import FastEmergencyRoom
+
+    er = FastEmergencyRoom(config, tracer)
+    er.run(until)
+    return er
+
+
+def capacity_parameters(er):
+    """Recurso de cada parámetro de capacidad, según el recorrido de la corrida"""
+    return {parameter: name for name, (parameter, _) in er.pathway.capacities.items()}
+
+
+def apply_overrides(er, overrides):
+    """Aplica cambios de capacidad ({'num_doctors': 4, ...}) en el instante actual"""
+    parameters = capacity_parameters(er)
+    for key, capacity in overrides.items():
+        if key not in parameters:
+            raise ValueError(f"Solo se pueden cambiar capacidades de recursos, no '{key}'")
+        er.set_capacity(parameters[key], capacity)
+    er.config = {**er.config, **overrides}
+    if overrides:
+        er.config['fork_time'] = er.now
+
+
+def continue_run(er, until):
+    """Continúa la corrida hasta `until` y devuelve el diccionario de resultados"""
+    er.run(until)
+    er.finalize()
+    er.trace.close()
+    config = er.config
+    config['sim_time'] = until
+    return er.stats.summarize(config)
+
+
+def _run_fork(task):
+    """Carga la instantánea, aplica la variante y la simula (se ejecuta en el pool)"""
+    name, data, overrides, until = task
+    er = loads(data)
+    # Las variantes en lote no imprimen trazas salvo que se pidan
+    er.trace = EventTracer(er.config.get('trace_level', DEFAULT_TRACE_LEVEL))
+    apply_overrides(er, overrides)
+    return name, continue_run(er, until)
+
+
+def fork(snapshot, variants, until, max_workers=None):
+    """Continúa una instantánea con cada variante hasta `until`
+
+    `snapshot` son los bytes de dumps, la ruta de un archivo o un
+    FastEmergencyRoom en curso (que no se modifica). `variants` es
+    {nombre: cambios de capacidad}; un diccionario vacío continúa la corrida
+    sin cambios. Devuelve {nombre: resultados}.
+    """
+    if isinstance(snapshot, str):
+        with open(snapshot, 'rb') as f:
+            snapshot = f.read()
+    elif not isinstance(snapshot, bytes):
+        snapshot = dumps(snapshot)
+
+    tasks = [(name, snapshot, overrides, until) for name, overrides in variants.items()]
+    if max_workers == 1:
+        # Ejecución en el mismo proceso (útil para depurar)
+        return dict(_run_fork(task) for task in tasks)
+
+    workers = max_workers or max(1, min(len(tasks), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(_run_fork, tasks))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Optimización de la mezcla de recursos bajo restricciones de espera
+
+Busca la combinación de recursos (enfermeras de triage, doctores,
+enfermeras, rayos X y laboratorios) de menor costo mensual que cumple metas
+de espera por etapa y severidad, por ejemplo "p90 de espera por el doctor
+para severidad 1 menor a 10 minutos".
+
+Se usa successive halving: todos los candidatos empiezan con pocas réplicas,
+en cada ronda se descarta la peor fracción y los sobrevivientes reciben el
+doble de réplicas. Las réplicas ya simuladas se guardan en caché y se
+reutilizan en las rondas siguientes. La réplica i de todos los candidatos usa
+la misma semilla, de modo que se comparan con los mismos pacientes.
+
+Opcionalmente, antes de simular se descartan los candidatos que la
+aproximación analítica (queueing_surrogate) predice muy lejos de las metas.
+"""
+
+import argparse
+import itertools
+import math
+import os
+
+from emergency_simulation import monthly_costs
+from parallel_runner import make_task, run_tasks
+from queueing_surrogate import predict
+from sensitivity_sweep import BASE_CONFIG, RESOURCE_PARAMETERS
+
+
+def resource_grid(bounds):
+    """Todas las combinaciones enteras dentro de {parámetro: (mínimo, máximo)}"""
+    names = list(bounds)
+    ranges = [range(bounds[name][0], bounds[name][1] + 1) for name in names]
+    return [dict(zip(names, values)) for values in itertools.product(*ranges)]
+
+
+def candidate_key(candidate):
+    """Clave inmutable de un candidato (vector de recursos)"""
+    return tuple(candidate.get(name) for name in RESOURCE_PARAMETERS)
+
+
+def candidate_cost(candidate, base_config):
+    """Costo mensual total de un candidato"""
+    return sum(monthly_costs({**base_config, **candidate}).values())
+
+
+def target_ratio(replicas, targets, statistic='p90'):
+    """Peor cociente observado/meta entre todas las metas (<= 1 cumple)
+
+    `targets` tiene la forma {etapa: {severidad: minutos}}. El valor observado
+    es el promedio entre réplicas del estadístico de espera; si ninguna
+    réplica tiene datos para una meta, esa meta se considera no cumplida.
+    """
+    worst = 0.0
+    for stage, by_severity in targets.items():
+        for severity, limit in by_severity.items():
+            values = []
+            for results in replicas:
+                stats = results.get('wait_time_by_stage', {}).get(stage, {}).get(str(severity))
+                if stats and stats.get(statistic) is not None:
+                    values.append(stats[statistic])
+            if not values:
+                return math.inf
+            observed = sum(values) / len(values)
+            worst = max(worst, observed / limit if limit > 0 else math.inf)
+    return worst
+
+
+class ReplicationCache:
+    """Resultados de réplicas ya simuladas, por candidato y número de réplica"""
+
+    def __init__(self):
+        self._results = {}
+        self.simulations_run = 0
+
+    def get(self, candidate, replications):
+        key = candidate_key(candidate)
+        return [self._results[(key, r)] for r in range(replications) if (key, r) in self._results]
+
+    def ensure(self, candidates, replications, base_config, sim_time, max_workers=None, engine='fast'):
+        """Simula en paralelo solo las réplicas que aún no están en caché"""
+        tasks = []
+        for candidate in candidates:
+            key = candidate_key(candidate)
+            config = {**base_config, **candidate}
+            for r in range(replications):
+                if (key, r) not in self._results:
+                    tasks.append(make_task(key, config, r, sim_time, engine))
+
+        for key, r, result in run_tasks(tasks, max_workers) if tasks else []:
+            self._results[(key, r)] = result
+            self.simulations_run += 1
+
+
+def surrogate_prune(candidates, targets, base_config, sim_time=168, statistic='p90', margin=2.0, min_keep=1):
+    """Candidatos que la aproximación analítica no descarta
+
+    Se descartan los candidatos cuyo cociente predicho estadístico/meta
+    supera `margin` (las metas de severidades inestables tienen cociente
+    infinito). Si quedan menos de `min_keep`, se completan con los mejores
+    según el cociente predicho, la saturación y el costo.
+    """
+    scored = []
+    for candidate in candidates:
+        prediction = predict({**base_config, **candidate}, sim_time)
+        ratio = target_ratio([prediction], targets, statistic)
+        scored.append((ratio, prediction['max_utilization'], candidate_cost(candidate, base_config), candidate))
+    kept = [candidate for ratio, _, _, candidate in scored if ratio <= margin]
+    if len(kept) < min_keep:
+        scored.sort(key=lambda item: item[:3])
+        kept = [candidate for _, _, _, candidate in scored[:min_keep]]
+    return kept
+
+
+def successive_halving(candidates, targets, base_config=None, sim_time=168, initial_replications=1,
+                       max_replications=16, eta=2, statistic='p90', max_workers=None, engine='fast',
+                       cache=None, surrogate_margin=None):
+    """Encuentra el candidato de menor costo que cumple las metas
+
+    En cada ronda los candidatos se ordenan primero por factibilidad (los
+    que cumplen las metas, por costo; los demás, por qué tan lejos están de
+    cumplirlas) y solo sobrevive la fracción 1/eta superior. Con
+    `surrogate_margin` primero se descartan sin simular los candidatos que
+    la aproximación analítica predice lejos de las metas (ver surrogate_prune).
+    """
+    base_config = dict(base_config or BASE_CONFIG)
+    cache = cache or ReplicationCache()
+    survivors = list(candidates)
+    pruned = 0
+    if surrogate_margin is not None:
+        survivors = surrogate_prune(survivors, targets, base_config, sim_time, statistic, surrogate_margin,
+                                    min_keep=max(1, math.ceil(len(survivors) / eta ** 2)))
+        pruned = len(candidates) - len(survivors)
+    replications = initial_replications
+    history = []
+
+    while True:
+        cache.ensure(survivors, replications, base_config, sim_time, max_workers, engine)
+
+        scored = []
+        for candidate in survivors:
+            ratio = target_ratio(cache.get(candidate, replications), targets, statistic)
+            cost = candidate_cost(candidate, base_config)
+            feasible = ratio <= 1.0
+            scored.append(((0, cost) if feasible else (1, ratio), candidate, cost, ratio))
+        scored.sort(key=lambda item: item[0])
+        history.append({'replications': replications, 'candidates': len(survivors),
+                        'feasible': sum(1 for s in scored if s[3] <= 1.0)})
+
+        if len(scored) == 1 or replications >= max_replications:
+            break
+        keep = max(1, math.ceil(len(scored) / eta))
+        survivors = [candidate for _, candidate, _, _ in scored[:keep]]
+        replications = min(max_replications, replications * eta)
+
+    _, best, cost, ratio = scored[0]
+    return {
+        'best': best,
+        'monthly_cost': cost,
+        'target_ratio': ratio,
+        'feasible': ratio <= 1.0,
+        'replications': replications,
+        'simulations_run': cache.simulations_run,
+        'pruned_by_surrogate': pruned,
+        'rounds': history
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Búsqueda de la mezcla de recursos de menor costo")
+    parser.add_argument('--sim-time', type=float, default=168)
+    parser.add_argument('--max-replications', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--engine', choices=['simpy', 'fast'], default='fast')
+    parser.add_argument('--cache-dir', default=os.path.join("resultados", "cache"),
+                        help="Directorio de la caché de resultados ('' para desactivarla)")
+    parser.add_argument('--surrogate-margin', type=float, default=None,
+                        help="Descarta antes de simular los candidatos cuyo estadístico predicho "
+                             "supera la meta por este factor (por ejemplo 2)")
+    args = parser.parse_args()
+
+    # Ejemplo: p90 de espera por el doctor para severidad 1 menor a 10 minutos
+    targets = {'doctor': {1: 10.0}, 'triage': {1: 10.0}}
+    bounds = {
+        'num_triage_nurses': (1, 4),
+        'num_doctors': (2, 6),
+        'num_nurses': (3, 7),
+        'num_xray': (1, 3),
+        'num_labs': (1, 3)
+    }
+    candidates = resource_grid(bounds)
+    print(f"Evaluando {len(candidates)} candidatos...")
+
+    base_config = {**BASE_CONFIG, 'cache_dir': args.cache_dir} if args.cache_dir else BASE_CONFIG
+    outcome = successive_halving(candidates, targets, base_config=base_config, sim_time=args.sim_time,
+                                 max_replications=args.max_replications,
+                                 max_workers=args.workers, engine=args.engine,
+                                 surrogate_margin=args.surrogate_margin)
+
+    status = "cumple" if outcome['feasible'] else "NO cumple"
+    print(f"Mejor configuración ({status} las metas): {outcome['best']}")
+    print(f"Costo mensual: ${outcome['monthly_cost']:,.2f}")
+    if outcome['pruned_by_surrogate']:
+        print(f"Candidatos descartados por la aproximación analítica: {outcome['pruned_by_surrogate']}")
+    print(f"Simulaciones ejecutadas: {outcome['simulations_run']} "
+          f"(una malla completa con {outcome['replications']} réplicas usaría "
+          f"{len(candidates) * outcome['replications']})")
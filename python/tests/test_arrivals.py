@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Inversa de Λ(t) de PiecewiseRate con tramos sin llegadas y periodo
+"""
+
+import math
+import unittest
+
+import numpy as np
+
+from arrivals import PiecewiseRate
+
+
+class PiecewiseRateInverseTest(unittest.TestCase):
+
+    def setUp(self):
+        # Λ: 0..2 en [0, 2), constante en [2, 5) (tasa 0), 2..8 en [5, 8); se repite cada 8 horas
+        self.rate = PiecewiseRate([0, 2, 5], [1.0, 0.0, 2.0], period=8)
+
+    def test_skips_zero_rate_segment(self):
+        self.assertEqual(self.rate.inverse(1.5), 1.5)
+        # Λ = 2 en todo [2, 5]: la siguiente llegada posible es al final del tramo sin llegadas
+        self.assertEqual(self.rate.inverse(2.0), 5.0)
+        self.assertEqual(self.rate.inverse(3.0), 5.5)
+
+    def test_period_wrap(self):
+        self.assertEqual(self.rate.period_total, 8.0)
+        self.assertEqual(self.rate.inverse(8.0), 8.0)
+        self.assertEqual(self.rate.inverse(9.5), 9.5)
+        self.assertEqual(self.rate.inverse(2 * 8 + 2.0), 2 * 8 + 5.0)
+
+    def test_zero_rate_at_end_of_period(self):
+        rate = PiecewiseRate([0, 4], [1.0, 0.0], period=6)
+        self.assertEqual(rate.inverse(3.5), 3.5)
+        # Al agotar Λ del periodo la siguiente llegada es en el periodo siguiente
+        self.assertEqual(rate.inverse(4.0), 6.0)
+        self.assertEqual(rate.inverse(5.0), 7.0)
+
+    def test_no_more_arrivals(self):
+        self.assertEqual(PiecewiseRate([0, 3], [1.0, 0.0]).inverse(3.0), math.inf)
+        self.assertEqual(PiecewiseRate([0], [0.0], period=5).inverse(0.5), math.inf)
+
+    def test_inverse_of_cumulative(self):
+        hazards = np.random.default_rng(1).uniform(0, 40, 500)
+        times = self.rate.inverse_array(hazards)
+        for h, t in zip(hazards, times):
+            self.assertAlmostEqual(self.rate.inverse(h), t, places=9)
+            self.assertAlmostEqual(self.rate.cumulative(t), h, places=9)
+            # Nunca cae dentro de un tramo sin llegadas
+            self.assertGreater(self.rate.rate(t), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Motor vectorizado: recursión por estación, eventos al mismo paso y acuerdo con fast_engine
+"""
+
+import copy
+import math
+import statistics
+import unittest
+
+import numpy as np
+
+from batch_engine import BatchEmergencyRoom, resource_order, run_batch
+from emergency_simulation import run_simulation
+from parallel_runner import replication_seed
+from pathways import DEFAULT_PATHWAY, compile_pathway
+
+# Recorrido sin recursos repetidos: la segunda consulta la atiende otro recurso
+ACYCLIC_PATHWAY = copy.deepcopy(DEFAULT_PATHWAY)
+ACYCLIC_PATHWAY['resources'] = {'consulta_seguimiento': ['num_follow_up', 2]}
+ACYCLIC_PATHWAY['stages']['segunda_consulta']['resource'] = 'consulta_seguimiento'
+
+STABLE_CONFIG = {'arrival_interval': 150, 'random_seed': 11, 'trace_level': 'off'}
+
+
+def _close(a, b):
+    """Igualdad de resultados salvo el orden de las sumas de punto flotante"""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_close(a[key], b[key]) for key in a)
+    if isinstance(a, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+class ResourceOrderTest(unittest.TestCase):
+
+    def test_default_pathway_reuses_doctors(self):
+        self.assertIsNone(resource_order(compile_pathway()))
+
+    def test_acyclic_pathway_order(self):
+        order = resource_order(compile_pathway(ACYCLIC_PATHWAY))
+        self.assertEqual(order, ['triage_nurses', 'doctors', 'xray', 'lab', 'consulta_seguimiento', 'nurses'])
+
+
+class StationRecursionTest(unittest.TestCase):
+    """La recursión por estación da los mismos resultados que los eventos al mismo paso"""
+
+    def assert_same_as_events(self, config, sim_time=600):
+        outputs = []
+        for recursive in (True, False):
+            engine = BatchEmergencyRoom([(config, 1, np.random.default_rng(seed)) for seed in range(8)], sim_time)
+            self.assertTrue(engine.recursive)
+            engine.recursive = recursive
+            engine.run()
+            outputs.append(engine.results())
+        for recursive, events in zip(*outputs):
+            self.assertTrue(_close(recursive, events))
+
+    def test_overloaded(self):
+        self.assert_same_as_events({'pathway': ACYCLIC_PATHWAY, 'arrival_interval': 2})
+
+    def test_priority_aging(self):
+        self.assert_same_as_events({'pathway': ACYCLIC_PATHWAY, 'arrival_interval': 4, 'priority_aging': 0.05,
+                                    'num_doctors': 5})
+
+    def test_resource_without_capacity(self):
+        self.assert_same_as_events({'pathway': ACYCLIC_PATHWAY, 'arrival_interval': 20, 'num_xray': 0})
+
+
+class FastEngineAgreementTest(unittest.TestCase):
+    """Medias de las réplicas del lote y de fast_engine dentro de 4 errores estándar"""
+
+    replications = 30
+    sim_time = 3000
+
+    def assert_agreement(self, config):
+        batch = run_batch({'lote': config}, self.replications, sim_time=self.sim_time)['lote']
+        fast = [run_simulation(dict(config, random_seed=1000 + replication), sim_time=self.sim_time,
+                               write_report=False, engine='fast')
+                for replication in range(self.replications)]
+        metrics = {'average_time_in_system': lambda results: results['average_time_in_system']}
+        for resource in ('triage_nurses', 'doctors', 'xray', 'nurses'):
+            metrics[resource] = lambda results, resource=resource: (
+                results['resource_utilization'][resource]['utilization'])
+        for name, metric in metrics.items():
+            x = [metric(results) for results in batch]
+            y = [metric(results) for results in fast]
+            error = math.sqrt((statistics.variance(x) + statistics.variance(y)) / self.replications)
+            self.assertLess(abs(statistics.fmean(x) - statistics.fmean(y)), 4 * error, name)
+
+    def test_default_pathway(self):
+        self.assert_agreement(STABLE_CONFIG)
+
+    def test_acyclic_pathway(self):
+        self.assert_agreement({**STABLE_CONFIG, 'pathway': ACYCLIC_PATHWAY})
+
+    def test_replication_seeds(self):
+        results = run_batch({'lote': STABLE_CONFIG}, 3, sim_time=200)['lote']
+        seeds = [r['simulation_parameters']['random_seed'] for r in results]
+        self.assertEqual(seeds, [replication_seed(11, r) for r in range(3)])
+        self.assertEqual(seeds[0], 11)
+        # Semillas base vecinas no comparten réplicas
+        self.assertFalse(set(seeds) & {replication_seed(12, r) for r in range(3)})
+
+
+if __name__ == '__main__':
+    unittest.main()
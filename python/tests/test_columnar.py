@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CodeBook y ColumnTable
+"""
+
+import unittest
+
+from columnar import CodeBook, ColumnTable
+
+
+class CodeBookTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        book = CodeBook()
+        names = ['triage', 'consulta', 'rayos_x', 'consulta', 'laboratorio', 'triage']
+        codes = [book.code(name) for name in names]
+        self.assertEqual(codes, [0, 1, 2, 1, 3, 0])
+        self.assertEqual([book.name(code) for code in codes], names)
+        self.assertEqual(book.names, ['triage', 'consulta', 'rayos_x', 'laboratorio'])
+        self.assertEqual(len(book), 4)
+        self.assertIn('rayos_x', book)
+        self.assertNotIn('alta', book)
+
+    def test_categories_in_frame(self):
+        book = CodeBook()
+        table = ColumnTable([('stage', 'B'), ('wait_time', 'd')], capacity=2)
+        rows = [('triage', 1.5), ('consulta', 0.25), ('triage', 3.0)]
+        for stage, wait in rows:
+            table.append(book.code(stage), wait)
+        frame = table.to_frame({'stage': book})
+        self.assertEqual(list(frame['stage']), [stage for stage, _ in rows])
+        self.assertEqual(list(frame['wait_time']), [wait for _, wait in rows])
+        self.assertEqual(table.capacity, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
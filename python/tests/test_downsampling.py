@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cubetas de series escalonadas y muestra LTTB
+"""
+
+import unittest
+
+import numpy as np
+
+from downsampling import bucket_step_series, lttb
+
+
+def value_at(times, values, t):
+    """Valor de la serie escalonada en t (antes del primer registro, el primero)"""
+    i = np.searchsorted(times, t, side='right') - 1
+    return values[max(i, 0)]
+
+
+def step_integral(times, values, a, b):
+    """Integral exacta de la serie escalonada entre a y b"""
+    cuts = np.concatenate(([a], times[(times > a) & (times < b)], [b]))
+    return sum(value_at(times, values, lo) * (hi - lo) for lo, hi in zip(cuts[:-1], cuts[1:]))
+
+
+class BucketStepSeriesTest(unittest.TestCase):
+
+    def test_against_direct_evaluation(self):
+        rng = np.random.default_rng(4)
+        times = np.sort(rng.uniform(1.0, 95.0, 300))
+        values = rng.integers(0, 6, 300) / 5
+        start, end, buckets = 0.0, 100.0, 7
+        result = bucket_step_series(times, values, start, end, buckets)
+
+        edges = np.linspace(start, end, buckets + 1)
+        np.testing.assert_allclose(result['time'], edges[:-1])
+        for k, (a, b) in enumerate(zip(edges[:-1], edges[1:])):
+            active = [value_at(times, values, a)] + list(values[(times > a) & (times < b)])
+            self.assertEqual(result['min'][k], min(active))
+            self.assertEqual(result['max'][k], max(active))
+            self.assertAlmostEqual(result['mean'][k], step_integral(times, values, a, b) / (b - a))
+
+    def test_endpoints_and_extrema(self):
+        # La serie empieza después de `start` y su último registro vale hasta `end`
+        times = np.array([2.0, 3.0, 3.5, 9.0])
+        values = np.array([0.5, 1.0, 0.0, 0.25])
+        result = bucket_step_series(times, values, 0.0, 10.0, 5)
+        self.assertEqual(result['time'][0], 0.0)
+        self.assertEqual(result['mean'][0], 0.5)   # [0, 2): valor del primer registro
+        self.assertEqual(result['max'][1], 1.0)    # [2, 4) contiene el pico
+        self.assertEqual(result['min'][1], 0.0)
+        self.assertEqual(result['mean'][-1], 0.125)  # [8, 10): 0 hasta 9 y 0.25 hasta 10
+        self.assertEqual(result['max'].max(), values.max())
+        self.assertEqual(result['min'].min(), values.min())
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            bucket_step_series([0.0], [1.0], 0.0, 1.0, 0)
+        with self.assertRaises(ValueError):
+            bucket_step_series([0.0], [1.0], 1.0, 1.0, 3)
+
+
+class LttbTest(unittest.TestCase):
+
+    def test_keeps_endpoints_and_spike(self):
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 50)
+        y[437] = 25.0
+        y[800] = -30.0
+        sample_x, sample_y = lttb(x, y, 40)
+        self.assertEqual(len(sample_x), 40)
+        self.assertEqual((sample_x[0], sample_x[-1]), (0.0, 999.0))
+        self.assertTrue(np.all(np.diff(sample_x) > 0))
+        self.assertIn(437.0, sample_x)
+        self.assertIn(800.0, sample_x)
+        np.testing.assert_array_equal(sample_y, y[sample_x.astype(int)])
+
+    def test_short_series_unchanged(self):
+        x, y = np.arange(5.0), np.arange(5.0) ** 2
+        sample_x, sample_y = lttb(x, y, 10)
+        np.testing.assert_array_equal(sample_x, x)
+        np.testing.assert_array_equal(sample_y, y)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Manifiesto del informe al cambiar entre el modo completo y el de streaming
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from emergency_report import full_aggregates, render_reports
+from fast_engine import FastEmergencyRoom
+
+
+def _stats(mode):
+    er = FastEmergencyRoom({'arrival_interval': 30, 'random_seed': 3, 'trace_level': 'off', 'stats_mode': mode})
+    er.run(300)
+    er.finalize()
+    return er.stats
+
+
+class EmergencyReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.prefix = os.path.join(self.directory, 'informe')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _report(self, mode):
+        stats = _stats(mode)
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats.generate_report({'sim_time': 300}, file_prefix=self.prefix)
+        with open(f"{self.prefix}_manifest.json") as f:
+            return json.load(f)
+
+    def test_streaming_report_prunes_full_report_files(self):
+        full = self._report('full')
+        utilization = [key for key in full if '_utilizacion.' in key]
+        self.assertTrue(utilization)
+
+        streaming = self._report('streaming')
+        for key in utilization:
+            self.assertNotIn(key, streaming)
+            self.assertFalse(os.path.exists(os.path.join(self.directory, key)), key)
+        for key in streaming:
+            self.assertTrue(os.path.exists(os.path.join(self.directory, key)), key)
+
+    def test_unchanged_report_is_skipped(self):
+        self._report('full')
+        stats = _stats('full')
+        aggregates = full_aggregates(stats, {'sim_time': 300})
+        with contextlib.redirect_stdout(io.StringIO()):
+            counts = render_reports([(aggregates, self.prefix)])
+        self.assertEqual(counts['rendered'], 0)
+        self.assertEqual(counts['removed'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
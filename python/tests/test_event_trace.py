@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Niveles de traza por defecto y explícitos
+"""
+
+import contextlib
+import io
+import unittest
+
+from emergency_simulation import run_simulation
+from event_trace import EventTracer, RingSink
+
+
+class EventTraceTest(unittest.TestCase):
+
+    def test_default_level_is_summary(self):
+        tracer = EventTracer.from_config({})
+        self.assertTrue(tracer.summary)
+        self.assertFalse(tracer.patients)
+        self.assertFalse(tracer.events)
+
+    def test_default_run_prints_only_the_summary(self):
+        for engine in ('simpy', 'fast'):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                run_simulation({'arrival_interval': 20, 'random_seed': 1}, sim_time=500, write_report=False,
+                               engine=engine)
+            lines = output.getvalue().splitlines()
+            self.assertEqual(len(lines), 1, engine)
+            self.assertTrue(lines[0].startswith("Simulación finalizada"))
+
+    def test_event_level_is_opt_in(self):
+        sink = RingSink(100000)
+        run_simulation({'arrival_interval': 20, 'random_seed': 1}, sim_time=500, write_report=False,
+                       tracer=EventTracer('event', sink))
+        self.assertGreater(len(sink.lines()), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
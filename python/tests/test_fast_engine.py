@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Paridad entre el motor rápido (fast_engine) y el modelo de SimPy
+"""
+
+import unittest
+
+from emergency_simulation import run_simulation
+
+BASE_CONFIG = {
+    'arrival_interval': 20,
+    'random_seed': 1234,
+    'trace_level': 'off'
+}
+
+
+def _run(config, engine, sim_time=2000):
+    return run_simulation(dict(config), sim_time=sim_time, write_report=False, engine=engine)
+
+
+class FastEngineParityTest(unittest.TestCase):
+    """Con la misma configuración y semilla ambos motores dan las mismas estadísticas"""
+
+    def assert_parity(self, config):
+        simpy_results = _run(config, 'simpy')
+        fast_results = _run(config, 'fast')
+        self.assertGreater(simpy_results['total_patients'], 0)
+        self.assertEqual(simpy_results, fast_results)
+
+    def test_default_configuration(self):
+        self.assert_parity(BASE_CONFIG)
+
+    def test_priority_aging(self):
+        self.assert_parity({**BASE_CONFIG, 'arrival_interval': 8, 'priority_aging': 0.05, 'random_seed': 7})
+
+    def test_reduced_capacity(self):
+        self.assert_parity({**BASE_CONFIG, 'num_doctors': 1, 'num_xray': 1, 'random_seed': 99})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Invariantes de IndexedHeap y de la cola de solicitudes con envejecimiento
+"""
+
+import random
+import unittest
+
+import simpy
+
+from indexed_heap import IndexedHeap
+from monitored_resource import MonitoredPriorityResource, RequestHeap
+
+
+def assert_heap_invariants(test, heap):
+    """Orden de heap entre cada nodo y su padre, y posiciones consistentes"""
+    entries = heap._heap
+    test.assertEqual(len(entries), len(heap._positions))
+    for index, entry in enumerate(entries):
+        test.assertEqual(heap._positions[entry[2]], index)
+        if index > 0:
+            test.assertLessEqual(entries[(index - 1) // 2], entry)
+
+
+class IndexedHeapTest(unittest.TestCase):
+
+    def test_random_operations_keep_invariants(self):
+        rng = random.Random(2024)
+        heap = IndexedHeap()
+        reference = {}  # elemento -> clave
+        next_item = 0
+        for _ in range(3000):
+            operation = rng.random()
+            if operation < 0.4 or not reference:
+                heap.push(next_item, rng.randint(0, 50))
+                reference[next_item] = heap.key(next_item)
+                next_item += 1
+            elif operation < 0.6:
+                item = rng.choice(list(reference))
+                heap.update(item, rng.randint(0, 50))
+                reference[item] = heap.key(item)
+            elif operation < 0.8:
+                item = rng.choice(list(reference))
+                heap.remove(item)
+                del reference[item]
+            else:
+                expected = min(reference.values())
+                item = heap.pop()
+                self.assertEqual(reference.pop(item), expected)
+            assert_heap_invariants(self, heap)
+        self.assertEqual(sorted(reference), sorted(heap.items()))
+
+    def test_equal_keys_keep_insertion_order(self):
+        heap = IndexedHeap()
+        for item in 'abcde':
+            heap.push(item, 1)
+        heap.update('a', 1)
+        heap.remove('c')
+        self.assertEqual([heap.pop() for _ in range(len(heap))], ['a', 'b', 'd', 'e'])
+
+    def test_update_moves_up_and_down(self):
+        heap = IndexedHeap()
+        for item, key in zip('abcd', (1, 2, 3, 4)):
+            heap.push(item, key)
+        heap.update('d', 0)
+        self.assertEqual(heap.peek(), 'd')
+        heap.update('d', 10)
+        self.assertEqual(heap.items(), ['a', 'b', 'c', 'd'])
+        assert_heap_invariants(self, heap)
+
+    def test_errors(self):
+        heap = IndexedHeap()
+        self.assertRaises(IndexError, heap.pop)
+        heap.push('a', 1)
+        self.assertRaises(ValueError, heap.push, 'a', 2)
+        self.assertRaises(ValueError, heap.remove, 'b')
+
+
+class AgingTest(unittest.TestCase):
+
+    def test_request_heap_aging_key(self):
+        env = simpy.Environment()
+        resource = MonitoredPriorityResource(env, capacity=1, aging_rate=0.5)
+        self.assertIsInstance(resource.put_queue, RequestHeap)
+        holder = resource.request(priority=1)
+        order = []
+
+        def patient(name, priority, delay):
+            yield env.timeout(delay)
+            with resource.request(priority=priority) as request:
+                yield request
+                order.append(name)
+                yield env.timeout(1)
+
+        def release():
+            yield env.timeout(10)
+            resource.release(holder)
+
+        # Claves con envejecimiento: 3 + 0.5 * 0 = 3, 2 + 0.5 * 3 = 3.5 y 1 + 0.5 * 9 = 5.5;
+        # sin envejecimiento el orden sería el inverso
+        env.process(patient('severidad 3', 3, 0))
+        env.process(patient('severidad 2', 2, 3))
+        env.process(patient('severidad 1', 1, 9))
+        env.process(release())
+        env.run()
+        self.assertEqual(order, ['severidad 3', 'severidad 2', 'severidad 1'])
+        assert_heap_invariants(self, resource.put_queue)
+
+    def test_reprioritize_waiting_request(self):
+        env = simpy.Environment()
+        resource = MonitoredPriorityResource(env, capacity=1)
+        holder = resource.request(priority=1)
+        waiting = [resource.request(priority=priority) for priority in (2, 3, 4, 5)]
+        resource.reprioritize(waiting[3], 0)
+        resource.reprioritize(waiting[0], 6)
+        assert_heap_invariants(self, resource.put_queue)
+        self.assertEqual(list(resource.put_queue), [waiting[3], waiting[1], waiting[2], waiting[0]])
+
+        served = []
+        for request in waiting:
+            request.callbacks.append(lambda event: served.append(event))
+        resource.release(holder)
+        env.run()
+        self.assertEqual(served, [waiting[3]])
+
+
+if __name__ == '__main__':
+    unittest.main()
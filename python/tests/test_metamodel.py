@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Proceso gaussiano del metamodelo: interpolación en los puntos de entrenamiento
+"""
+
+import unittest
+
+import numpy as np
+
+from metamodel import GaussianProcess
+
+
+def training_data(points=25):
+    x = np.random.default_rng(0).uniform(0, 1, (points, 2))
+    y = np.sin(3 * x[:, 0]) + 10 * x[:, 1] ** 2
+    return x, y
+
+
+class GaussianProcessTest(unittest.TestCase):
+
+    def test_interpolates_without_noise(self):
+        x, y = training_data()
+        # Escalas y señal 1 (datos estandarizados) y ruido casi nulo, sin optimizar
+        gp = GaussianProcess(np.array([0.0, 0.0, 0.0, -18.0])).fit(x, y, optimize=False)
+        mean, std = gp.predict(x)
+        np.testing.assert_allclose(mean, y, atol=1e-3 * y.std())
+        self.assertLess(std.max(), 1e-3 * y.std())
+
+    def test_optimized_fit_near_training_points(self):
+        x, y = training_data()
+        gp = GaussianProcess().fit(x, y)
+        mean, std = gp.predict(x)
+        np.testing.assert_allclose(mean, y, atol=0.05 * y.std())
+        # Lejos de los datos la incertidumbre vuelve a la de la señal
+        _, far = gp.predict([[5.0, -5.0]])
+        self.assertGreater(far[0], 10 * std.max())
+
+    def test_replication_noise_smooths(self):
+        x, y = training_data()
+        noisy = y + np.random.default_rng(1).normal(0, 0.5, len(y))
+        gp = GaussianProcess(np.array([0.0, 0.0, 0.0, -18.0])).fit(x, noisy, noise=np.full(len(y), 0.25),
+                                                                  optimize=False)
+        mean, std = gp.predict(x)
+        # Con la varianza de las réplicas el modelo ya no pasa por cada media observada
+        self.assertGreater(np.abs(mean - noisy).max(), 0.05)
+        self.assertTrue(np.all(std > 0))
+        self.assertLess(np.abs(mean - y).mean(), np.abs(noisy - y).mean())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Integrales de utilización y cola de MonitoredPriorityResource con abandonos
+"""
+
+import unittest
+
+import simpy
+
+from monitored_resource import MonitoredPriorityResource
+
+
+class QueueIntegralTest(unittest.TestCase):
+
+    def test_cancelled_request_updates_queue(self):
+        env = simpy.Environment()
+        changes = []
+        resource = MonitoredPriorityResource(env, capacity=1, name='doctor',
+                                             on_change=lambda *args: changes.append(args))
+
+        def patient(arrival, service, patience=None):
+            yield env.timeout(arrival)
+            request = resource.request(priority=1)
+            outcome = yield request | env.timeout(patience if patience is not None else 1e9)
+            if request not in outcome:
+                request.cancel()  # Abandona la cola sin pasar por release
+                return
+            yield env.timeout(service)
+            resource.release(request)
+
+        env.process(patient(0, 10))  # En servicio de 0 a 10
+        env.process(patient(1, 2))  # Espera de 1 a 10, servicio de 10 a 12
+        env.process(patient(2, 1, patience=3))  # Espera de 2 a 5 y abandona
+        env.process(patient(3, 3))  # Espera de 3 a 12, servicio de 12 a 15
+        env.run(until=15)
+
+        # Cola: 1 en [1, 2), 2 en [2, 3), 3 en [3, 5), 2 en [5, 10), 1 en [10, 12), 0 en [12, 15)
+        queue_time = 1 * 1 + 2 * 1 + 3 * 2 + 2 * 5 + 1 * 2
+        summary = resource.summary(15)
+        self.assertAlmostEqual(summary['average_queue_length'], queue_time / 15)
+        self.assertEqual(summary['max_queue_length'], 3)
+        self.assertAlmostEqual(summary['busy_time'], 15)
+        self.assertIn(('doctor', 1, 1, 2, 5), changes)
+
+    def test_interrupted_waiting_process(self):
+        env = simpy.Environment()
+        resource = MonitoredPriorityResource(env, capacity=1)
+
+        def holder():
+            with resource.request(priority=1) as request:
+                yield request
+                yield env.timeout(10)
+
+        def waiting():
+            request = resource.request(priority=1)
+            try:
+                yield request
+            except simpy.Interrupt:
+                request.cancel()
+
+        env.process(holder())
+        process = env.process(waiting())
+
+        def interrupt():
+            yield env.timeout(4)
+            process.interrupt()
+
+        env.process(interrupt())
+        env.run(until=10)
+        summary = resource.summary(10)
+        self.assertAlmostEqual(summary['average_queue_length'], 4 / 10)
+        self.assertEqual(len(resource.put_queue), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+RunningStats y QuantileSketch contra los valores exactos de NumPy
+"""
+
+import unittest
+
+import numpy as np
+
+from online_stats import QuantileSketch, RunningStats
+
+QUANTILES = (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999)
+
+
+def running(values):
+    stats = RunningStats()
+    for value in values:
+        stats.add(float(value))
+    return stats
+
+
+class RunningStatsTest(unittest.TestCase):
+
+    def test_merge_matches_numpy(self):
+        rng = np.random.default_rng(3)
+        # Partes de tamaños y escalas distintos, incluida una vacía
+        parts = [rng.normal(1e6, 3.0, 500), rng.exponential(2.0, 7), np.array([]), rng.normal(-5, 1, 1200)]
+        merged = RunningStats()
+        for part in parts:
+            merged.merge(running(part))
+        values = np.concatenate(parts)
+
+        self.assertEqual(merged.count, len(values))
+        self.assertAlmostEqual(merged.mean, values.mean(), delta=1e-9 * abs(values.mean()))
+        self.assertAlmostEqual(merged.variance, values.var(ddof=1), delta=1e-9 * values.var(ddof=1))
+        self.assertEqual(merged.min, values.min())
+        self.assertEqual(merged.max, values.max())
+
+    def test_merge_into_empty(self):
+        values = [4.0, 1.0, 9.0]
+        merged = RunningStats().merge(running(values))
+        self.assertEqual((merged.count, merged.min, merged.max), (3, 1.0, 9.0))
+        self.assertAlmostEqual(merged.mean, 14 / 3)
+        self.assertAlmostEqual(merged.variance, np.var(values, ddof=1))
+
+
+class QuantileSketchTest(unittest.TestCase):
+
+    def assert_relative_error(self, sketch, values):
+        ordered = np.sort(values)
+        for q in QUANTILES:
+            # El sketch devuelve la cubeta del valor de rango floor(q (n - 1))
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), sketch.relative_accuracy * exact * (1 + 1e-12),
+                                 msg=q)
+
+    def test_relative_error_bound(self):
+        values = np.random.default_rng(5).lognormal(3.0, 1.5, 20000)
+        for accuracy in (0.01, 0.05):
+            sketch = QuantileSketch(relative_accuracy=accuracy)
+            for value in values:
+                sketch.add(float(value))
+            self.assert_relative_error(sketch, values)
+
+    def test_merge_keeps_bound(self):
+        rng = np.random.default_rng(8)
+        parts = [rng.exponential(10.0, 3000), rng.gamma(2.0, 50.0, 5000)]
+        merged = QuantileSketch()
+        for part in parts:
+            sketch = QuantileSketch()
+            for value in part:
+                sketch.add(float(value))
+            merged.merge(sketch)
+        self.assertEqual(merged.count, 8000)
+        self.assert_relative_error(merged, np.concatenate(parts))
+
+    def test_merge_requires_same_accuracy(self):
+        with self.assertRaises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cuantiles de la t de Student y análisis de régimen estacionario opcional
+"""
+
+import unittest
+
+from emergency_simulation import run_simulation
+from output_analysis import t_cdf, t_quantile
+
+# Valores de tabla de t_{p, df}
+T_TABLE = {
+    (0.975, 3): 3.182446305284263,
+    (0.975, 4): 2.776445105197799,
+    (0.975, 5): 2.570581835636314,
+    (0.975, 10): 2.228138851986274,
+    (0.975, 30): 2.042272456301238,
+    (0.995, 3): 5.840909309733350,
+    (0.995, 6): 3.707428021324907,
+    (0.95, 4): 2.131846786326649,
+    (0.9995, 3): 12.92397863670570,
+}
+
+
+class TQuantileTest(unittest.TestCase):
+
+    def test_table_values(self):
+        for (p, df), expected in T_TABLE.items():
+            self.assertAlmostEqual(t_quantile(p, df), expected, delta=1e-9 * expected, msg=(p, df))
+            self.assertAlmostEqual(t_quantile(1 - p, df), -expected, delta=1e-9 * expected, msg=(p, df))
+
+    def test_inverse_of_cdf(self):
+        for df in (1, 2, 3, 7, 19, 120):
+            for p in (0.001, 0.1, 0.5, 0.8, 0.999):
+                self.assertAlmostEqual(t_cdf(t_quantile(p, df), df), p, places=12, msg=(p, df))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            t_quantile(0.975, 0)
+        with self.assertRaises(ValueError):
+            t_quantile(1.0, 5)
+
+
+class SteadyStateTest(unittest.TestCase):
+
+    def test_steady_state_is_opt_in(self):
+        config = {'arrival_interval': 30, 'random_seed': 2, 'trace_level': 'off'}
+        results = run_simulation(dict(config), sim_time=300, write_report=False, engine='fast')
+        self.assertNotIn('steady_state_time_in_system', results)
+        results = run_simulation(dict(config, warmup_method='mser5'), sim_time=300, write_report=False,
+                                 engine='fast')
+        self.assertEqual(results['steady_state_time_in_system']['warmup']['method'], 'MSER-5')
+
+
+if __name__ == '__main__':
+    unittest.main()
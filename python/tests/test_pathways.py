@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Recorrido por defecto compilado y validación de recorridos declarativos
+"""
+
+import copy
+import random
+import unittest
+
+from emergency_simulation import run_simulation
+from pathways import DEFAULT_PATHWAY, compile_pathway
+
+STAGES = ['triage', 'doctor', 'rayos_x', 'laboratorio', 'segunda_consulta', 'enfermera']
+
+# Probabilidad de visitar cada etapa (en el orden de STAGES) por severidad en el modelo original
+DEFAULT_VISITS = {
+    1: [1.0, 1.0, 0.8, 0.9, 0.98, 1.0],
+    2: [1.0, 1.0, 0.7, 0.8, 0.94, 1.0],
+    3: [1.0, 1.0, 0.5, 0.6, 0.8, 1.0],
+    4: [1.0, 1.0, 0.3, 0.4, 0.58, 1.0],
+    5: [1.0, 1.0, 0.2, 0.3, 0.44, 1.0]
+}
+
+
+class DefaultPathwayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pathway = compile_pathway()
+
+    def test_stage_order(self):
+        self.assertEqual(self.pathway.names, STAGES)
+
+    def test_visit_probabilities(self):
+        for severity, expected in DEFAULT_VISITS.items():
+            for stage, (visit, probability) in enumerate(zip(self.pathway.visit_probabilities(severity), expected)):
+                self.assertAlmostEqual(visit, probability, places=9, msg=f"{STAGES[stage]}, severidad {severity}")
+
+    def test_transition_probabilities_sum_to_one(self):
+        for stage in range(self.pathway.discharge):
+            for severity in DEFAULT_VISITS:
+                probabilities = self.pathway.transition_probabilities(stage, severity)
+                self.assertTrue(all(p >= 0 for p in probabilities))
+                self.assertAlmostEqual(sum(probabilities), 1.0, places=9)
+
+    def test_sampled_paths_match_visit_probabilities(self):
+        rng = random.Random(11)
+        samples = 20000
+        routes = len(self.pathway.route_streams)
+        for severity, expected in DEFAULT_VISITS.items():
+            visits = [0] * len(STAGES)
+            for _ in range(samples):
+                path = self.pathway.path(severity, [rng.random() for _ in range(routes)])
+                self.assertEqual(len(set(path)), len(path))
+                for stage in path:
+                    visits[stage] += 1
+            for count, probability in zip(visits, expected):
+                self.assertAlmostEqual(count / samples, probability, delta=0.015)
+
+    def test_default_is_compiled_once(self):
+        self.assertIs(compile_pathway(), self.pathway)
+
+
+class CustomPathwayTest(unittest.TestCase):
+
+    def test_validation_errors(self):
+        cycle = copy.deepcopy(DEFAULT_PATHWAY)
+        cycle['stages']['enfermera']['next'] = [['doctor']]
+        unknown_resource = copy.deepcopy(DEFAULT_PATHWAY)
+        unknown_resource['stages']['laboratorio']['resource'] = 'ecografo'
+        excess = copy.deepcopy(DEFAULT_PATHWAY)
+        excess['stages']['doctor']['next'][1][1] = [0.5] * 5
+        distribution = copy.deepcopy(DEFAULT_PATHWAY)
+        distribution['stages']['triage']['service'] = {'distribution': 'gamma'}
+        for spec in (cycle, unknown_resource, excess, distribution):
+            self.assertRaises(ValueError, compile_pathway, spec)
+
+    def test_custom_pathway_runs_on_both_engines(self):
+        spec = copy.deepcopy(DEFAULT_PATHWAY)
+        spec['resources'] = {'ecografo': ['num_eco', 1]}
+        spec['stages']['doctor']['next'] = [['laboratorio', [0.5] * 5], ['enfermera']]
+        spec['stages']['laboratorio']['resource'] = 'ecografo'
+        config = {'pathway': spec, 'arrival_interval': 20, 'random_seed': 3, 'trace_level': 'off'}
+
+        results = run_simulation(dict(config), sim_time=2000, write_report=False, engine='simpy')
+        self.assertEqual(results, run_simulation(dict(config), sim_time=2000, write_report=False, engine='fast'))
+        self.assertGreater(results['total_patients'], 0)
+        self.assertNotIn('rayos_x', results['wait_time_by_stage'])
+        self.assertEqual(results['resource_utilization']['ecografo']['capacity'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
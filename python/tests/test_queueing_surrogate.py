@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fórmula de Erlang C del sustituto analítico
+"""
+
+import math
+import unittest
+from fractions import Fraction
+
+from queueing_surrogate import erlang_c
+
+# (servidores, carga ofrecida en erlangs) -> probabilidad de esperar, de tablas de Erlang C
+TEXTBOOK = {
+    (1, 0.5): 0.5,
+    (2, 1.0): 1 / 3,
+    (3, 2.0): 4 / 9,
+    (10, 8.0): 0.4092,
+    (11, 10.0): 0.6821,
+}
+
+
+def direct_erlang_c(servers, load):
+    """Fórmula cerrada de Erlang C en aritmética exacta"""
+    load = Fraction(load)
+    waiting = load ** servers / math.factorial(servers) * servers / (servers - load)
+    idle = sum(load ** k / math.factorial(k) for k in range(servers))
+    return float(waiting / (idle + waiting))
+
+
+class ErlangCTest(unittest.TestCase):
+
+    def test_textbook_values(self):
+        for (servers, load), expected in TEXTBOOK.items():
+            self.assertAlmostEqual(erlang_c(servers, load), expected, places=4, msg=(servers, load))
+
+    def test_matches_closed_form(self):
+        for servers in (1, 2, 5, 12, 40):
+            for utilization in (0.1, 0.5, 0.85, 0.99):
+                load = servers * utilization
+                self.assertAlmostEqual(erlang_c(servers, load), direct_erlang_c(servers, load), places=12,
+                                       msg=(servers, load))
+
+    def test_overloaded_or_without_servers(self):
+        self.assertEqual(erlang_c(3, 3.0), 1.0)
+        self.assertEqual(erlang_c(3, 4.5), 1.0)
+        self.assertEqual(erlang_c(0, 0.5), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
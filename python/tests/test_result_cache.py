@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caché de resultados de run_simulation
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from emergency_simulation import run_simulation
+from result_cache import ResultCache, cache_key
+
+CONFIG = {'arrival_interval': 30, 'random_seed': 5, 'trace_level': 'off'}
+
+
+class CacheKeyTest(unittest.TestCase):
+
+    def test_stable_under_key_order_and_ignored_keys(self):
+        key = cache_key(CONFIG, 300, 'fast', model_version='1')
+        reordered = dict(reversed(list(CONFIG.items())))
+        self.assertEqual(cache_key(reordered, 300, 'fast', model_version='1'), key)
+        ignored = dict(CONFIG, trace_level='event', cache_dir='otra', report_workers=4, sim_time=10)
+        self.assertEqual(cache_key(ignored, 300, 'fast', model_version='1'), key)
+        self.assertEqual(len(key), 64)
+
+    def test_changes_invalidate(self):
+        key = cache_key(CONFIG, 300, 'fast', model_version='1')
+        variants = [
+            cache_key(dict(CONFIG, num_doctors=4), 300, 'fast', model_version='1'),
+            cache_key(dict(CONFIG, random_seed=6), 300, 'fast', model_version='1'),
+            cache_key(CONFIG, 301, 'fast', model_version='1'),
+            cache_key(CONFIG, 300, 'simpy', model_version='1'),
+            cache_key(CONFIG, 300, 'fast', model_version='2'),
+            cache_key(CONFIG, 300, 'fast', model_version='1', report=True),
+        ]
+        self.assertEqual(len({key, *variants}), len(variants) + 1)
+
+    def test_report_key_depends_on_series_resolution(self):
+        plain = cache_key(CONFIG, 300, 'fast', model_version='1')
+        report = cache_key(CONFIG, 300, 'fast', model_version='1', report=True)
+        finer = dict(CONFIG, report_buckets=50)
+        self.assertEqual(cache_key(finer, 300, 'fast', model_version='1'), plain)
+        self.assertNotEqual(cache_key(finer, 300, 'fast', model_version='1', report=True), report)
+
+    def test_input_file_contents(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'perfil.csv')
+            with open(path, 'w') as f:
+                f.write("start,rate\n0,1.0\n")
+            config = dict(CONFIG, arrival_profile=path)
+            key = cache_key(config, 300, 'fast', model_version='1')
+            self.assertEqual(cache_key(config, 300, 'fast', model_version='1'), key)
+            with open(path, 'w') as f:
+                f.write("start,rate\n0,2.0\n")
+            self.assertNotEqual(cache_key(config, 300, 'fast', model_version='1'), key)
+        finally:
+            shutil.rmtree(directory)
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _age(self, cache, key, seconds_ago):
+        stamp = time.time() - seconds_ago
+        os.utime(cache._path(key), (stamp, stamp))
+
+    def test_store_lookup_invalidate(self):
+        cache = ResultCache(self.directory)
+        self.assertIsNone(cache.lookup(CONFIG, 300, 'fast'))
+        cache.store(CONFIG, 300, 'fast', {'total_patients': 7})
+        self.assertEqual(cache.lookup(CONFIG, 300, 'fast'), {'total_patients': 7})
+        self.assertIsNone(cache.lookup(CONFIG, 300, 'fast', report=True))
+        self.assertTrue(cache.invalidate_config(CONFIG, 300, 'fast'))
+        self.assertFalse(cache.invalidate_config(CONFIG, 300, 'fast'))
+        self.assertIsNone(cache.lookup(CONFIG, 300, 'fast'))
+
+    def test_lru_eviction(self):
+        payload = {'values': list(range(200))}
+        entry_size = len(json.dumps(payload))
+        cache = ResultCache(self.directory, max_bytes=int(3.5 * entry_size))
+        for i, key in enumerate('abc'):
+            cache.put(key, payload)
+            self._age(cache, key, 100 - i)
+        # Leer 'a' la marca como usada recientemente: la menos usada pasa a ser 'b'
+        self.assertIsNotNone(cache.get('a'))
+        cache.put('d', payload)
+        remaining = {key for key in 'abcd' if cache.get(key) is not None}
+        self.assertEqual(remaining, {'a', 'c', 'd'})
+        self.assertLessEqual(cache.size(), cache.max_bytes)
+
+    def test_eviction_reaches_target(self):
+        payload = {'values': list(range(200))}
+        entry_size = len(json.dumps(payload))
+        cache = ResultCache(self.directory, max_bytes=10 * entry_size)
+        for i in range(10):
+            cache.put(str(i), payload)
+            self._age(cache, str(i), 100 - i)
+        cache.put('nuevo', payload)
+        # Se eliminan las más antiguas hasta quedar en EVICT_TARGET (90%) del límite
+        remaining = sorted(entry.name for entry in os.scandir(self.directory))
+        self.assertEqual(remaining, sorted(f"{key}.json" for key in ['2', '3', '4', '5', '6', '7', '8', '9', 'nuevo']))
+
+
+class CachedRunTest(unittest.TestCase):
+
+    def setUp(self):
+        # Los informes se escriben en resultados/ del directorio actual
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+        self.cache = ResultCache('cache')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def _run(self, write_report, **overrides):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return run_simulation(dict(CONFIG, **overrides), sim_time=300, write_report=write_report,
+                                  engine='fast', cache=self.cache)
+
+    def test_hit_reports_current_parameters(self):
+        first = self._run(False)
+        second = self._run(False, trace_level='summary', report_workers=2)
+        self.assertEqual(second['simulation_parameters']['trace_level'], 'summary')
+        self.assertEqual(second['simulation_parameters']['report_workers'], 2)
+        first.pop('simulation_parameters')
+        second.pop('simulation_parameters')
+        self.assertEqual(first, second)
+
+    def test_report_hit_renders_from_cached_aggregates(self):
+        first = self._run(True)
+        results_file = os.path.join('resultados', 'emergency_simulation_results.json')
+        figure = os.path.join('resultados', 'emergency_simulation_tiempo_por_severidad.png')
+        os.remove(results_file)
+        os.remove(figure)
+
+        second = self._run(True, trace_level='summary')
+        self.assertTrue(os.path.exists(results_file))
+        self.assertTrue(os.path.exists(figure))
+        self.assertEqual(second['simulation_parameters']['trace_level'], 'summary')
+        self.assertEqual(second['total_patients'], first['total_patients'])
+        # La corrida con informe también sirve a las corridas sin informe
+        self.assertEqual(self._run(False)['total_patients'], first['total_patients'])
+
+
+if __name__ == '__main__':
+    unittest.main()
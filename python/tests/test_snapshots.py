@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Instantáneas del motor rápido: reanudar es igual a no interrumpir
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import zlib
+
+from emergency_simulation import run_simulation
+from snapshots import SNAPSHOT_FORMAT, continue_run, dumps, fork, load_snapshot, loads, run_until, save_snapshot
+
+CONFIG = {'arrival_interval': 25, 'random_seed': 9, 'trace_level': 'off', 'priority_aging': 0.5}
+PAUSE, END = 170.0, 500.0
+
+
+def without_parameters(results):
+    return {key: value for key, value in results.items() if key != 'simulation_parameters'}
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.uninterrupted = run_simulation(dict(CONFIG), sim_time=END, write_report=False, engine='fast')
+
+    def test_resume_from_bytes(self):
+        er = loads(dumps(run_until(dict(CONFIG), PAUSE)))
+        self.assertEqual(er.now, PAUSE)
+        self.assertEqual(without_parameters(continue_run(er, END)), without_parameters(self.uninterrupted))
+
+    def test_resume_from_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'pausa', 'sala.snapshot')
+            save_snapshot(run_until(dict(CONFIG), PAUSE), path)
+            results = continue_run(load_snapshot(path), END)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(without_parameters(results), without_parameters(self.uninterrupted))
+
+    def test_fork_without_changes_and_with_capacity(self):
+        er = run_until(dict(CONFIG), PAUSE)
+        results = fork(er, {'igual': {}, 'mas_doctores': {'num_doctors': 6}}, END, max_workers=1)
+        self.assertEqual(without_parameters(results['igual']), without_parameters(self.uninterrupted))
+        self.assertEqual(results['mas_doctores']['simulation_parameters']['fork_time'], PAUSE)
+        self.assertNotEqual(results['mas_doctores']['average_time_in_system'],
+                            self.uninterrupted['average_time_in_system'])
+        # El modelo original no se modifica al bifurcar
+        self.assertEqual(er.now, PAUSE)
+
+    def test_incompatible_snapshot(self):
+        er = run_until(dict(CONFIG), 10.0)
+        data = zlib.compress(pickle.dumps((SNAPSHOT_FORMAT, 'otra versión', er)))
+        with self.assertRaises(ValueError):
+            loads(data)
+
+if __name__ == '__main__':
+    unittest.main()
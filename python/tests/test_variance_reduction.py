@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Estimador con variables de control en casos lineales conocidos
+"""
+
+import math
+import unittest
+
+import numpy as np
+
+from output_analysis import t_quantile
+from variance_reduction import control_variate_estimate
+
+EXPECTED_ARRIVALS = 100.0
+EXPECTED_SHARE = 0.1
+
+
+def replica(y, arrivals, severe=10):
+    """Resultados mínimos de una réplica: el indicador y sus 'input_statistics'"""
+    return {
+        'average_time_in_system': y,
+        'input_statistics': {
+            'arrivals': arrivals,
+            'expected_arrivals': EXPECTED_ARRIVALS,
+            'severity_counts': {'1': severe},
+            'expected_severity_share': {'1': EXPECTED_SHARE}
+        }
+    }
+
+
+class ControlVariateTest(unittest.TestCase):
+
+    def test_exact_linear_relation(self):
+        arrivals = [90, 95, 104, 111, 120, 99]
+        replicas = [replica(10 + 0.5 * (a - EXPECTED_ARRIVALS), a) for a in arrivals]
+        estimate = control_variate_estimate(replicas, 'average_time_in_system')
+        # Sin ruido la corrección recupera la ordenada exacta con semiancho nulo
+        self.assertAlmostEqual(estimate['mean'], 10.0, places=12)
+        self.assertAlmostEqual(estimate['coefficients']['arrivals'], 0.5, places=12)
+        self.assertAlmostEqual(estimate['half_width'], 0.0, places=9)
+        self.assertAlmostEqual(estimate['plain_mean'], 10 + 0.5 * (sum(arrivals) / 6 - EXPECTED_ARRIVALS))
+        self.assertGreater(estimate['plain_half_width'], 1.0)
+
+    def test_matches_least_squares(self):
+        rng = np.random.default_rng(12)
+        n = 40
+        arrivals = rng.poisson(EXPECTED_ARRIVALS, n)
+        severe = rng.binomial(arrivals, EXPECTED_SHARE)
+        share = severe / arrivals
+        y = 30 + 0.4 * (arrivals - EXPECTED_ARRIVALS) - 20 * (share - EXPECTED_SHARE) + rng.normal(0, 1.0, n)
+        replicas = [replica(float(v), int(a), int(s)) for v, a, s in zip(y, arrivals, severe)]
+        estimate = control_variate_estimate(replicas, 'average_time_in_system',
+                                            controls=('arrivals', 'severity_1'))
+
+        design = np.column_stack([np.ones(n), arrivals - EXPECTED_ARRIVALS, share - EXPECTED_SHARE])
+        coefficients, residuals, _, _ = np.linalg.lstsq(design, y, rcond=None)
+        variance = residuals[0] / (n - 3)
+        standard_error = math.sqrt(variance * np.linalg.inv(design.T @ design)[0, 0])
+        self.assertAlmostEqual(estimate['mean'], coefficients[0], places=9)
+        self.assertAlmostEqual(estimate['coefficients']['arrivals'], coefficients[1], places=9)
+        self.assertAlmostEqual(estimate['coefficients']['severity_1'], coefficients[2], places=6)
+        self.assertAlmostEqual(estimate['half_width'], t_quantile(0.975, n - 3) * standard_error, places=9)
+        self.assertLess(estimate['half_width'], estimate['plain_half_width'])
+
+    def test_too_few_replicas(self):
+        estimate = control_variate_estimate([replica(1.0, 90), replica(2.0, 110)], 'average_time_in_system')
+        self.assertIsNone(estimate['coefficients'])
+        self.assertEqual(estimate['mean'], 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
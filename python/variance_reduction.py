@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Técnicas de reducción de varianza entre réplicas
+
+- Números aleatorios comunes (CRN): cada elemento estocástico tiene su propio
+  flujo (ver variates), así que dos configuraciones con la misma semilla ven
+  los mismos pacientes. paired_difference compara configuraciones réplica a
+  réplica en lugar de tratar las réplicas como independientes.
+- Variables antitéticas: cada par de réplicas usa la misma semilla, una con
+  las uniformes u ('base') y la otra con 1 - u ('mirror'); el estimador es el
+  promedio de cada par.
+- Variables de control: entradas con media conocida que cada corrida
+  registra en 'input_statistics' (cantidad de llegadas, Λ(T), y mezcla de
+  severidades, los pesos) corrigen la media por regresión:
+  Y_cv = media(Y) - b' (media(C) - E[C]).
+"""
+
+import math
+
+from adaptive_replications import metric_value
+from output_analysis import DEFAULT_CONFIDENCE, confidence_interval, t_quantile
+from parallel_runner import make_task, run_tasks
+
+DEFAULT_CONTROLS = ('arrivals',)
+
+
+def antithetic_config(config, role):
+    """Copia de la configuración con el rol antitético ('base' o 'mirror')"""
+    return {**config, 'antithetic': role}
+
+
+def run_antithetic_pairs(configurations, pairs, sim_time=24, max_workers=None, engine='simpy'):
+    """Ejecuta `pairs` pares antitéticos de cada configuración
+
+    Las dos corridas del par i usan la semilla de la réplica i. Devuelve
+    {nombre: [(resultados base, resultados mirror), ...]}.
+    """
+    tasks = []
+    for name, config in configurations.items():
+        for role in ('base', 'mirror'):
+            tasks.extend(make_task((name, role), antithetic_config(config, role), pair, sim_time, engine)
+                         for pair in range(pairs))
+
+    results = {name: [[None, None] for _ in range(pairs)] for name in configurations}
+    for (name, role), pair, result in run_tasks(tasks, max_workers):
+        results[name][pair][0 if role == 'base' else 1] = result
+    return {name: [tuple(pair) for pair in pair_results] for name, pair_results in results.items()}
+
+
+def antithetic_estimate(pair_results, metric, confidence=DEFAULT_CONFIDENCE):
+    """Media e intervalo de confianza sobre los promedios de cada par antitético
+
+    También informa la correlación entre las dos corridas de los pares (debe
+    ser negativa para que haya reducción de varianza).
+    """
+    pairs = [(metric_value(base, metric), metric_value(mirror, metric))
+             for base, mirror in pair_results if base and mirror]
+    pairs = [(a, b) for a, b in pairs if a is not None and b is not None]
+    interval = confidence_interval([(a + b) / 2 for a, b in pairs], confidence)
+    interval['correlation'] = _correlation([a for a, _ in pairs], [b for _, b in pairs])
+    return interval
+
+
+def control_values(results, control):
+    """Valor realizado y esperado de una variable de control de una corrida
+
+    'arrivals' es la cantidad de llegadas; 'severity_<k>' es la proporción
+    de llegadas con severidad k.
+    """
+    inputs = (results or {}).get('input_statistics')
+    if not inputs:
+        return None
+    if control == 'arrivals':
+        return inputs['arrivals'], inputs['expected_arrivals']
+    if control.startswith('severity_'):
+        severity = control[len('severity_'):]
+        if not inputs['arrivals'] or severity not in inputs['severity_counts']:
+            return None
+        return (inputs['severity_counts'][severity] / inputs['arrivals'],
+                inputs['expected_severity_share'][severity])
+    raise ValueError(f"Variable de control desconocida: {control}")
+
+
+def control_variate_estimate(replica_results, metric, controls=DEFAULT_CONTROLS, confidence=DEFAULT_CONFIDENCE):
+    """Estimador con variables de control de la media de un indicador
+
+    Ajusta por mínimos cuadrados Y_i = a + b' (C_i - E[C]) sobre réplicas
+    independientes; la ordenada `a` es el estimador corregido y su error
+    estándar sale de la misma regresión (t con n - q - 1 grados de libertad).
+    Se requieren más réplicas que variables de control + 1.
+    """
+    rows = []
+    for results in replica_results:
+        y = metric_value(results, metric) if results else None
+        values = [control_values(results, control) for control in controls]
+        if y is None or any(v is None for v in values):
+            continue
+        rows.append((y, [realized - expected for realized, expected in values]))
+
+    n, q = len(rows), len(controls)
+    plain = confidence_interval([y for y, _ in rows], confidence)
+    if n <= q + 1:
+        return {**plain, 'plain_half_width': plain['half_width'], 'coefficients': None}
+
+    # Ecuaciones normales de la regresión con ordenada
+    design = [[1.0] + deviations for _, deviations in rows]
+    xtx = [[math.fsum(row[i] * row[j] for row in design) for j in range(q + 1)] for i in range(q + 1)]
+    xty = [math.fsum(row[i] * y for row, (y, _) in zip(design, rows)) for i in range(q + 1)]
+    inverse = _invert(xtx)
+    if inverse is None:  # Control sin variación (por ejemplo, mezcla fija)
+        return {**plain, 'plain_half_width': plain['half_width'], 'coefficients': None}
+    coefficients = [math.fsum(inverse[i][j] * xty[j] for j in range(q + 1)) for i in range(q + 1)]
+
+    residuals = [y - math.fsum(c * x for c, x in zip(coefficients, row)) for row, (y, _) in zip(design, rows)]
+    residual_variance = math.fsum(r * r for r in residuals) / (n - q - 1)
+    half_width = t_quantile(0.5 + confidence / 2, n - q - 1) * math.sqrt(residual_variance * inverse[0][0])
+    return {
+        'mean': coefficients[0],
+        'half_width': half_width,
+        'count': n,
+        'plain_mean': plain['mean'],
+        'plain_half_width': plain['half_width'],
+        'coefficients': dict(zip(controls, coefficients[1:]))
+    }
+
+
+def paired_difference(replicas_a, replicas_b, metric, confidence=DEFAULT_CONFIDENCE):
+    """Diferencia media B - A con números aleatorios comunes
+
+    Las réplicas se emparejan por índice (misma semilla). 'variance_ratio'
+    compara la varianza de la diferencia con la que tendría si las
+    configuraciones se hubieran simulado con semillas independientes
+    (mayor a 1 indica reducción de varianza).
+    """
+    pairs = [(metric_value(a, metric), metric_value(b, metric))
+             for a, b in zip(replicas_a, replicas_b) if a and b]
+    pairs = [(a, b) for a, b in pairs if a is not None and b is not None]
+    interval = confidence_interval([b - a for a, b in pairs], confidence)
+    if len(pairs) > 1:
+        paired_variance = _variance([b - a for a, b in pairs])
+        independent_variance = _variance([a for a, _ in pairs]) + _variance([b for _, b in pairs])
+        interval['variance_ratio'] = independent_variance / paired_variance if paired_variance else math.inf
+    else:
+        interval['variance_ratio'] = None
+    return interval
+
+
+def _variance(values):
+    mean = math.fsum(values) / len(values)
+    return math.fsum((v - mean) ** 2 for v in values) / (len(values) - 1)
+
+
+def _correlation(xs, ys):
+    if len(xs) < 2:
+        return None
+    mean_x = math.fsum(xs) / len(xs)
+    mean_y = math.fsum(ys) / len(ys)
+    sxx = math.fsum((x - mean_x) ** 2 for x in xs)
+    syy = math.fsum((y - mean_y) ** 2 for y in ys)
+    if sxx == 0 or syy == 0:
+        return None
+    return math.fsum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / math.sqrt(sxx * syy)
+
+
+def _invert(matrix):
+    """Inversa por Gauss-Jordan de una matriz pequeña, o None si es singular"""
+    size = len(matrix)
+    augmented = [list(row) + [1.0 if i == j else 0.0 for j in range(size)] for i, row in enumerate(matrix)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(augmented[r][column]))
+        if abs(augmented[pivot][column]) < 1e-12 * max(1.0, abs(matrix[column][column])):
+            return None
+        augmented[column], augmented[pivot] = augmented[pivot], augmented[column]
+        scale = augmented[column][column]
+        augmented[column] = [value / scale for value in augmented[column]]
+        for row in range(size):
+            if row != column and augmented[row][column]:
+                factor = augmented[row][column]
+                augmented[row] = [value - factor * pivot_value
+                                  for value, pivot_value in zip(augmented[row], augmented[column])]
+    return [row[size:] for row in augmented]
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Suministro de variables aleatorias por flujos independientes
+
+Cada elemento estocástico del modelo (llegadas, severidad, decisiones de
+ruta y cada tiempo de servicio) tiene su propio flujo, derivado de la semilla
+de la corrida con numpy.random.SeedSequence. Los flujos de servicio y de ruta
+de cada etapa los indica el recorrido (pathways). Los valores se generan por
+bloques y todos los atributos de un paciente se sortean al llegar, en orden de
+llegada, de modo que dos configuraciones con la misma semilla ven exactamente
+los mismos pacientes (números aleatorios comunes).
+
+Si NumPy no está instalado se usa un random.Random por flujo; los resultados
+son igualmente reproducibles, pero distintos a los de NumPy.
+
+Para variables antitéticas ('antithetic': 'base' o 'mirror') todas las
+variables se obtienen por inversión de uniformes, y la corrida 'mirror' usa
+1 - u en lugar de u en cada flujo.
+"""
+
+import math
+import random
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+# Flujos del modelo; el orden define la subsemilla de cada uno, por lo que
+# los flujos nuevos deben agregarse al final. Los flujos de un recorrido que
+# no están aquí se agregan después, en el orden del recorrido.
+# ('xray_recheck' y 'lab_recheck' ya no se usan: la segunda consulta sale del recorrido)
+STREAMS = (
+    'arrival', 'severity', 'registration', 'triage', 'doctor',
+    'xray_route', 'lab_route', 'xray', 'lab', 'follow_up', 'treatment',
+    'xray_recheck', 'lab_recheck'
+)
+
+BLOCK_SIZE = 1024
+
+ANTITHETIC_ROLES = (None, 'base', 'mirror')
+
+
+class PatientDraws:
+    """Valores aleatorios de un paciente, sorteados al momento de su llegada
+
+    `service` tiene una uniforme (0, 1) por etapa del recorrido y `route` una
+    por etapa con ramas (en el orden de CompiledPathway.route_streams); el
+    registro es una exponencial estándar. El modelo los escala según
+    severidad y día.
+    """
+
+    __slots__ = ('severity', 'registration', 'service', 'route')
+
+    def __init__(self, severity, registration, service, route):
+        self.severity = severity
+        self.registration = registration
+        self.service = service
+        self.route = route
+
+
+class _BlockStream:
+    """Flujo de valores generados por bloques"""
+
+    def __init__(self, refill, block_size):
+        self._refill = refill
+        self._block_size = block_size
+        self._values = []
+        self._index = 0
+
+    def next(self):
+        if self._index == len(self._values):
+            self._values = self._refill(self._block_size)
+            self._index = 0
+        value = self._values[self._index]
+        self._index += 1
+        return value
+
+
+class VariateSupply:
+    """Generador de variables aleatorias con un flujo independiente por propósito"""
+
+    def __init__(self, seed, severity_weights=(0.1, 0.25, 0.35, 0.2, 0.1), block_size=BLOCK_SIZE,
+                 backend=None, antithetic=None, pathway=None):
+        from pathways import compile_pathway
+
+        self.seed = seed
+        self.backend = backend or ('numpy' if np is not None else 'python')
+        self.block_size = block_size
+        if antithetic not in ANTITHETIC_ROLES:
+            raise ValueError(f"Rol antitético desconocido: {antithetic}")
+        self.antithetic = antithetic
+        self.severity_weights = list(severity_weights)
+
+        total = sum(severity_weights)
+        cumulative = []
+        acc = 0.0
+        for weight in severity_weights:
+            acc += weight / total
+            cumulative.append(acc)
+        cumulative[-1] = 1.0
+        self._severity_cumulative = cumulative
+        self.severity_probabilities = [weight / total for weight in severity_weights]
+        # Pacientes sorteados por severidad (entradas conocidas para variables de control)
+        self.severity_counts = [0] * (len(severity_weights) + 1)
+        self.pathway = pathway or compile_pathway(severities=len(severity_weights))
+
+        streams = list(STREAMS)
+        for name in self.pathway.streams + self.pathway.route_streams:
+            if name not in streams:
+                streams.append(name)
+        if self.backend == 'numpy':
+            if np is None:
+                raise ImportError("El backend 'numpy' requiere NumPy instalado")
+            # Los hijos de SeedSequence dependen solo de su posición: agregar flujos no cambia los anteriores
+            children = np.random.SeedSequence(seed).spawn(len(streams))
+            self._generators = {name: np.random.Generator(np.random.PCG64(child))
+                                for name, child in zip(streams, children)}
+        elif self.backend == 'python':
+            self._generators = {name: random.Random(f"{seed}-{name}") for name in streams}
+        else:
+            raise ValueError(f"Backend de variables aleatorias desconocido: {self.backend}")
+
+        self._streams = {name: _BlockStream(self._uniform_refill(name), block_size) for name in streams}
+        self._streams['arrival'] = _BlockStream(self._exponential_refill('arrival'), block_size)
+        self._streams['registration'] = _BlockStream(self._exponential_refill('registration'), block_size)
+        self._streams['severity'] = _BlockStream(self._severity_refill(), block_size)
+
+        # Accesos directos para el sorteo por paciente
+        self._next_severity = self._streams['severity'].next
+        self._next_registration = self._streams['registration'].next
+        self._service_draws = [self._streams[name].next for name in self.pathway.streams]
+        self._route_draws = [self._streams[name].next for name in self.pathway.route_streams]
+        self._next_arrival = self._streams['arrival'].next
+
+    @classmethod
+    def from_config(cls, config, pathway=None):
+        """Suministro de una configuración; `pathway` evita volver a compilar el recorrido"""
+        if pathway is None:
+            from pathways import pathway_from_config
+            pathway = pathway_from_config(config)
+        return cls(config.get('random_seed', 42),
+                   config.get('severity_weights', [0.1, 0.25, 0.35, 0.2, 0.1]),
+                   backend=config.get('variates_backend'),
+                   antithetic=config.get('antithetic'),
+                   pathway=pathway)
+
+    def _uniforms(self, name):
+        """Función que genera `size` uniformes (0, 1) del flujo, reflejadas en la corrida 'mirror'"""
+        gen = self._generators[name]
+        mirror = self.antithetic == 'mirror'
+        if self.backend == 'numpy':
+            if mirror:
+                return lambda size: 1.0 - gen.random(size)
+            return gen.random
+        if mirror:
+            return lambda size: [1.0 - gen.random() for _ in range(size)]
+        return lambda size: [gen.random() for _ in range(size)]
+
+    def _uniform_refill(self, name):
+        uniforms = self._uniforms(name)
+        if self.backend == 'numpy':
+            return lambda size: uniforms(size).tolist()
+        return uniforms
+
+    def _exponential_refill(self, name):
+        if self.antithetic is not None:
+            # Inversión de la uniforme (el método por defecto de NumPy no es monótono en u)
+            uniforms = self._uniforms(name)
+            if self.backend == 'numpy':
+                tiny = np.finfo(float).tiny
+                return lambda size: (-np.log(np.maximum(1.0 - uniforms(size), tiny))).tolist()
+            return lambda size: [-math.log(max(1.0 - u, 5e-324)) for u in uniforms(size)]
+
+        gen = self._generators[name]
+        if self.backend == 'numpy':
+            return lambda size: gen.standard_exponential(size).tolist()
+        return lambda size: [-math.log(1.0 - gen.random()) for _ in range(size)]
+
+    def _severity_refill(self):
+        uniforms = self._uniforms('severity')
+        cumulative = self._severity_cumulative
+        last = len(cumulative) - 1  # u = 1 (posible en la corrida 'mirror') cae en la última clase
+        if self.backend == 'numpy':
+            edges = np.asarray(cumulative)
+            return lambda size: (np.minimum(np.searchsorted(edges, uniforms(size), side='right'), last) + 1).tolist()
+        return lambda size: [min(bisect_right(cumulative, u), last) + 1 for u in uniforms(size)]
+
+    def __getstate__(self):
+        """Estado serializable: semilla, estado de cada generador y valores ya generados"""
+        if self.backend == 'numpy':
+            generators = {name: gen.bit_generator.state for name, gen in self._generators.items()}
+        else:
+            generators = {name: gen.getstate() for name, gen in self._generators.items()}
+        return {
+            'seed': self.seed,
+            'severity_weights': self.severity_weights,
+            'block_size': self.block_size,
+            'backend': self.backend,
+            'antithetic': self.antithetic,
+            'pathway': self.pathway,
+            'severity_counts': self.severity_counts,
+            'generators': generators,
+            'buffers': {name: (stream._values, stream._index) for name, stream in self._streams.items()}
+        }
+
+    def __setstate__(self, state):
+        # Las funciones de recarga son closures: se reconstruyen y luego se restaura el estado
+        self.__init__(state['seed'], state['severity_weights'], state['block_size'], state['backend'],
+                      state['antithetic'], state['pathway'])
+        self.severity_counts = state['severity_counts']
+        for name, generator_state in state['generators'].items():
+            if self.backend == 'numpy':
+                self._generators[name].bit_generator.state = generator_state
+            else:
+                self._generators[name].setstate(generator_state)
+        for name, (values, index) in state['buffers'].items():
+            self._streams[name]._values = values
+            self._streams[name]._index = index
+
+    def interarrival(self):
+        """Exponencial estándar para el siguiente intervalo entre llegadas"""
+        return self._next_arrival()
+
+    def patient(self):
+        """Sortea todos los valores aleatorios de un nuevo paciente"""
+        severity = self._next_severity()
+        self.severity_counts[severity] += 1
+        return PatientDraws(severity, self._next_registration(),
+                            [draw() for draw in self._service_draws], [draw() for draw in self._route_draws])